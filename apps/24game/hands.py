@@ -0,0 +1,197 @@
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from math import factorial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from solver import Expr, render_form, solution_forms, solutions
+
+TARGET = 24
+CARD_MIN = 1
+CARD_MAX = 10
+CARD_COUNT = 4
+TOLERANCE = 1e-6
+TABLE_VERSION = 3
+LEVELS = ("easy", "normal", "hard", "expert")
+LEVEL_LABELS = {"easy": "简单", "normal": "普通", "hard": "困难", "expert": "地狱"}
+UNSOLVABLE = -1
+RATE_CHUNK = 64
+
+
+def close_to_target(value: float) -> bool:
+    return abs(value - TARGET) < TOLERANCE
+
+
+def all_solutions(numbers: List[int]) -> List[str]:
+    return solutions(numbers, TARGET)
+
+
+def _depth(expr: Expr) -> int:
+    if expr[2] == "#":
+        return 0
+    return 1 + max(_depth(term) for term in expr[3] + expr[4])
+
+
+def _uses_division(expr: Expr) -> bool:
+    if expr[2] == "#":
+        return False
+    if expr[2] == "*" and expr[4]:
+        return True
+    return any(_uses_division(term) for term in expr[3] + expr[4])
+
+
+def _uses_fraction(expr: Expr) -> bool:
+    if expr[2] == "#":
+        return False
+    if expr[1][1] != 1:
+        return True
+    return any(_uses_fraction(term) for term in expr[3] + expr[4])
+
+
+def rate(found: List[Expr]) -> Tuple[int, int, bool, bool]:
+    if not found:
+        return UNSOLVABLE, 0, False, False
+    depth = min(_depth(expr) for expr in found)
+    needs_division = all(_uses_division(expr) for expr in found)
+    needs_fraction = all(_uses_fraction(expr) for expr in found)
+    score = 0 if len(found) >= 4 else 1 if len(found) >= 2 else 2
+    score += needs_division + 2 * needs_fraction + (depth >= 3)
+    return max(0, min(score - 1, len(LEVELS) - 1)), depth, needs_division, needs_fraction
+
+
+def level_index(level: Optional[str]) -> Optional[int]:
+    return LEVELS.index(level) if level in LEVELS else None
+
+
+def _arrangements(cards: Tuple[int, ...]) -> int:
+    count = factorial(len(cards))
+    for card in set(cards):
+        count //= factorial(cards.count(card))
+    return count
+
+
+class Hand:
+    __slots__ = ("id", "cards", "solutions", "level", "depth", "needs_division", "needs_fraction")
+
+    def __init__(
+        self,
+        hand_id: int,
+        cards: Tuple[int, ...],
+        solutions: List[str],
+        level: int,
+        depth: int,
+        needs_division: bool,
+        needs_fraction: bool,
+    ) -> None:
+        self.id = hand_id
+        self.cards = cards
+        self.solutions = solutions
+        self.level = level
+        self.depth = depth
+        self.needs_division = needs_division
+        self.needs_fraction = needs_fraction
+
+    @property
+    def solvable(self) -> bool:
+        return bool(self.solutions)
+
+    @property
+    def solution(self) -> Optional[str]:
+        return self.solutions[0] if self.solutions else None
+
+
+def rate_hands(job: tuple) -> List[tuple]:
+    target, hands = job
+    rated = []
+    for cards in hands:
+        found = solution_forms(cards, target)
+        rated.append((cards, [render_form(expr) for expr in found], *rate(found)))
+    return rated
+
+
+class HandTable:
+    def __init__(self, hands: List[Hand], target: int = TARGET, cards: Optional[List[int]] = None) -> None:
+        self.hands = hands
+        self.target = target
+        self.cards = cards or [CARD_MIN, CARD_MAX, CARD_COUNT]
+        self.index: Dict[Tuple[int, ...], Hand] = {hand.cards: hand for hand in hands}
+        self.pool: List[int] = []
+        self.pools: List[List[int]] = [[] for _ in LEVELS]
+        for hand in hands:
+            if hand.solvable:
+                slots = [hand.id] * _arrangements(hand.cards)
+                self.pool.extend(slots)
+                self.pools[hand.level].extend(slots)
+
+    def get(self, numbers: List[int]) -> Optional[Hand]:
+        return self.index.get(tuple(sorted(numbers)))
+
+    def deal(self, level: Optional[int] = None, rng: random.Random = random) -> Tuple[Hand, List[int]]:
+        pool = self.pools[level] if level is not None and self.pools[level] else self.pool
+        hand = self.hands[rng.choice(pool)]
+        cards = list(hand.cards)
+        rng.shuffle(cards)
+        return hand, cards
+
+    def to_json(self) -> dict:
+        return {
+            "version": TABLE_VERSION,
+            "target": self.target,
+            "cards": self.cards,
+            "hands": [
+                [list(hand.cards), hand.solutions, hand.level, hand.depth, hand.needs_division, hand.needs_fraction]
+                for hand in self.hands
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict, target: int = TARGET, cards: Optional[List[int]] = None) -> Optional["HandTable"]:
+        cards = cards or [CARD_MIN, CARD_MAX, CARD_COUNT]
+        if data.get("version") != TABLE_VERSION or data.get("target") != target or data.get("cards") != cards:
+            return None
+        return cls(
+            [Hand(hand_id, tuple(row[0]), *row[1:]) for hand_id, row in enumerate(data["hands"])],
+            target,
+            cards,
+        )
+
+    @classmethod
+    def build(
+        cls,
+        target: int = TARGET,
+        card_min: int = CARD_MIN,
+        card_max: int = CARD_MAX,
+        card_count: int = CARD_COUNT,
+        workers: int = 1,
+    ) -> "HandTable":
+        space = list(combinations_with_replacement(range(card_min, card_max + 1), card_count))
+        jobs = [(target, space[start:start + RATE_CHUNK]) for start in range(0, len(space), RATE_CHUNK)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = list(pool.map(rate_hands, jobs))
+        else:
+            chunks = [rate_hands(job) for job in jobs]
+        hands = [Hand(hand_id, *row) for hand_id, row in enumerate(row for chunk in chunks for row in chunk)]
+        return cls(hands, target, [card_min, card_max, card_count])
+
+
+def load_table(path: Optional[Path]) -> HandTable:
+    if path is not None and path.exists():
+        try:
+            table = HandTable.from_json(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError):
+            table = None
+        if table is not None:
+            return table
+    table = HandTable.build()
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(table.to_json(), handle, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    return table
@@ -1,11 +1,11 @@
 import ast
-import json
-import operator
+import asyncio
+import os
 import random
 import re
-from itertools import permutations
+import sys
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, FastAPI, Form, Request
 from fastapi.responses import HTMLResponse
@@ -16,7 +16,27 @@ APP_SLUG = "24game"
 BASE_PATH = f"/{APP_SLUG}"
 
 BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from hands import (
+    LEVEL_LABELS,
+    LEVELS,
+    TOLERANCE,
+    Hand,
+    HandTable,
+    close_to_target,
+    level_index,
+    load_table,
+)
+from tokens import load_secret, read_puzzle, sign_puzzle
+
 WEB_DIR = BASE_DIR / "web"
+TABLE_PATH = Path(os.getenv("TWENTYFOUR_TABLE_PATH", str(Path("data") / "24game" / "hands.json")))
+_table: Optional[HandTable] = None
+TOKEN_SECRET = os.getenv("TWENTYFOUR_TOKEN_SECRET", "").encode("utf-8")
+TOKEN_KEY_PATH = Path(os.getenv("TWENTYFOUR_TOKEN_KEY_PATH", str(Path("data") / "24game" / "token.key")))
+_token_secret: Optional[bytes] = TOKEN_SECRET or None
 
 templates = Jinja2Templates(directory=str(WEB_DIR / "templates"))
 
@@ -30,12 +50,7 @@ def register(parent_app: FastAPI) -> None:
         name="24game-assets",
     )
     parent_app.include_router(router)
-
-TARGET = 24
-CARD_MIN = 1
-CARD_MAX = 10
-CARD_COUNT = 4
-TOLERANCE = 1e-6
+    parent_app.add_event_handler("startup", _load_table)
 
 
 def status_payload(message: str, level: str = "idle") -> dict:
@@ -45,22 +60,6 @@ def status_payload(message: str, level: str = "idle") -> dict:
     return {"message": message, "status_class": status_class}
 
 
-def parse_numbers(raw: str) -> Optional[List[int]]:
-    try:
-        value = json.loads(raw)
-    except json.JSONDecodeError:
-        return None
-    if not isinstance(value, list) or len(value) != CARD_COUNT:
-        return None
-    numbers: List[int] = []
-    for item in value:
-        try:
-            numbers.append(int(item))
-        except (TypeError, ValueError):
-            return None
-    return numbers
-
-
 def extract_numbers(expression: str) -> List[int]:
     tokens = [int(token) for token in re.findall(r"\d+", expression)]
     return tokens
@@ -110,82 +109,53 @@ def safe_eval(expression: str) -> float:
     return eval_node(parsed)
 
 
-def close_to_target(value: float) -> bool:
-    return abs(value - TARGET) < TOLERANCE
-
-
-def apply_op(op: Callable[[float, float], float], left: float, right: float) -> float:
-    if op is operator.truediv and abs(right) < TOLERANCE:
-        raise ZeroDivisionError
-    return op(left, right)
-
-
-def find_solution(numbers: List[int]) -> Optional[str]:
-    operations: List[Tuple[str, Callable[[float, float], float]]] = [
-        ("+", operator.add),
-        ("-", operator.sub),
-        ("*", operator.mul),
-        ("/", operator.truediv),
-    ]
-    for perm in permutations(numbers):
-        a, b, c, d = perm
-        for sym1, op1 in operations:
-            for sym2, op2 in operations:
-                for sym3, op3 in operations:
-                    try:
-                        r1 = apply_op(op1, a, b)
-                        r2 = apply_op(op2, r1, c)
-                        r3 = apply_op(op3, r2, d)
-                        if close_to_target(r3):
-                            return f"(({a}{sym1}{b}){sym2}{c}){sym3}{d}"
-                    except ZeroDivisionError:
-                        pass
-                    try:
-                        r1 = apply_op(op1, a, b)
-                        r2 = apply_op(op3, c, d)
-                        r3 = apply_op(op2, r1, r2)
-                        if close_to_target(r3):
-                            return f"({a}{sym1}{b}){sym2}({c}{sym3}{d})"
-                    except ZeroDivisionError:
-                        pass
-                    try:
-                        r1 = apply_op(op2, b, c)
-                        r2 = apply_op(op1, a, r1)
-                        r3 = apply_op(op3, r2, d)
-                        if close_to_target(r3):
-                            return f"({a}{sym1}({b}{sym2}{c})){sym3}{d}"
-                    except ZeroDivisionError:
-                        pass
-                    try:
-                        r1 = apply_op(op2, b, c)
-                        r2 = apply_op(op3, r1, d)
-                        r3 = apply_op(op1, a, r2)
-                        if close_to_target(r3):
-                            return f"{a}{sym1}(({b}{sym2}{c}){sym3}{d})"
-                    except ZeroDivisionError:
-                        pass
-                    try:
-                        r1 = apply_op(op3, c, d)
-                        r2 = apply_op(op2, b, r1)
-                        r3 = apply_op(op1, a, r2)
-                        if close_to_target(r3):
-                            return f"{a}{sym1}({b}{sym2}({c}{sym3}{d}))"
-                    except ZeroDivisionError:
-                        pass
-    return None
-
-
-def build_game_data() -> dict:
-    while True:
-        numbers = [random.randint(CARD_MIN, CARD_MAX) for _ in range(CARD_COUNT)]
-        solution = find_solution(numbers)
-        if solution:
-            return {"numbers": numbers, "solution": solution}
+def hand_table() -> HandTable:
+    global _table
+    if _table is None:
+        _table = load_table(TABLE_PATH)
+    return _table
+
+
+def token_secret() -> bytes:
+    global _token_secret
+    if _token_secret is None:
+        _token_secret = load_secret(TOKEN_KEY_PATH)
+    return _token_secret
+
+
+async def _load_table() -> None:
+    await asyncio.to_thread(token_secret)
+    await asyncio.to_thread(hand_table)
+
+
+def resolve_puzzle(token: str) -> Optional[Tuple[Hand, List[int]]]:
+    puzzle = read_puzzle(token_secret(), token)
+    if puzzle is None:
+        return None
+    hand_id, numbers = puzzle
+    hands = hand_table().hands
+    if hand_id >= len(hands) or sorted(numbers) != list(hands[hand_id].cards):
+        return None
+    return hands[hand_id], numbers
+
+
+def game_data(hand: Hand, numbers: List[int], level: Optional[str]) -> dict:
+    return {
+        "numbers": numbers,
+        "token": sign_puzzle(token_secret(), hand.id, numbers),
+        "level": level if level in LEVELS else "",
+        "levels": LEVEL_LABELS,
+    }
+
+
+def build_game_data(level: Optional[str] = None) -> dict:
+    hand, numbers = hand_table().deal(level_index(level))
+    return game_data(hand, numbers, level)
 
 
 @router.get("/", response_class=HTMLResponse)
-async def index(request: Request):
-    data = build_game_data()
+async def index(request: Request, level: Optional[str] = None):
+    data = build_game_data(level)
     payload = status_payload("准备就绪。")
     return templates.TemplateResponse(
         "index.html",
@@ -199,9 +169,10 @@ async def index(request: Request):
 
 
 @router.post("/new", response_class=HTMLResponse)
-async def new_game(request: Request):
-    data = build_game_data()
-    payload = status_payload("已发新一组。")
+async def new_game(request: Request, level: Optional[str] = None):
+    data = build_game_data(level)
+    label = LEVEL_LABELS.get(data["level"])
+    payload = status_payload(f"已发新一组（{label}）。" if label else "已发新一组。")
     return templates.TemplateResponse(
         "_game.html",
         {
@@ -216,16 +187,17 @@ async def new_game(request: Request):
 @router.post("/shuffle", response_class=HTMLResponse)
 async def shuffle(
     request: Request,
-    numbers_json: str = Form(...),
-    solution_text: str = Form(...),
+    token: str = Form(""),
     expression: str = Form(""),
+    level: str = Form(""),
 ):
-    numbers = parse_numbers(numbers_json)
-    if numbers is None:
-        data = build_game_data()
+    puzzle = resolve_puzzle(token)
+    if puzzle is None:
+        data = build_game_data(level)
     else:
+        hand, numbers = puzzle
         random.shuffle(numbers)
-        data = {"numbers": numbers, "solution": solution_text}
+        data = game_data(hand, numbers, level)
     payload = status_payload("已洗牌。")
     return templates.TemplateResponse(
         "_game.html",
@@ -242,9 +214,14 @@ async def shuffle(
 @router.post("/answer", response_class=HTMLResponse)
 async def answer(
     request: Request,
-    solution_text: str = Form(""),
+    token: str = Form(""),
 ):
-    message = solution_text.strip() or "本题暂未记录答案。"
+    puzzle = resolve_puzzle(token)
+    if puzzle is None:
+        message = "本题暂未记录答案。"
+    else:
+        found = puzzle[0].solutions
+        message = f"{found[0]}（共 {len(found)} 种不同解法）" if found else "本题无解。"
     payload = status_payload(f"参考答案：{message}", "warn")
     return templates.TemplateResponse(
         "_status.html",
@@ -259,10 +236,10 @@ async def answer(
 async def check(
     request: Request,
     expression: str = Form(""),
-    numbers_json: str = Form(...),
+    token: str = Form(""),
 ):
-    numbers = parse_numbers(numbers_json)
-    if numbers is None:
+    puzzle = resolve_puzzle(token)
+    if puzzle is None:
         payload = status_payload("缺少数字牌信息，请刷新后重试。", "fail")
         return templates.TemplateResponse("_status.html", {"request": request, **payload})
 
@@ -276,7 +253,7 @@ async def check(
         return templates.TemplateResponse("_status.html", {"request": request, **payload})
 
     used_numbers = extract_numbers(trimmed)
-    if not numbers_match(numbers, used_numbers):
+    if not numbers_match(puzzle[1], used_numbers):
         payload = status_payload("每个数字必须且只能使用一次。", "fail")
         return templates.TemplateResponse("_status.html", {"request": request, **payload})
 
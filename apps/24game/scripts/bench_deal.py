@@ -0,0 +1,122 @@
+import operator
+import random
+import sys
+import tempfile
+import time
+from itertools import permutations
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APP_DIR = SCRIPT_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from hands import CARD_COUNT, CARD_MAX, CARD_MIN, TOLERANCE, close_to_target, load_table
+
+DEALS = 2000
+OPERATIONS: List[Tuple[str, Callable[[float, float], float]]] = [
+    ("+", operator.add),
+    ("-", operator.sub),
+    ("*", operator.mul),
+    ("/", operator.truediv),
+]
+
+
+def apply_op(op: Callable[[float, float], float], left: float, right: float) -> float:
+    if op is operator.truediv and abs(right) < TOLERANCE:
+        raise ZeroDivisionError
+    return op(left, right)
+
+
+def legacy_find_solution(numbers: List[int]) -> Optional[str]:
+    for perm in permutations(numbers):
+        a, b, c, d = perm
+        for sym1, op1 in OPERATIONS:
+            for sym2, op2 in OPERATIONS:
+                for sym3, op3 in OPERATIONS:
+                    try:
+                        r1 = apply_op(op1, a, b)
+                        r2 = apply_op(op2, r1, c)
+                        r3 = apply_op(op3, r2, d)
+                        if close_to_target(r3):
+                            return f"(({a}{sym1}{b}){sym2}{c}){sym3}{d}"
+                    except ZeroDivisionError:
+                        pass
+                    try:
+                        r1 = apply_op(op1, a, b)
+                        r2 = apply_op(op3, c, d)
+                        r3 = apply_op(op2, r1, r2)
+                        if close_to_target(r3):
+                            return f"({a}{sym1}{b}){sym2}({c}{sym3}{d})"
+                    except ZeroDivisionError:
+                        pass
+                    try:
+                        r1 = apply_op(op2, b, c)
+                        r2 = apply_op(op1, a, r1)
+                        r3 = apply_op(op3, r2, d)
+                        if close_to_target(r3):
+                            return f"({a}{sym1}({b}{sym2}{c})){sym3}{d}"
+                    except ZeroDivisionError:
+                        pass
+                    try:
+                        r1 = apply_op(op2, b, c)
+                        r2 = apply_op(op3, r1, d)
+                        r3 = apply_op(op1, a, r2)
+                        if close_to_target(r3):
+                            return f"{a}{sym1}(({b}{sym2}{c}){sym3}{d})"
+                    except ZeroDivisionError:
+                        pass
+                    try:
+                        r1 = apply_op(op3, c, d)
+                        r2 = apply_op(op2, b, r1)
+                        r3 = apply_op(op1, a, r2)
+                        if close_to_target(r3):
+                            return f"{a}{sym1}({b}{sym2}({c}{sym3}{d}))"
+                    except ZeroDivisionError:
+                        pass
+    return None
+
+
+def legacy_deal() -> dict:
+    while True:
+        numbers = [random.randint(CARD_MIN, CARD_MAX) for _ in range(CARD_COUNT)]
+        solution = legacy_find_solution(numbers)
+        if solution:
+            return {"numbers": numbers, "solution": solution}
+
+
+def run() -> None:
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "hands.json"
+        start = time.perf_counter()
+        table = load_table(path)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        load_table(path)
+        load_time = time.perf_counter() - start
+        size = path.stat().st_size
+
+    start = time.perf_counter()
+    for _ in range(DEALS):
+        legacy_deal()
+    legacy_time = (time.perf_counter() - start) / DEALS
+    start = time.perf_counter()
+    for _ in range(DEALS):
+        hand, numbers = table.deal()
+    table_time = (time.perf_counter() - start) / DEALS
+    start = time.perf_counter()
+    for _ in range(DEALS):
+        legacy_find_solution([3, 3, 8, 8])
+    hard_time = (time.perf_counter() - start) / DEALS
+
+    solvable = sum(hand.solvable for hand in table.hands)
+    print(f"{len(table.hands)} hands, {solvable} solvable, {len(table.pool)} weighted deal slots")
+    print(f"table build {build_time:.2f} s once, reload from disk {load_time * 1000:.1f} ms ({size / 1024:.0f} KiB)")
+    print(f"deal: retry + search {legacy_time * 1e6:8.1f} us   table {table_time * 1e6:6.2f} us")
+    print(f"answer for [3, 3, 8, 8]: search {hard_time * 1e6:8.1f} us   table lookup, no search")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APP_DIR = SCRIPT_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import solver
+from hands import CARD_COUNT, CARD_MIN, LEVELS, TARGET, HandTable
+
+DEALS = 200_000
+
+
+def rate_space(card_max: int, workers: int) -> HandTable:
+    solver.forms.cache_clear()
+    start = time.perf_counter()
+    table = HandTable.build(TARGET, CARD_MIN, card_max, CARD_COUNT, workers)
+    elapsed = time.perf_counter() - start
+    tiers = Counter(hand.level for hand in table.hands)
+    print(
+        f"{len(table.hands)} hands {CARD_MIN}..{card_max}, {workers} workers: {elapsed:.2f} s; "
+        + ", ".join(f"{LEVELS[level]} {tiers[level]}" for level in range(len(LEVELS)))
+        + f", unsolvable {tiers[-1]}"
+    )
+    return table
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Rate the full 24-point hand space into difficulty tiers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    for card_max in (10, 13):
+        table = rate_space(card_max, 1)
+        if args.workers > 1:
+            table = rate_space(card_max, args.workers)
+    rng = random.Random(1)
+    for level in range(len(LEVELS)):
+        start = time.perf_counter()
+        for _ in range(DEALS):
+            table.deal(level, rng)
+        micros = (time.perf_counter() - start) / DEALS * 1e6
+        hand = table.deal(level, rng)[0]
+        print(f"deal {LEVELS[level]:>6s}: {micros:.2f} us, e.g. {list(hand.cards)} -> {hand.solution} ({len(hand.solutions)} solutions)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,42 @@
+import sys
+import time
+from collections import Counter
+from itertools import combinations_with_replacement
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APP_DIR = SCRIPT_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import solver
+from hands import CARD_COUNT, CARD_MAX, CARD_MIN, TARGET
+
+
+def run() -> None:
+    hands = list(combinations_with_replacement(range(CARD_MIN, CARD_MAX + 1), CARD_COUNT))
+    worst = (0.0, ())
+    counts = Counter()
+    start = time.perf_counter()
+    for cards in hands:
+        solver.forms.cache_clear()
+        began = time.perf_counter()
+        found = solver.solutions(cards, TARGET)
+        worst = max(worst, (time.perf_counter() - began, cards))
+        counts[len(found)] += 1
+    cold = time.perf_counter() - start
+    solver.forms.cache_clear()
+    start = time.perf_counter()
+    for cards in hands:
+        solver.solutions(cards, TARGET)
+    shared = time.perf_counter() - start
+    print(f"{len(hands)} hands of {CARD_COUNT} cards {CARD_MIN}..{CARD_MAX}, target {TARGET}")
+    print(f"all distinct solutions, cold cache per hand: {cold / len(hands) * 1000:.2f} ms/hand, worst {worst[0] * 1000:.2f} ms {list(worst[1])}")
+    print(f"all distinct solutions, shared sub-multiset cache: {shared / len(hands) * 1000:.2f} ms/hand, {shared:.2f} s total")
+    print("distinct solutions per hand: " + ", ".join(f"{count}: {hands_}" for count, hands_ in sorted(counts.items())))
+    for cards in ((3, 3, 8, 8), (1, 5, 5, 5), (2, 3, 4, 6)):
+        print(f"{list(cards)}: {solver.solutions(cards, TARGET)}")
+
+
+if __name__ == "__main__":
+    run()
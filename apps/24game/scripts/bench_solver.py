@@ -0,0 +1,56 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APP_DIR = SCRIPT_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import solver
+from bench_deal import legacy_find_solution
+
+HANDS_PER_SIZE = 500
+CARD_MAX = 13
+
+
+def timed_solve(hands: list, cold: bool) -> tuple:
+    worst = 0.0
+    solved = 0
+    start = time.perf_counter()
+    for cards in hands:
+        if cold:
+            solver.reachable.cache_clear()
+        began = time.perf_counter()
+        solved += solver.solve(cards) is not None
+        worst = max(worst, time.perf_counter() - began)
+    return (time.perf_counter() - start) / len(hands), worst, solved
+
+
+def run() -> None:
+    rng = random.Random(5)
+    print(f"{HANDS_PER_SIZE} random hands per size, cards 1..{CARD_MAX}, target 24")
+    four = [tuple(rng.randint(1, CARD_MAX) for _ in range(4)) for _ in range(200)]
+    start = time.perf_counter()
+    for cards in four:
+        legacy_find_solution(list(cards))
+    float_time = (time.perf_counter() - start) / len(four)
+    print(f"4 cards, float first-solution search: {float_time * 1000:7.3f} ms/hand")
+    for size in (4, 5, 6):
+        hands = [tuple(rng.randint(1, CARD_MAX) for _ in range(size)) for _ in range(HANDS_PER_SIZE)]
+        cold_mean, cold_worst, solved = timed_solve(hands, cold=True)
+        solver.reachable.cache_clear()
+        warm_mean, _, _ = timed_solve(hands, cold=False)
+        print(
+            f"{size} cards, rational solver: cold {cold_mean * 1000:7.3f} ms/hand (worst {cold_worst * 1000:6.2f} ms), "
+            f"shared cache {warm_mean * 1000:7.3f} ms/hand, {solved}/{HANDS_PER_SIZE} solvable"
+        )
+    solver.reachable.cache_clear()
+    start = time.perf_counter()
+    solver.solve((8, 9, 10, 11, 12, 13), 9_999_991)
+    print(f"6 cards with no solution, full search: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,50 @@
+import json
+import secrets
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APP_DIR = SCRIPT_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from hands import CARD_COUNT, HandTable
+from tokens import read_puzzle, sign_puzzle
+
+ROUNDS = 100_000
+
+
+def legacy_resolve(table: HandTable, numbers_json: str):
+    value = json.loads(numbers_json)
+    if not isinstance(value, list) or len(value) != CARD_COUNT:
+        return None
+    numbers = [int(item) for item in value]
+    return table.get(numbers), numbers
+
+
+def token_resolve(table: HandTable, key: bytes, token: str):
+    hand_id, numbers = read_puzzle(key, token)
+    return table.hands[hand_id], numbers
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        function(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def run() -> None:
+    table = HandTable.build()
+    key = secrets.token_bytes(32)
+    hand, numbers = table.deal()
+    token = sign_puzzle(key, hand.id, numbers)
+    assert legacy_resolve(table, json.dumps(numbers)) == token_resolve(table, key, token)
+    print(f"token {token!r} ({len(token)} chars) for {numbers}")
+    print(f"sign:    {timed(sign_puzzle, key, hand.id, numbers):.2f} us")
+    print(f"resolve: numbers_json {timed(legacy_resolve, table, json.dumps(numbers)):.2f} us   token {timed(token_resolve, table, key, token):.2f} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,241 @@
+from functools import lru_cache
+from itertools import combinations
+from math import gcd
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+MAX_CARDS = 6
+REACH_CACHE_SIZE = 4096
+
+Rational = Tuple[int, int]
+Target = Union[int, Rational]
+
+
+def rational(value: Target) -> Rational:
+    if isinstance(value, tuple):
+        num, den = value
+        if den < 0:
+            num, den = -num, -den
+        divisor = gcd(num, den)
+        return num // divisor, den // divisor
+    return value.numerator, value.denominator
+
+
+def _split(cards: Tuple[int, ...]) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    seen = set()
+    size = len(cards)
+    for count in range(size // 2, 0, -1):
+        for picked in combinations(range(size), count):
+            left = tuple(cards[index] for index in picked)
+            right = tuple(cards[index] for index in range(size) if index not in picked)
+            if count * 2 == size and right < left:
+                left, right = right, left
+            if left in seen:
+                continue
+            seen.add(left)
+            yield left, right
+
+
+def _combine(a: Rational, b: Rational) -> Iterator[Tuple[Rational, str, bool]]:
+    an, ad = a
+    bn, bd = b
+    num = an * bd + bn * ad
+    den = ad * bd
+    divisor = gcd(num, den)
+    yield (num // divisor, den // divisor), "+", False
+    num = an * bd - bn * ad
+    divisor = gcd(num, den)
+    yield (num // divisor, den // divisor), "-", False
+    yield (-num // divisor, den // divisor), "-", True
+    num = an * bn
+    divisor = gcd(num, den)
+    yield (num // divisor, den // divisor), "*", False
+    if bn:
+        num, den = an * bd, ad * bn
+        if den < 0:
+            num, den = -num, -den
+        divisor = gcd(num, den)
+        yield (num // divisor, den // divisor), "/", False
+    if an:
+        num, den = bn * ad, bd * an
+        if den < 0:
+            num, den = -num, -den
+        divisor = gcd(num, den)
+        yield (num // divisor, den // divisor), "/", True
+
+
+Step = Optional[Tuple[str, bool, Tuple[int, ...], Rational, Tuple[int, ...], Rational]]
+
+
+@lru_cache(maxsize=REACH_CACHE_SIZE)
+def reachable(cards: Tuple[int, ...]) -> Dict[Rational, Step]:
+    if len(cards) == 1:
+        return {(cards[0], 1): None}
+    values: Dict[Rational, Step] = {}
+    for left, right in _split(cards):
+        right_values = reachable(right)
+        for a in reachable(left):
+            for b in right_values:
+                for value, symbol, swapped in _combine(a, b):
+                    if value not in values:
+                        values[value] = (symbol, swapped, left, a, right, b)
+    return values
+
+
+def render(cards: Tuple[int, ...], value: Rational, top: bool = True) -> str:
+    step = reachable(cards)[value]
+    if step is None:
+        return str(cards[0])
+    symbol, swapped, left, a, right, b = step
+    return _join(symbol, swapped, render(left, a, False), render(right, b, False), top)
+
+
+def _join(symbol: str, swapped: bool, a_text: str, b_text: str, top: bool) -> str:
+    text = f"{b_text}{symbol}{a_text}" if swapped else f"{a_text}{symbol}{b_text}"
+    return text if top else f"({text})"
+
+
+def _needed(target: Rational, a: Rational) -> Iterator[Tuple[Rational, str, bool]]:
+    tn, td = target
+    an, ad = a
+    yield rational((tn * ad - an * td, td * ad)), "+", False
+    yield rational((an * td - tn * ad, ad * td)), "-", False
+    yield rational((tn * ad + an * td, td * ad)), "-", True
+    if an:
+        yield rational((tn * ad, td * an)), "*", False
+    if tn:
+        yield rational((an * td, ad * tn)), "/", False
+    if an:
+        yield rational((an * tn, ad * td)), "/", True
+
+
+def _partners(target: Rational, a: Rational, values: Iterable[Rational]) -> Iterator[Tuple[Rational, str, bool]]:
+    for b, symbol, swapped in _needed(target, a):
+        if b in values and not (symbol == "/" and not b[0] and not swapped):
+            yield b, symbol, swapped
+    if not a[0] and not target[0]:
+        for b in values:
+            yield b, "*", False
+            if b[0]:
+                yield b, "/", False
+
+
+def solve(cards: Iterable[int], target: Target = 24) -> Optional[str]:
+    cards = tuple(sorted(cards))
+    if not cards or len(cards) > MAX_CARDS:
+        raise ValueError("card_count")
+    goal = rational(target)
+    if len(cards) == 1:
+        return str(cards[0]) if (cards[0], 1) == goal else None
+    for left, right in _split(cards):
+        right_values = reachable(right)
+        for a in reachable(left):
+            for b, symbol, swapped in _partners(goal, a, right_values):
+                return _join(symbol, swapped, render(left, a, False), render(right, b, False), True)
+    return None
+
+
+def solvable(cards: Iterable[int], target: Target = 24) -> bool:
+    return solve(cards, target) is not None
+
+
+Expr = tuple
+ZERO = (0, 1)
+ONE = (1, 1)
+
+
+def _value(symbol: str, a: Rational, b: Rational) -> Optional[Rational]:
+    an, ad = a
+    bn, bd = b
+    if symbol == "+":
+        return rational((an * bd + bn * ad, ad * bd))
+    if symbol == "-":
+        return rational((an * bd - bn * ad, ad * bd))
+    if symbol == "*":
+        return rational((an * bn, ad * bd))
+    if not bn:
+        return None
+    return rational((an * bd, ad * bn))
+
+
+def _merge(symbol: str, a: Expr, b: Expr, value: Rational) -> Expr:
+    kind, neutral = ("+", ZERO) if symbol in "+-" else ("*", ONE)
+    a_up, a_down = (a[3], a[4]) if a[2] == kind else ((a,), ())
+    b_up, b_down = (b[3], b[4]) if b[2] == kind else ((b,), ())
+    if symbol in "+*":
+        up, down = a_up + b_up, a_down + b_down
+    else:
+        up, down = a_up + b_down, a_down + b_up
+    if down and any(term[1] == neutral for term in down):
+        up += tuple(term for term in down if term[1] == neutral)
+        down = tuple(term for term in down if term[1] != neutral)
+    up = tuple(sorted(up))
+    down = tuple(sorted(down))
+    return (kind, tuple(term[0] for term in up), tuple(term[0] for term in down)), value, kind, up, down
+
+
+@lru_cache(maxsize=REACH_CACHE_SIZE)
+def forms(cards: Tuple[int, ...]) -> Dict[Rational, Dict[tuple, Expr]]:
+    if len(cards) == 1:
+        leaf = (("#", cards[0]), (cards[0], 1), "#", (), ())
+        return {leaf[1]: {leaf[0]: leaf}}
+    result: Dict[Rational, Dict[tuple, Expr]] = {}
+    for left, right in _split(cards):
+        right_forms = forms(right)
+        for a_value, a_exprs in forms(left).items():
+            for b_value, b_exprs in right_forms.items():
+                for symbol, first, second in (
+                    ("+", a_value, b_value),
+                    ("*", a_value, b_value),
+                    ("-", a_value, b_value),
+                    ("-", b_value, a_value),
+                    ("/", a_value, b_value),
+                    ("/", b_value, a_value),
+                ):
+                    value = _value(symbol, first, second)
+                    if value is None:
+                        continue
+                    bucket = result.setdefault(value, {})
+                    swapped = first is not a_value
+                    for a in a_exprs.values():
+                        for b in b_exprs.values():
+                            expr = _merge(symbol, b, a, value) if swapped else _merge(symbol, a, b, value)
+                            bucket.setdefault(expr[0], expr)
+    return result
+
+
+def render_form(expr: Expr, top: bool = True) -> str:
+    kind = expr[2]
+    if kind == "#":
+        return str(expr[0][1])
+    if kind == "+":
+        text = "+".join(render_form(term, False) for term in expr[3])
+        text += "".join(f"-{render_form(term, False)}" for term in expr[4])
+        return text if top else f"({text})"
+    text = "*".join(render_form(term, False) for term in expr[3])
+    text += "".join(f"/{render_form(term, False)}" for term in expr[4])
+    return text
+
+
+def solution_forms(cards: Iterable[int], target: Target = 24) -> List[Expr]:
+    cards = tuple(sorted(cards))
+    if not cards or len(cards) > MAX_CARDS:
+        raise ValueError("card_count")
+    goal = rational(target)
+    if len(cards) == 1:
+        leaf = forms(cards)
+        return list(leaf[goal].values()) if goal in leaf else []
+    found: Dict[tuple, Expr] = {}
+    for left, right in _split(cards):
+        right_forms = forms(right)
+        for a_value, a_exprs in forms(left).items():
+            for b_value, symbol, swapped in _partners(goal, a_value, right_forms):
+                b_exprs = right_forms[b_value]
+                for a in a_exprs.values():
+                    for b in b_exprs.values():
+                        expr = _merge(symbol, b, a, goal) if swapped else _merge(symbol, a, b, goal)
+                        found.setdefault(expr[0], expr)
+    return list(found.values())
+
+
+def solutions(cards: Iterable[int], target: Target = 24) -> List[str]:
+    return [render_form(expr) for expr in solution_forms(cards, target)]
@@ -0,0 +1,67 @@
+import re
+import sys
+import unittest
+from fractions import Fraction
+from itertools import combinations_with_replacement
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from solver import solutions, solvable, solve  # noqa: E402
+
+TARGETS = (0, 1, 2, 5, 10, 24, Fraction(1, 2), -3)
+
+
+def brute_reachable(values: tuple) -> set:
+    if len(values) == 1:
+        return {values[0]}
+    found = set()
+    for i in range(len(values)):
+        for j in range(i + 1, len(values)):
+            rest = values[:i] + values[i + 1:j] + values[j + 1:]
+            a, b = values[i], values[j]
+            results = {a + b, a - b, b - a, a * b}
+            if b:
+                results.add(a / b)
+            if a:
+                results.add(b / a)
+            for value in results:
+                found |= brute_reachable(rest + (value,))
+    return found
+
+
+def evaluate(text: str) -> Fraction:
+    exact = re.sub(r"\d+", lambda match: f"Fraction({match.group()})", text)
+    return eval(exact, {"__builtins__": {}, "Fraction": Fraction})
+
+
+class SolverCrossCheckTest(unittest.TestCase):
+    def test_matches_brute_force(self) -> None:
+        for count in (1, 2, 3):
+            for cards in combinations_with_replacement(range(0, 5), count):
+                reachable = brute_reachable(tuple(Fraction(card) for card in cards))
+                for target in TARGETS:
+                    expected = Fraction(target) in reachable
+                    with self.subTest(cards=cards, target=target):
+                        self.assertEqual(solvable(cards, target), expected)
+                        found = solutions(cards, target)
+                        self.assertEqual(bool(found), expected)
+                        for text in [solve(cards, target)] * expected + found:
+                            self.assertEqual(evaluate(text), target)
+
+    def test_four_card_hands_agree_with_brute_force(self) -> None:
+        for cards in combinations_with_replacement(range(0, 7), 4):
+            reachable = brute_reachable(tuple(Fraction(card) for card in cards))
+            for target in (0, 24):
+                with self.subTest(cards=cards, target=target):
+                    self.assertEqual(solvable(cards, target), Fraction(target) in reachable)
+
+    def test_zero_card_reaches_zero_target(self) -> None:
+        self.assertEqual(solve((0, 5), 0), "0*5")
+        self.assertIn("0*5", solutions((0, 5), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from tokens import load_secret, read_puzzle, sign_puzzle  # noqa: E402
+
+KEY = b"k" * 32
+
+
+class PuzzleTokenTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        token = sign_puzzle(KEY, 412, [8, 3, 8, 3])
+        self.assertEqual(read_puzzle(KEY, token), (412, [8, 3, 8, 3]))
+
+    def test_nonce_makes_tokens_distinct(self) -> None:
+        self.assertNotEqual(sign_puzzle(KEY, 7, [1, 2, 3, 4]), sign_puzzle(KEY, 7, [1, 2, 3, 4]))
+
+    def test_tampered_token_is_rejected(self) -> None:
+        token = sign_puzzle(KEY, 412, [8, 3, 8, 3])
+        for index in range(len(token)):
+            swapped = "A" if token[index] != "A" else "B"
+            tampered = token[:index] + swapped + token[index + 1:]
+            self.assertIsNone(read_puzzle(KEY, tampered), index)
+        self.assertIsNone(read_puzzle(b"x" * 32, token))
+
+    def test_truncated_token_is_rejected(self) -> None:
+        token = sign_puzzle(KEY, 412, [8, 3, 8, 3])
+        for end in range(len(token)):
+            self.assertIsNone(read_puzzle(KEY, token[:end]), end)
+        self.assertIsNone(read_puzzle(KEY, "!!!"))
+
+    def test_secret_file_is_stable(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nested" / "token.key"
+            first = load_secret(path)
+            self.assertEqual(len(first), 32)
+            self.assertEqual(load_secret(path), first)
+
+
+class ResolvePuzzleTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.environ["TWENTYFOUR_TABLE_PATH"] = str(Path(cls._tmp.name) / "hands.json")
+        os.environ["TWENTYFOUR_TOKEN_KEY_PATH"] = str(Path(cls._tmp.name) / "token.key")
+        spec = importlib.util.spec_from_file_location("xuebao_24game_test", APP_DIR / "main.py")
+        cls.main = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.main)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def test_dealt_token_resolves_to_its_hand(self) -> None:
+        data = self.main.build_game_data()
+        hand, numbers = self.main.resolve_puzzle(data["token"])
+        self.assertEqual(numbers, data["numbers"])
+        self.assertEqual(list(hand.cards), sorted(numbers))
+
+    def test_hand_and_numbers_mismatch_is_rejected(self) -> None:
+        hand = self.main.hand_table().get([3, 3, 8, 8])
+        secret = self.main.token_secret()
+        self.assertIsNotNone(self.main.resolve_puzzle(sign_puzzle(secret, hand.id, [8, 3, 8, 3])))
+        self.assertIsNone(self.main.resolve_puzzle(sign_puzzle(secret, hand.id, [1, 2, 3, 4])))
+        self.assertIsNone(self.main.resolve_puzzle(sign_puzzle(secret, 60000, [8, 3, 8, 3])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+TAG_BYTES = 12
+NONCE_BYTES = 4
+HEADER = struct.Struct(">HB")
+SECRET_BYTES = 32
+
+
+def load_secret(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    secret = secrets.token_bytes(SECRET_BYTES)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return path.read_bytes()
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(secret)
+    return secret
+
+
+def _tag(key: bytes, body: bytes) -> bytes:
+    return hmac.new(key, body, hashlib.sha256).digest()[:TAG_BYTES]
+
+
+def sign_puzzle(key: bytes, hand_id: int, cards: List[int]) -> str:
+    body = HEADER.pack(hand_id, len(cards)) + bytes(cards) + secrets.token_bytes(NONCE_BYTES)
+    return base64.urlsafe_b64encode(body + _tag(key, body)).rstrip(b"=").decode("ascii")
+
+
+def read_puzzle(key: bytes, token: str) -> Optional[Tuple[int, List[int]]]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) < HEADER.size + NONCE_BYTES + TAG_BYTES:
+        return None
+    body, tag = raw[:-TAG_BYTES], raw[-TAG_BYTES:]
+    if not hmac.compare_digest(_tag(key, body), tag):
+        return None
+    hand_id, count = HEADER.unpack_from(body)
+    if len(body) != HEADER.size + count + NONCE_BYTES:
+        return None
+    return hand_id, list(body[HEADER.size:HEADER.size + count])
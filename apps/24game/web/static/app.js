@@ -56,6 +56,15 @@
     }
   });
 
+  document.addEventListener("change", (event) => {
+    const select = event.target.closest("#level");
+    if (!select || !window.htmx) return;
+    htmx.ajax("POST", `${select.dataset.base}/new?level=${encodeURIComponent(select.value)}`, {
+      target: "#game",
+      swap: "outerHTML",
+    });
+  });
+
   document.addEventListener("htmx:afterSwap", (event) => {
     if (!event.target) return;
     if (event.target.id === "game") {
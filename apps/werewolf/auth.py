@@ -1,10 +1,17 @@
+import asyncio
+import functools
 import hashlib
+import hmac
+import os
 import secrets
 import sqlite3
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = Path("data") / "werewolf"
@@ -19,11 +26,52 @@ PBKDF2_ITERS = 200_000
 STATUS_PENDING = "pending"
 STATUS_ACTIVE = "active"
 STATUS_DISABLED = "disabled"
+DB_THREADS = 4
+DB_BUSY_TIMEOUT_MS = 5000
+DB_STATEMENT_CACHE = 64
+KDF_THREADS = max(1, min(4, os.cpu_count() or 1))
+KDF_MAX_PENDING = 64
+LOGIN_CACHE_SIZE = 1024
+LOGIN_CACHE_TTL_SECONDS = 10 * 60
+USER_CACHE_SIZE = 4096
+USER_CACHE_TTL_SECONDS = 30
+
+T = TypeVar("T")
+
+_local = threading.local()
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="werewolf-db")
+_kdf_executor = ThreadPoolExecutor(max_workers=KDF_THREADS, thread_name_prefix="werewolf-kdf")
+_kdf_pending = 0
+_login_cache: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+_LOGIN_CACHE_KEY = secrets.token_bytes(32)
+_user_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+_user_cache_version = 0
+_user_cache_counts = {"hits": 0, "misses": 0, "expired": 0, "invalidations": 0}
+
+
+class AuthBusy(RuntimeError):
+    pass
 
 
 def _connect() -> sqlite3.Connection:
+    path = str(DB_PATH)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == path:
+        return conn
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(path, cached_statements=DB_STATEMENT_CACHE)
+    conn.execute("pragma journal_mode=wal")
+    conn.execute("pragma synchronous=normal")
+    conn.execute(f"pragma busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    _local.conn = conn
+    _local.path = path
+    return conn
+
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
 
 
 def init_db() -> None:
@@ -78,6 +126,77 @@ def _hash_password(password: str, salt: str, iterations: int) -> str:
     return derived.hex()
 
 
+async def hash_password(password: str, salt: str, iterations: int) -> str:
+    global _kdf_pending
+    if _kdf_pending >= KDF_MAX_PENDING:
+        raise AuthBusy("kdf_busy")
+    _kdf_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_kdf_executor, _hash_password, password, salt, iterations)
+    finally:
+        _kdf_pending -= 1
+
+
+def _secret_digest(secret: str) -> str:
+    return hmac.new(_LOGIN_CACHE_KEY, secret.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _login_cached(key: Tuple[str, str], password_hash: str) -> bool:
+    entry = _login_cache.get(key)
+    if entry is None:
+        return False
+    cached_hash, expires_at = entry
+    if expires_at <= time.time() or cached_hash != password_hash:
+        _login_cache.pop(key, None)
+        return False
+    _login_cache.move_to_end(key)
+    return True
+
+
+def _remember_login(key: Tuple[str, str], password_hash: str) -> None:
+    _login_cache[key] = (password_hash, time.time() + LOGIN_CACHE_TTL_SECONDS)
+    _login_cache.move_to_end(key)
+    while len(_login_cache) > LOGIN_CACHE_SIZE:
+        _login_cache.popitem(last=False)
+
+
+def _invalidate_user(user_id: str) -> None:
+    global _user_cache_version
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+        _user_cache_version += 1
+        _user_cache_counts["invalidations"] += 1
+
+
+async def get_user(user_id: str) -> Optional[dict]:
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+        if cached is not None and cached[1] > time.time():
+            _user_cache.move_to_end(user_id)
+            _user_cache_counts["hits"] += 1
+            return dict(cached[0])
+        if cached is not None:
+            _user_cache.pop(user_id, None)
+            _user_cache_counts["expired"] += 1
+        _user_cache_counts["misses"] += 1
+        version = _user_cache_version
+    user = await run_db(get_user_by_id, user_id)
+    if user is None:
+        return None
+    with _user_cache_lock:
+        if version == _user_cache_version:
+            _user_cache[user_id] = (dict(user), time.time() + USER_CACHE_TTL_SECONDS)
+            while len(_user_cache) > USER_CACHE_SIZE:
+                _user_cache.popitem(last=False)
+    return user
+
+
+def user_cache_stats() -> dict:
+    with _user_cache_lock:
+        return {"size": len(_user_cache), "capacity": USER_CACHE_SIZE, **_user_cache_counts}
+
+
 def _validate_username(username: str) -> Optional[str]:
     cleaned = username.strip()
     if not cleaned:
@@ -106,7 +225,7 @@ def validate_qq_uin(qq_uin: str) -> Optional[str]:
     return _validate_qq_uin(qq_uin)
 
 
-def provision_user(qq_uin: str, display_name: Optional[str] = None) -> dict:
+def _provision_args(qq_uin: str, display_name: Optional[str]) -> Tuple[str, str]:
     error = _validate_qq_uin(qq_uin)
     if error:
         raise ValueError(error)
@@ -117,32 +236,39 @@ def provision_user(qq_uin: str, display_name: Optional[str] = None) -> dict:
             desired_name = ""
     if not desired_name:
         desired_name = f"玩家{cleaned[-4:]}"
+    return cleaned, desired_name
+
 
+def _provision_existing(cleaned: str, desired_name: str) -> Optional[dict]:
     with _connect() as conn:
         row = conn.execute(
             "select id, username, secret_value, status from users where qq_uin = ?",
             (cleaned,),
         ).fetchone()
-        if row:
-            user_id, current_name, secret_value, status = row
-            if status == STATUS_DISABLED:
-                raise ValueError("user_disabled")
-            if desired_name and desired_name != current_name:
-                conn.execute("update users set username = ? where id = ?", (desired_name, user_id))
-                current_name = desired_name
-            return {
-                "id": user_id,
-                "qq_uin": cleaned,
-                "username": current_name,
-                "status": status,
-                "secret": secret_value,
-            }
-
-        secret = secrets.token_urlsafe(16)
-        salt = secrets.token_hex(8)
-        password_hash = _hash_password(secret, salt, PBKDF2_ITERS)
-        user_id = uuid.uuid4().hex
-        created_at = int(time.time())
+        if not row:
+            return None
+        user_id, current_name, secret_value, status = row
+        if status == STATUS_DISABLED:
+            raise ValueError("user_disabled")
+        renamed = bool(desired_name and desired_name != current_name)
+        if renamed:
+            conn.execute("update users set username = ? where id = ?", (desired_name, user_id))
+            current_name = desired_name
+    if renamed:
+        _invalidate_user(user_id)
+    return {
+        "id": user_id,
+        "qq_uin": cleaned,
+        "username": current_name,
+        "status": status,
+        "secret": secret_value,
+    }
+
+
+def _provision_insert(cleaned: str, desired_name: str, secret: str, salt: str, password_hash: str) -> dict:
+    user_id = uuid.uuid4().hex
+    created_at = int(time.time())
+    with _connect() as conn:
         conn.execute(
             "insert into users (id, qq_uin, username, secret_value, password_hash, salt, iterations, "
             "status, avatar_filename, created_at, secret_issued_at) "
@@ -161,13 +287,42 @@ def provision_user(qq_uin: str, display_name: Optional[str] = None) -> dict:
                 created_at,
             ),
         )
-        return {
-            "id": user_id,
-            "qq_uin": cleaned,
-            "username": desired_name,
-            "status": STATUS_PENDING,
-            "secret": secret,
-        }
+    _invalidate_user(user_id)
+    return {
+        "id": user_id,
+        "qq_uin": cleaned,
+        "username": desired_name,
+        "status": STATUS_PENDING,
+        "secret": secret,
+    }
+
+
+def provision_user(qq_uin: str, display_name: Optional[str] = None) -> dict:
+    cleaned, desired_name = _provision_args(qq_uin, display_name)
+    existing = _provision_existing(cleaned, desired_name)
+    if existing:
+        return existing
+    secret = secrets.token_urlsafe(16)
+    salt = secrets.token_hex(8)
+    password_hash = _hash_password(secret, salt, PBKDF2_ITERS)
+    return _provision_insert(cleaned, desired_name, secret, salt, password_hash)
+
+
+async def provision(qq_uin: str, display_name: Optional[str] = None) -> dict:
+    cleaned, desired_name = _provision_args(qq_uin, display_name)
+    existing = await run_db(_provision_existing, cleaned, desired_name)
+    if existing:
+        return existing
+    secret = secrets.token_urlsafe(16)
+    salt = secrets.token_hex(8)
+    password_hash = await hash_password(secret, salt, PBKDF2_ITERS)
+    try:
+        return await run_db(_provision_insert, cleaned, desired_name, secret, salt, password_hash)
+    except sqlite3.IntegrityError:
+        existing = await run_db(_provision_existing, cleaned, desired_name)
+        if existing is None:
+            raise
+        return existing
 
 
 def confirm_user(qq_uin: str) -> dict:
@@ -191,36 +346,66 @@ def confirm_user(qq_uin: str) -> dict:
                 "update users set status = ?, secret_confirmed_at = ? where qq_uin = ?",
                 (STATUS_ACTIVE, now, cleaned),
             )
-        return {"id": user_id, "qq_uin": cleaned, "status": STATUS_ACTIVE}
+    _invalidate_user(user_id)
+    return {"id": user_id, "qq_uin": cleaned, "status": STATUS_ACTIVE}
 
 
-def authenticate_by_qq(qq_uin: str, secret: str) -> Optional[dict]:
+def _login_args(qq_uin: str, secret: str) -> str:
     error = _validate_qq_uin(qq_uin)
     if error:
         raise ValueError(error)
-    cleaned = qq_uin.strip()
     if not secret:
         raise ValueError("empty_secret")
+    return qq_uin.strip()
+
+
+def _login_row(cleaned: str) -> Optional[tuple]:
     with _connect() as conn:
         row = conn.execute(
             "select id, qq_uin, username, password_hash, salt, iterations, status, avatar_filename "
             "from users where qq_uin = ?",
             (cleaned,),
         ).fetchone()
-        if not row:
-            return None
-        user_id, qq_uin_value, name, password_hash, salt, iterations, status, avatar_filename = row
-        if status != STATUS_ACTIVE:
-            return None
-        if _hash_password(secret, salt, iterations) != password_hash:
-            return None
+    if not row or row[6] != STATUS_ACTIVE:
+        return None
+    return row
+
+
+def _record_login(row: tuple) -> dict:
+    user_id, qq_uin_value, name, _, _, _, _, avatar_filename = row
+    with _connect() as conn:
         conn.execute("update users set last_login_at = ? where id = ?", (int(time.time()), user_id))
-        return {
-            "id": user_id,
-            "qq_uin": qq_uin_value,
-            "username": name,
-            "avatar_filename": avatar_filename,
-        }
+    return {
+        "id": user_id,
+        "qq_uin": qq_uin_value,
+        "username": name,
+        "avatar_filename": avatar_filename,
+    }
+
+
+def authenticate_by_qq(qq_uin: str, secret: str) -> Optional[dict]:
+    cleaned = _login_args(qq_uin, secret)
+    row = _login_row(cleaned)
+    if not row:
+        return None
+    _, _, _, password_hash, salt, iterations, _, _ = row
+    if _hash_password(secret, salt, iterations) != password_hash:
+        return None
+    return _record_login(row)
+
+
+async def authenticate(qq_uin: str, secret: str) -> Optional[dict]:
+    cleaned = _login_args(qq_uin, secret)
+    row = await run_db(_login_row, cleaned)
+    if not row:
+        return None
+    _, _, _, password_hash, salt, iterations, _, _ = row
+    cache_key = (cleaned, _secret_digest(secret))
+    if not _login_cached(cache_key, password_hash):
+        if await hash_password(secret, salt, iterations) != password_hash:
+            return None
+        _remember_login(cache_key, password_hash)
+    return await run_db(_record_login, row)
 
 
 def get_user_by_id(user_id: str) -> Optional[dict]:
@@ -258,11 +443,13 @@ def update_display_name(user_id: str, display_name: str) -> None:
         raise ValueError(error)
     with _connect() as conn:
         conn.execute("update users set username = ? where id = ?", (display_name.strip(), user_id))
+    _invalidate_user(user_id)
 
 
 def update_avatar(user_id: str, filename: str) -> None:
     with _connect() as conn:
         conn.execute("update users set avatar_filename = ? where id = ?", (filename, user_id))
+    _invalidate_user(user_id)
 
 
 def avatar_url(base_path: str, avatar_filename: Optional[str]) -> Optional[str]:
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    from PIL import Image, ImageOps
+except ModuleNotFoundError as e:
+    # Optional dependency (Pillow). Without it avatars are stored as uploaded, still content-addressed.
+    if e.name != "PIL":
+        raise
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger("werewolf")
+
+AVATAR_SIZE = 160
+AVATAR_QUALITY = 82
+MAX_AVATAR_PIXELS = 40_000_000
+UPLOAD_CHUNK_BYTES = 64 * 1024
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+ALLOWED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif"}
+SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": ".png",
+    b"\xff\xd8\xff": ".jpg",
+    b"GIF87a": ".gif",
+    b"GIF89a": ".gif",
+}
+HASHED_NAME = re.compile(r"^[0-9a-f]{40}\.(webp|png|jpg|gif)$")
+
+
+class AvatarError(ValueError):
+    pass
+
+
+def is_content_addressed(filename: str) -> bool:
+    return bool(HASHED_NAME.match(filename))
+
+
+def _sniff_extension(path: Path) -> Optional[str]:
+    with path.open("rb") as handle:
+        head = handle.read(8)
+    for signature, ext in SIGNATURES.items():
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+def _store(directory: Path, data: bytes, ext: str) -> str:
+    name = f"{hashlib.sha256(data).hexdigest()[:40]}{ext}"
+    target = directory / name
+    if not target.exists():
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, target)
+    return name
+
+
+def _thumbnail(path: Path) -> bytes:
+    try:
+        with Image.open(path) as image:
+            if image.width * image.height > MAX_AVATAR_PIXELS:
+                raise AvatarError("avatar_invalid")
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+            image = ImageOps.fit(image, (AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, format="WEBP", quality=AVATAR_QUALITY, method=6)
+            return output.getvalue()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise AvatarError("avatar_invalid") from exc
+
+
+def warn_if_unprocessed() -> None:
+    if Image is None:
+        logger.warning("Pillow is not installed; avatars are stored and served at their uploaded size")
+
+
+def _process(directory: Path, path: Path) -> str:
+    ext = _sniff_extension(path)
+    if ext is None:
+        raise AvatarError("avatar_invalid")
+    if Image is None:
+        return _store(directory, path.read_bytes(), ext)
+    return _store(directory, _thumbnail(path), ".webp")
+
+
+async def save_upload(upload: UploadFile, directory: Path, max_bytes: int) -> str:
+    ext = Path((upload.filename or "").lower()).suffix
+    if ext not in ALLOWED_EXTENSIONS:
+        raise AvatarError("avatar_type")
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".upload")
+    path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            size = 0
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AvatarError("avatar_too_large")
+                await asyncio.to_thread(handle.write, chunk)
+        return await asyncio.to_thread(_process, directory, path)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def remove_replaced(directory: Path, filename: Optional[str]) -> None:
+    if not filename or is_content_addressed(filename) or Path(filename).name != filename:
+        return
+    (directory / filename).unlink(missing_ok=True)
+
+
+class AvatarFiles(StaticFiles):
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        name = os.path.basename(full_path)
+        if not is_content_addressed(name):
+            response.headers["cache-control"] = "no-cache"
+            return response
+        response.headers["cache-control"] = IMMUTABLE_CACHE
+        if isinstance(response, NotModifiedResponse):
+            return response
+        response.headers["etag"] = f'"{name.partition(".")[0]}"'
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
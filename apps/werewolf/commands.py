@@ -0,0 +1,63 @@
+import json
+from typing import Optional
+
+from .enum import Phase, Role
+from .web_engine import GameRoom
+
+JOIN_ERRORS = {
+    "name_taken": "昵称已被占用。",
+    "name_invalid": "昵称不合法，请输入 1-12 个字符。",
+    "room_full": "房间已满。",
+}
+
+
+def apply_command(room: GameRoom, command: dict) -> Optional[str]:
+    room.clock = command.get("ts")
+    try:
+        return _apply(room, command)
+    finally:
+        room.clock = None
+
+
+def _apply(room: GameRoom, command: dict) -> Optional[str]:
+    op = command["op"]
+    if op == "join":
+        try:
+            player = room.add_player(
+                command["name"],
+                avatar_url=command.get("avatar_url"),
+                owner_id=command.get("owner_id"),
+                player_id=command.get("player_id"),
+            )
+        except ValueError as exc:
+            return json.dumps({"type": "error", "message": JOIN_ERRORS.get(str(exc), "加入失败。")})
+        return json.dumps({"type": "joined", "player_id": player.id})
+    if op == "leave":
+        room.remove_player(command["player_id"])
+    elif op == "start":
+        if command.get("mode"):
+            room.set_mode(command["mode"])
+        was_lobby = room.phase == Phase.LOBBY
+        roles = command.get("roles")
+        room.start_game([Role[name] for name in roles] if roles else None)
+        if was_lobby and room.phase != Phase.LOBBY and not roles:
+            command["roles"] = [player.role.name for player in room.players.values()]
+    elif op == "reset":
+        room.reset()
+    elif op == "advance":
+        room.advance()
+    elif op == "tick":
+        room.maybe_auto_advance()
+    elif op == "action":
+        ok, result = room.record_action(
+            command.get("owner_id"),
+            command.get("player_id", ""),
+            command.get("action", ""),
+            command.get("target_id"),
+            command.get("target_id_2"),
+            command.get("text"),
+        )
+        if ok:
+            room.add_log(result)
+        return json.dumps({"type": "action_result", "ok": ok, "message": result})
+    return None
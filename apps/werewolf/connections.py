@@ -0,0 +1,200 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .sync import ViewerSync
+from .wire import HELLO, encode_text
+from .web_engine import GameRoom
+
+MAX_PENDING_MESSAGES = 32
+OVERFLOW_CLOSE_CODE = 1013
+
+_broadcast_counts = {"mutations": 0, "broadcasts": 0, "phase_flushes": 0}
+
+
+def broadcast_stats() -> dict:
+    counts = dict(_broadcast_counts)
+    counts["coalesced"] = counts["mutations"] - counts["broadcasts"]
+    return counts
+
+
+class RoomChannel:
+    def __init__(self, room_id: str, room: GameRoom, window: float = 0.0) -> None:
+        self.room_id = room_id
+        self.room = room
+        self.window = window
+        self.mutations = 0
+        self.broadcasts = 0
+        self._flushed_phase = (room.phase, room.day_count)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.connections: Dict[str, "Connection"] = {}
+        self._delta_cache: Dict[tuple, tuple] = {}
+        self._delta_public: Optional[dict] = None
+        self._encoded: Dict[str, bytes] = {}
+        self._encoded_public: Optional[dict] = None
+
+    def delta_cache(self) -> Dict[tuple, tuple]:
+        public = self.room.public_payload()
+        if public is not self._delta_public:
+            self._delta_cache = {}
+            self._delta_public = public
+        return self._delta_cache
+
+    def encode(self, text: str) -> bytes:
+        public = self.room.public_payload()
+        if public is not self._encoded_public:
+            self._encoded = {}
+            self._encoded_public = public
+        data = self._encoded.get(text)
+        if data is None:
+            data = self._encoded[text] = encode_text(text)
+        return data
+
+    def add(self, connection: "Connection") -> None:
+        self.connections[connection.id] = connection
+
+    def discard(self, connection: "Connection") -> None:
+        self.connections.pop(connection.id, None)
+
+    def broadcast(self) -> None:
+        self.mutations += 1
+        _broadcast_counts["mutations"] += 1
+        if self.window <= 0:
+            self.flush()
+        elif (self.room.phase, self.room.day_count) != self._flushed_phase:
+            _broadcast_counts["phase_flushes"] += 1
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._flushed_phase = (self.room.phase, self.room.day_count)
+        self.broadcasts += 1
+        _broadcast_counts["broadcasts"] += 1
+        for connection in list(self.connections.values()):
+            connection.mark_dirty()
+
+    def cancel(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "mutations": self.mutations,
+            "broadcasts": self.broadcasts,
+            "pending": self._flush_handle is not None,
+        }
+
+
+class Connection:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        channel: RoomChannel,
+        user_id: Optional[str],
+        max_pending: int = MAX_PENDING_MESSAGES,
+        binary: bool = False,
+    ) -> None:
+        self.id = str(id(websocket))
+        self.websocket = websocket
+        self.channel = channel
+        self.user_id = user_id
+        self.sync = ViewerSync(user_id)
+        self.max_pending = max_pending
+        self.binary = binary
+        self.outbox: Deque[str] = deque()
+        self.state_dirty = False
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def room(self) -> GameRoom:
+        return self.channel.room
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._run())
+
+    def send(self, text: str) -> bool:
+        if self.closed:
+            return False
+        if len(self.outbox) >= self.max_pending:
+            self.abort()
+            return False
+        self.outbox.append(text)
+        self._notify()
+        return True
+
+    def send_snapshot(self) -> bool:
+        return self.send(self.sync.snapshot(self.room))
+
+    def send_resume(self, epoch: Optional[int], since: Optional[int]) -> bool:
+        return self.send(self.sync.resume(self.room, epoch, since))
+
+    def mark_dirty(self) -> None:
+        if self.closed:
+            return
+        self.state_dirty = True
+        self._notify()
+
+    async def wait_idle(self) -> None:
+        await self._idle.wait()
+
+    def abort(self) -> None:
+        if self.closed:
+            return
+        self.close()
+        asyncio.create_task(self._close_socket(OVERFLOW_CLOSE_CODE))
+
+    def close(self) -> None:
+        self.closed = True
+        self.channel.discard(self)
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._idle.set()
+
+    def _notify(self) -> None:
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except (RuntimeError, OSError, WebSocketDisconnect):
+            pass
+
+    async def _send(self, text: str) -> None:
+        if self.binary:
+            await self.websocket.send_bytes(self.channel.encode(text))
+        else:
+            await self.websocket.send_text(text)
+
+    async def _run(self) -> None:
+        try:
+            if self.binary:
+                await self.websocket.send_text(HELLO)
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.outbox:
+                    await self._send(self.outbox.popleft())
+                if self.state_dirty:
+                    self.state_dirty = False
+                    message = self.sync.delta(self.room, self.channel.delta_cache())
+                    if message is not None:
+                        await self._send(message)
+                if not self.outbox and not self.state_dirty:
+                    self._idle.set()
+        except (RuntimeError, OSError, WebSocketDisconnect):
+            self.close()
+        except asyncio.CancelledError:
+            pass
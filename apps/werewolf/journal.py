@@ -0,0 +1,206 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from .commands import apply_command
+from .web_engine import GameRoom
+
+FLUSH_INTERVAL_SECONDS = 0.05
+COMPACT_AFTER_ENTRIES = 20000
+COMPACT_INTERVAL_SECONDS = 10 * 60
+
+logger = logging.getLogger("werewolf")
+
+RoomSource = Callable[[], Dict[str, GameRoom]]
+
+
+def _segment_path(directory: Path, generation: int) -> Path:
+    return directory / f"journal-{generation:08d}.log"
+
+
+def _snapshot_path(directory: Path, generation: int) -> Path:
+    return directory / f"snapshot-{generation:08d}.json"
+
+
+def _generations(directory: Path, prefix: str) -> List[int]:
+    generations = []
+    for path in directory.glob(f"{prefix}-*"):
+        stem = path.name[len(prefix) + 1 :].split(".", 1)[0]
+        if stem.isdigit() and path.suffix in (".log", ".json"):
+            generations.append(int(stem))
+    return sorted(generations)
+
+
+class Journal:
+    def __init__(
+        self,
+        directory: Path,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        compact_after_entries: int = COMPACT_AFTER_ENTRIES,
+        compact_interval: float = COMPACT_INTERVAL_SECONDS,
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.compact_after_entries = compact_after_entries
+        self.compact_interval = compact_interval
+        self.generation = 0
+        self.pending: List[bytes] = []
+        self.entries_since_compact = 0
+        self.last_compact_at = time.time()
+        self.flushes = 0
+        self.entries_written = 0
+        self._file: Optional[BinaryIO] = None
+        self._write_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._rooms: Optional[RoomSource] = None
+
+    def append(self, room_id: str, revision: int, command: dict) -> None:
+        entry = {"room": room_id, "rev": revision, "cmd": command}
+        self.pending.append(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.entries_since_compact += 1
+
+    def replay(self) -> Dict[str, GameRoom]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        rooms, self.generation = replay_directory(self.directory)
+        return rooms
+
+    def start(self, rooms: RoomSource) -> None:
+        self._rooms = rooms
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_forever())
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        await self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def flush(self) -> None:
+        async with self._write_lock:
+            await self._flush_locked()
+
+    async def compact(self, rooms: Optional[Dict[str, GameRoom]] = None) -> None:
+        if rooms is None:
+            rooms = self._rooms() if self._rooms is not None else {}
+        async with self._write_lock:
+            states = {room_id: room.to_state() for room_id, room in rooms.items()}
+            lines, self.pending = self.pending, []
+            generation = self.generation + 1
+            await asyncio.to_thread(self._write_segment, lines)
+            await asyncio.to_thread(self._write_snapshot, generation, states)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.generation = generation
+            self.entries_since_compact = len(self.pending)
+            self.last_compact_at = time.time()
+            await asyncio.to_thread(self._drop_before, generation)
+
+    async def _flush_locked(self) -> None:
+        if not self.pending:
+            return
+        lines, self.pending = self.pending, []
+        await asyncio.to_thread(self._write_segment, lines)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                due = time.time() - self.last_compact_at >= self.compact_interval
+                if self.entries_since_compact >= self.compact_after_entries or (
+                    due and self.entries_since_compact
+                ):
+                    await self.compact()
+            except Exception:
+                logger.exception("journal flush failed")
+
+    def _write_segment(self, lines: List[bytes]) -> None:
+        if not lines:
+            return
+        if self._file is None:
+            self._file = open(_segment_path(self.directory, self.generation), "ab")
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.flushes += 1
+        self.entries_written += len(lines)
+
+    def _write_snapshot(self, generation: int, states: Dict[str, dict]) -> None:
+        path = _snapshot_path(self.directory, generation)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as handle:
+            handle.write(json.dumps({"rooms": states}, ensure_ascii=False).encode("utf-8"))
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp_path.replace(path)
+
+    def _drop_before(self, generation: int) -> None:
+        for old in _generations(self.directory, "journal"):
+            if old < generation:
+                _segment_path(self.directory, old).unlink(missing_ok=True)
+        for old in _generations(self.directory, "snapshot"):
+            if old < generation:
+                _snapshot_path(self.directory, old).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "pending": len(self.pending),
+            "entries_since_compact": self.entries_since_compact,
+            "entries_written": self.entries_written,
+            "flushes": self.flushes,
+        }
+
+
+def replay_directory(directory: Path) -> Tuple[Dict[str, GameRoom], int]:
+    rooms: Dict[str, GameRoom] = {}
+    snapshots = _generations(directory, "snapshot")
+    generation = snapshots[-1] if snapshots else 0
+    if snapshots:
+        data = json.loads(_snapshot_path(directory, generation).read_text(encoding="utf-8"))
+        for room_id, state in data["rooms"].items():
+            rooms[room_id] = GameRoom.from_state(state)
+    segments = [item for item in _generations(directory, "journal") if item >= generation]
+    for segment in segments:
+        with open(_segment_path(directory, segment), "rb") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("journal %s ends with a torn entry", segment)
+                    break
+                _replay_entry(rooms, entry)
+    if segments:
+        generation = segments[-1]
+    return rooms, generation
+
+
+def _replay_entry(rooms: Dict[str, GameRoom], entry: dict) -> None:
+    room_id = entry["room"]
+    command = entry["cmd"]
+    op = command["op"]
+    if op == "state":
+        rooms[room_id] = GameRoom.from_state(command["state"])
+        return
+    if op == "evict":
+        rooms.pop(room_id, None)
+        return
+    room = rooms.get(room_id)
+    if room is None:
+        if entry["rev"] != 0:
+            return
+        room = rooms[room_id] = GameRoom()
+    if room.revision != entry["rev"]:
+        return
+    apply_command(room, command)
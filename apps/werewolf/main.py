@@ -20,14 +20,24 @@ APPS_DIR = BASE_DIR.parent
 if str(APPS_DIR) not in sys.path:
     sys.path.insert(0, str(APPS_DIR))
 
-from werewolf import auth
+from werewolf import auth, avatars
+from werewolf.connections import Connection, RoomChannel, broadcast_stats
 from werewolf.enum import Phase
+from werewolf.journal import Journal
+from werewolf.rooms import DEFAULT_IDLE_TTL_SECONDS, DEFAULT_MAX_ROOMS, RoomManager
+from werewolf.store import MemoryRoomStore, create_store
 from werewolf.web_engine import GameRoom
+from werewolf.wire import BINARY_SUBPROTOCOL, choose_subprotocol
 
 APP_SLUG = "werewolf"
 ROOT_PATH = f"/{APP_SLUG}"
 ROOM_PREFIX = f"{ROOT_PATH}/room"
 MAX_AVATAR_BYTES = 2 * 1024 * 1024
+AVATAR_ERRORS = {
+    "avatar_type": "只支持 png/jpg/gif 格式。",
+    "avatar_too_large": "头像大小不能超过 2MB。",
+    "avatar_invalid": "无法识别的图片文件。",
+}
 
 WEB_DIR = BASE_DIR / "web"
 
@@ -37,48 +47,45 @@ templates.env.auto_reload = True
 router = APIRouter(prefix=ROOT_PATH)
 
 
-class RoomManager:
-    def __init__(self) -> None:
-        self.rooms: Dict[str, GameRoom] = {}
-
-    def create_room_id(self) -> str:
-        while True:
-            room_id = uuid.uuid4().hex[:8]
-            if room_id not in self.rooms:
-                return room_id
-
-    def get_room(self, room_id: str) -> GameRoom:
-        if room_id not in self.rooms:
-            self.rooms[room_id] = GameRoom()
-        return self.rooms[room_id]
-
-
-ROOMS = RoomManager()
-CONNECTIONS: Dict[str, Dict[str, WebSocket]] = {}
-CONNECTION_USERS: Dict[str, Dict[str, Optional[str]]] = {}
+ROOM_SNAPSHOT_DIR = os.getenv("WEREWOLF_ROOM_SNAPSHOT_DIR", str(auth.DATA_DIR / "rooms"))
+JOURNAL_DIR = os.getenv("WEREWOLF_JOURNAL_DIR", str(auth.DATA_DIR / "journal"))
+SESSION_DB = os.getenv("WEREWOLF_SESSION_DB", str(auth.DATA_DIR / "sessions.db"))
+STORE = create_store(session_db=Path(SESSION_DB) if SESSION_DB else None)
+ROOMS = RoomManager(
+    STORE,
+    idle_ttl_seconds=int(os.getenv("WEREWOLF_ROOM_IDLE_TTL", str(DEFAULT_IDLE_TTL_SECONDS))),
+    max_rooms=int(os.getenv("WEREWOLF_MAX_ROOMS", str(DEFAULT_MAX_ROOMS))),
+    snapshot_dir=Path(ROOM_SNAPSHOT_DIR) if ROOM_SNAPSHOT_DIR else None,
+    is_active=lambda room_id: room_id in CONNECTIONS,
+    on_deadline=lambda room_id: ROOMS.submit(room_id, _tick_command),
+    on_commit=lambda room_id, room: _on_room_commit(room_id, room),
+    journal=Journal(Path(JOURNAL_DIR)) if JOURNAL_DIR and isinstance(STORE, MemoryRoomStore) else None,
+)
+CONNECTIONS: Dict[str, RoomChannel] = {}
 SESSION_TTL_SECONDS = 60 * 60 * 12
-SESSIONS: Dict[str, tuple[str, int]] = {}
 BOT_ID = os.getenv("WEREWOLF_BOT_ID", "")
 BOT_SECRET = os.getenv("WEREWOLF_BOT_SECRET", "")
 NONCE_TTL_SECONDS = 120
-NONCE_CACHE: Dict[str, int] = {}
+BROADCAST_WINDOW_SECONDS = int(os.getenv("WEREWOLF_BROADCAST_WINDOW_MS", "30")) / 1000
 
 
 def _now_ts() -> int:
     return int(time.time())
 
 
-def _session_user_id(token: Optional[str]) -> Optional[str]:
+async def _session_user_id(token: Optional[str]) -> Optional[str]:
     if not token:
         return None
-    record = SESSIONS.get(token)
-    if not record:
+    return await STORE.get_session(token)
+
+
+def _optional_int(value: object) -> Optional[int]:
+    if isinstance(value, bool):
         return None
-    user_id, expires_at = record
-    if expires_at <= _now_ts():
-        SESSIONS.pop(token, None)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
         return None
-    return user_id
 
 
 def _is_origin_allowed(origin: Optional[str], host: Optional[str]) -> bool:
@@ -95,13 +102,7 @@ def _is_origin_allowed(origin: Optional[str], host: Optional[str]) -> bool:
     return origin_host.lower() == host.lower()
 
 
-def _purge_nonces(now_ts: int) -> None:
-    expired = [nonce for nonce, expires_at in NONCE_CACHE.items() if expires_at <= now_ts]
-    for nonce in expired:
-        NONCE_CACHE.pop(nonce, None)
-
-
-def _verify_bot_request(request: Request, body_text: str) -> Tuple[bool, str]:
+async def _verify_bot_request(request: Request, body_text: str) -> Tuple[bool, str]:
     if not BOT_ID or not BOT_SECRET:
         return False, "bot_auth_unconfigured"
     bot_id = request.headers.get("X-Bot-Id", "")
@@ -119,20 +120,19 @@ def _verify_bot_request(request: Request, body_text: str) -> Tuple[bool, str]:
     now_ts = _now_ts()
     if abs(now_ts - ts_value) > 60:
         return False, "bot_auth_expired"
-    _purge_nonces(now_ts)
-    if nonce in NONCE_CACHE:
-        return False, "bot_auth_replay"
     message = f"{request.method}\n{request.url.path}\n{body_text}\n{timestamp}\n{nonce}"
     expected = hmac.new(BOT_SECRET.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
     if not hmac.compare_digest(expected, signature):
         return False, "bot_auth_invalid"
-    NONCE_CACHE[nonce] = now_ts + NONCE_TTL_SECONDS
+    if not await STORE.claim_nonce(nonce, NONCE_TTL_SECONDS):
+        return False, "bot_auth_replay"
     return True, ""
 
 
 def register(parent_app: FastAPI) -> None:
     auth.init_db()
     auth.AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+    avatars.warn_if_unprocessed()
     parent_app.mount(
         f"{ROOT_PATH}/assets",
         StaticFiles(directory=str(WEB_DIR / "static")),
@@ -140,23 +140,54 @@ def register(parent_app: FastAPI) -> None:
     )
     parent_app.mount(
         f"{ROOT_PATH}/avatars",
-        StaticFiles(directory=str(auth.AVATAR_DIR)),
+        avatars.AvatarFiles(directory=str(auth.AVATAR_DIR)),
         name="werewolf-avatars",
     )
     parent_app.include_router(router)
+    parent_app.add_event_handler("startup", _start_store)
+    parent_app.add_event_handler("shutdown", _stop_store)
+
 
+async def _start_store() -> None:
+    await STORE.start(_on_room_changed)
+    await ROOMS.start()
 
-def get_current_user_from_cookie(cookie_value: Optional[str]) -> Optional[dict]:
+
+async def _stop_store() -> None:
+    await ROOMS.stop()
+    await STORE.close()
+
+
+async def _on_room_changed(room_id: str, revision: int) -> None:
+    channel = CONNECTIONS.get(room_id)
+    if channel is None or channel.room.revision >= revision:
+        return
+    channel.room = await ROOMS.get_room(room_id)
+    channel.broadcast()
+
+
+def _tick_command(room: GameRoom) -> dict:
+    return {"op": "tick"}
+
+
+def _on_room_commit(room_id: str, room: GameRoom) -> None:
+    channel = CONNECTIONS.get(room_id)
+    if channel is not None:
+        channel.room = room
+        channel.broadcast()
+
+
+async def get_current_user_from_cookie(cookie_value: Optional[str]) -> Optional[dict]:
     if not cookie_value:
         return None
-    user_id = _session_user_id(cookie_value)
+    user_id = await _session_user_id(cookie_value)
     if not user_id:
         return None
-    return auth.get_user_by_id(user_id)
+    return await auth.get_user(user_id)
 
 
-def get_current_user(request: Request) -> Optional[dict]:
-    return get_current_user_from_cookie(request.cookies.get("werewolf_session"))
+async def get_current_user(request: Request) -> Optional[dict]:
+    return await get_current_user_from_cookie(request.cookies.get("werewolf_session"))
 
 
 def user_context(user: Optional[dict]) -> dict:
@@ -170,13 +201,13 @@ def user_context(user: Optional[dict]) -> dict:
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    room_id = ROOMS.create_room_id()
+    room_id = await ROOMS.create_room_id()
     return RedirectResponse(url=f"{ROOM_PREFIX}/{room_id}", status_code=303)
 
 
 @router.get("/room/{room_id}", response_class=HTMLResponse)
 async def room_view(request: Request, room_id: str):
-    user = get_current_user(request)
+    user = await get_current_user(request)
     room_path = f"{ROOM_PREFIX}/{room_id}"
     return templates.TemplateResponse(
         "index.html",
@@ -211,7 +242,19 @@ async def login(
     request: Request, qq_uin: str = Form(...), secret: str = Form(...), next: str = Form(ROOT_PATH)
 ):
     try:
-        user = auth.authenticate_by_qq(qq_uin, secret)
+        user = await auth.authenticate(qq_uin, secret)
+    except auth.AuthBusy:
+        return templates.TemplateResponse(
+            "login.html",
+            {
+                "request": request,
+                "auth_path": ROOT_PATH,
+                "asset_path": ROOT_PATH,
+                "next_path": next,
+                "error": "登录人数过多，请稍后再试。",
+            },
+            status_code=503,
+        )
     except ValueError as exc:
         error_map = {
             "empty_qq": "请输入 QQ 号。",
@@ -243,7 +286,7 @@ async def login(
             status_code=400,
         )
     session_token = secrets.token_urlsafe(32)
-    SESSIONS[session_token] = (user["id"], _now_ts() + SESSION_TTL_SECONDS)
+    await STORE.set_session(session_token, user["id"], SESSION_TTL_SECONDS)
     response = RedirectResponse(url=next or ROOT_PATH, status_code=303)
     response.set_cookie(
         "werewolf_session",
@@ -293,7 +336,7 @@ async def logout(request: Request):
     next_path = request.query_params.get("next") or ROOT_PATH
     token = request.cookies.get("werewolf_session")
     if token:
-        SESSIONS.pop(token, None)
+        await STORE.delete_session(token)
     response = RedirectResponse(url=next_path, status_code=303)
     response.delete_cookie("werewolf_session", path=ROOT_PATH)
     return response
@@ -301,7 +344,7 @@ async def logout(request: Request):
 
 @router.get("/account", response_class=HTMLResponse)
 async def account_view(request: Request):
-    user = get_current_user(request)
+    user = await get_current_user(request)
     if not user:
         return RedirectResponse(url=f"{ROOT_PATH}/login", status_code=303)
     next_path = request.query_params.get("next") or ROOT_PATH
@@ -319,35 +362,26 @@ async def account_view(request: Request):
 
 @router.post("/account/avatar")
 async def upload_avatar(request: Request, avatar: UploadFile = File(...)):
-    user = get_current_user(request)
+    user = await get_current_user(request)
     if not user:
         return RedirectResponse(url=f"{ROOT_PATH}/login", status_code=303)
-    filename = (avatar.filename or "").lower()
-    ext = Path(filename).suffix
-    if ext not in {".png", ".jpg", ".jpeg", ".gif"}:
-        return HTMLResponse(content="只支持 png/jpg/gif 格式。", status_code=400)
-    content = bytearray()
-    while True:
-        chunk = await avatar.read(64 * 1024)
-        if not chunk:
-            break
-        content.extend(chunk)
-        if len(content) > MAX_AVATAR_BYTES:
-            return HTMLResponse(content="头像大小不能超过 2MB。", status_code=400)
-    stored_name = f"{user['id']}{ext}"
-    (auth.AVATAR_DIR / stored_name).write_bytes(content)
-    auth.update_avatar(user["id"], stored_name)
+    try:
+        stored_name = await avatars.save_upload(avatar, auth.AVATAR_DIR, MAX_AVATAR_BYTES)
+    except avatars.AvatarError as exc:
+        return HTMLResponse(content=AVATAR_ERRORS[str(exc)], status_code=400)
+    await auth.run_db(auth.update_avatar, user["id"], stored_name)
+    avatars.remove_replaced(auth.AVATAR_DIR, user.get("avatar_filename"))
     next_path = request.query_params.get("next") or ROOT_PATH
     return RedirectResponse(url=f"{ROOT_PATH}/account?next={next_path}", status_code=303)
 
 
 @router.post("/account/name")
 async def update_display_name(request: Request, display_name: str = Form(...)):
-    user = get_current_user(request)
+    user = await get_current_user(request)
     if not user:
         return RedirectResponse(url=f"{ROOT_PATH}/login", status_code=303)
     try:
-        auth.update_display_name(user["id"], display_name)
+        await auth.run_db(auth.update_display_name, user["id"], display_name)
     except ValueError as exc:
         error_map = {
             "empty_username": "请输入展示名。",
@@ -375,7 +409,7 @@ async def update_display_name(request: Request, display_name: str = Form(...)):
 async def internal_provision(request: Request):
     body_bytes = await request.body()
     body_text = body_bytes.decode("utf-8") if body_bytes else ""
-    ok, error = _verify_bot_request(request, body_text)
+    ok, error = await _verify_bot_request(request, body_text)
     if not ok:
         return JSONResponse({"error": error}, status_code=401)
     try:
@@ -383,7 +417,9 @@ async def internal_provision(request: Request):
     except json.JSONDecodeError:
         return JSONResponse({"error": "bad_request"}, status_code=400)
     try:
-        result = auth.provision_user(payload.get("qq_uin", ""), payload.get("display_name"))
+        result = await auth.provision(payload.get("qq_uin", ""), payload.get("display_name"))
+    except auth.AuthBusy:
+        return JSONResponse({"error": "busy"}, status_code=503)
     except ValueError as exc:
         error_map = {
             "empty_qq": "qq_required",
@@ -407,7 +443,7 @@ async def internal_provision(request: Request):
 async def internal_confirm(request: Request):
     body_bytes = await request.body()
     body_text = body_bytes.decode("utf-8") if body_bytes else ""
-    ok, error = _verify_bot_request(request, body_text)
+    ok, error = await _verify_bot_request(request, body_text)
     if not ok:
         return JSONResponse({"error": error}, status_code=401)
     try:
@@ -415,7 +451,7 @@ async def internal_confirm(request: Request):
     except json.JSONDecodeError:
         return JSONResponse({"error": "bad_request"}, status_code=400)
     try:
-        result = auth.confirm_user(payload.get("qq_uin", ""))
+        result = await auth.run_db(auth.confirm_user, payload.get("qq_uin", ""))
     except ValueError as exc:
         error_map = {
             "empty_qq": "qq_required",
@@ -432,13 +468,13 @@ async def internal_confirm(request: Request):
 async def internal_user_status(request: Request, qq_uin: str):
     body_bytes = await request.body()
     body_text = body_bytes.decode("utf-8") if body_bytes else ""
-    ok, error = _verify_bot_request(request, body_text)
+    ok, error = await _verify_bot_request(request, body_text)
     if not ok:
         return JSONResponse({"error": error}, status_code=401)
     error = auth.validate_qq_uin(qq_uin)
     if error:
         return JSONResponse({"error": "qq_invalid"}, status_code=400)
-    user = auth.get_user_by_qq(qq_uin)
+    user = await auth.run_db(auth.get_user_by_qq, qq_uin)
     if not user:
         return JSONResponse({"status": None})
     return JSONResponse(
@@ -450,9 +486,25 @@ async def internal_user_status(request: Request, qq_uin: str):
     )
 
 
+@router.get("/internal/stats")
+async def internal_stats(request: Request):
+    body_bytes = await request.body()
+    body_text = body_bytes.decode("utf-8") if body_bytes else ""
+    ok, error = await _verify_bot_request(request, body_text)
+    if not ok:
+        return JSONResponse({"error": error}, status_code=401)
+    return JSONResponse(
+        {
+            **ROOMS.stats(),
+            "user_cache": auth.user_cache_stats(),
+            "broadcasts": {**broadcast_stats(), "window_ms": int(BROADCAST_WINDOW_SECONDS * 1000)},
+        }
+    )
+
+
 @router.get("/room/{room_id}/player/{player_id}", response_class=HTMLResponse)
 async def player_view(request: Request, room_id: str, player_id: str):
-    user = get_current_user(request)
+    user = await get_current_user(request)
     room_path = f"{ROOM_PREFIX}/{room_id}"
     return templates.TemplateResponse(
         "player.html",
@@ -469,6 +521,62 @@ async def player_view(request: Request, room_id: str, player_id: str):
     )
 
 
+ERROR_HOST_ONLY = json.dumps({"type": "error", "message": "host_only"})
+ERROR_AUTH_REQUIRED = json.dumps({"type": "error", "message": "auth_required"})
+
+
+def build_command(room: GameRoom, connection: Connection, user: Optional[dict], message: dict) -> Optional[dict]:
+    user_id = user["id"] if user else None
+    msg_type = message.get("type")
+    if msg_type == "join":
+        if not user_id:
+            connection.send(ERROR_AUTH_REQUIRED)
+        elif room.player_for_owner(user_id):
+            connection.send(json.dumps({"type": "error", "message": "already_joined"}))
+        else:
+            return {
+                "op": "join",
+                "name": message.get("display_name") or user["username"],
+                "avatar_url": auth.avatar_url(ROOT_PATH, user.get("avatar_filename")),
+                "owner_id": user_id,
+                "player_id": uuid.uuid4().hex,
+            }
+    elif msg_type == "leave":
+        player = room.player_for_owner(user_id) if user_id else None
+        if player:
+            return {"op": "leave", "player_id": player.id}
+    elif msg_type == "start":
+        if room.is_host(user_id):
+            return {"op": "start", "mode": message.get("mode")}
+        connection.send(ERROR_HOST_ONLY)
+    elif msg_type == "reset":
+        if room.is_host(user_id):
+            return {"op": "reset"}
+        connection.send(ERROR_HOST_ONLY)
+    elif msg_type == "advance":
+        if room.is_host(user_id):
+            return {"op": "advance"}
+        connection.send(ERROR_HOST_ONLY)
+    elif msg_type == "back_to_lobby":
+        if not user_id:
+            connection.send(ERROR_AUTH_REQUIRED)
+        elif room.phase != Phase.END:
+            connection.send(json.dumps({"type": "error", "message": "游戏未结束"}))
+        else:
+            return {"op": "reset"}
+    elif msg_type == "action":
+        return {
+            "op": "action",
+            "owner_id": user_id,
+            "player_id": message.get("player_id", ""),
+            "action": message.get("action", ""),
+            "target_id": message.get("target_id"),
+            "target_id_2": message.get("target_id_2"),
+            "text": message.get("text"),
+        }
+    return None
+
+
 @router.websocket("/room/{room_id}/ws")
 async def websocket_endpoint(websocket: WebSocket, room_id: str):
     origin = websocket.headers.get("origin")
@@ -476,14 +584,21 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
     if not _is_origin_allowed(origin, host):
         await websocket.close(code=1008)
         return
-    await websocket.accept()
-    connection_id = str(id(websocket))
-    user = get_current_user_from_cookie(websocket.cookies.get("werewolf_session"))
+    subprotocol = choose_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    user = await get_current_user_from_cookie(websocket.cookies.get("werewolf_session"))
     user_id = user["id"] if user else None
-    room = ROOMS.get_room(room_id)
-    CONNECTIONS.setdefault(room_id, {})[connection_id] = websocket
-    CONNECTION_USERS.setdefault(room_id, {})[connection_id] = user_id
-    await websocket.send_text(room.to_json(user_id))
+    room = await ROOMS.get_room(room_id)
+    channel = CONNECTIONS.get(room_id)
+    if channel is None:
+        channel = CONNECTIONS[room_id] = RoomChannel(room_id, room, window=BROADCAST_WINDOW_SECONDS)
+    connection = Connection(websocket, channel, user_id, binary=subprotocol == BINARY_SUBPROTOCOL)
+    channel.add(connection)
+    connection.start()
+    connection.send_resume(
+        _optional_int(websocket.query_params.get("epoch")),
+        _optional_int(websocket.query_params.get("since")),
+    )
 
     try:
         while True:
@@ -491,96 +606,22 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
             try:
                 message = json.loads(data)
             except json.JSONDecodeError:
-                await websocket.send_text(json.dumps({"type": "error", "message": "bad_request"}))
+                connection.send(json.dumps({"type": "error", "message": "bad_request"}))
+                continue
+            if message.get("type") == "resync":
+                connection.send_resume(_optional_int(message.get("epoch")), _optional_int(message.get("since")))
                 continue
-            msg_type = message.get("type")
-            if msg_type == "join":
-                if not user_id:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "auth_required"}))
-                else:
-                    if room.player_for_owner(user_id):
-                        await websocket.send_text(json.dumps({"type": "error", "message": "already_joined"}))
-                    else:
-                        display_name = message.get("display_name") or user["username"]
-                        avatar = auth.avatar_url(ROOT_PATH, user.get("avatar_filename"))
-                        try:
-                            player = room.add_player(display_name, avatar_url=avatar, owner_id=user_id)
-                        except ValueError as exc:
-                            error_map = {
-                                "name_taken": "昵称已被占用。",
-                                "name_invalid": "昵称不合法，请输入 1-12 个字符。",
-                                "room_full": "房间已满。",
-                            }
-                            await websocket.send_text(
-                                json.dumps({"type": "error", "message": error_map.get(str(exc), "加入失败。")})
-                            )
-                        else:
-                            await websocket.send_text(json.dumps({"type": "joined", "player_id": player.id}))
-            elif msg_type == "leave":
-                player = room.player_for_owner(user_id) if user_id else None
-                if player:
-                    room.remove_player(player.id)
-            elif msg_type == "start":
-                if room.is_host(user_id):
-                    mode = message.get("mode")
-                    if mode:
-                        room.set_mode(mode)
-                    room.start_game()
-                else:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "host_only"}))
-            elif msg_type == "reset":
-                if room.is_host(user_id):
-                    room.reset()
-                else:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "host_only"}))
-            elif msg_type == "advance":
-                if room.is_host(user_id):
-                    room.advance()
-                else:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "host_only"}))
-            elif msg_type == "back_to_lobby":
-                if not user_id:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "auth_required"}))
-                elif room.phase != Phase.END:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "游戏未结束"}))
-                else:
-                    room.reset()
-            elif msg_type == "action":
-                ok, result = room.record_action(
-                    user_id,
-                    message.get("player_id", ""),
-                    message.get("action", ""),
-                    message.get("target_id"),
-                    message.get("target_id_2"),
-                    message.get("text"),
-                )
-                if ok:
-                    room.add_log(result)
-                await websocket.send_text(json.dumps({"type": "action_result", "ok": ok, "message": result}))
-
-            await broadcast_state(room_id)
+            await ROOMS.submit(
+                room_id,
+                lambda room: build_command(room, connection, user, message),
+                connection.send,
+            )
     except WebSocketDisconnect:
-        CONNECTIONS.get(room_id, {}).pop(connection_id, None)
-        CONNECTION_USERS.get(room_id, {}).pop(connection_id, None)
-        if not CONNECTIONS.get(room_id):
+        pass
+    finally:
+        connection.close()
+        ROOMS.touch(room_id)
+        if not channel.connections and CONNECTIONS.get(room_id) is channel:
+            channel.cancel()
             CONNECTIONS.pop(room_id, None)
-            CONNECTION_USERS.pop(room_id, None)
-
-
-async def broadcast_state(room_id: str) -> None:
-    connections = CONNECTIONS.get(room_id, {})
-    connection_users = CONNECTION_USERS.get(room_id, {})
-    room = ROOMS.get_room(room_id)
-    closed = []
-    for conn_id, conn in connections.items():
-        try:
-            viewer_id = connection_users.get(conn_id)
-            await conn.send_text(room.to_json(viewer_id))
-        except RuntimeError:
-            closed.append(conn_id)
-    for conn_id in closed:
-        connections.pop(conn_id, None)
-        connection_users.pop(conn_id, None)
-    if not connections:
-        CONNECTIONS.pop(room_id, None)
-        CONNECTION_USERS.pop(room_id, None)
+
@@ -0,0 +1,365 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .commands import apply_command
+from .journal import Journal
+from .store import RoomStore
+from .web_engine import GameRoom
+
+DEFAULT_IDLE_TTL_SECONDS = 2 * 60 * 60
+DEFAULT_MAX_ROOMS = 500
+SWEEP_INTERVAL_SECONDS = 60
+ACTOR_QUEUE_SIZE = 256
+ACTOR_MAX_BATCH = 32
+ACTOR_IDLE_SECONDS = 30
+
+logger = logging.getLogger("werewolf")
+
+DeadlineHandler = Callable[[str], Awaitable[None]]
+CommitHandler = Callable[[str, GameRoom], None]
+CommandBuilder = Callable[[GameRoom], Optional[dict]]
+ReplyHandler = Callable[[str], object]
+
+
+class DeadlineTimers:
+    def __init__(self, on_expire: DeadlineHandler) -> None:
+        self.on_expire = on_expire
+        self.handles: Dict[str, Tuple[float, asyncio.TimerHandle]] = {}
+        self.fired = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(self, room_id: str, deadline: Optional[float]) -> None:
+        current = self.handles.get(room_id)
+        if current is not None and current[0] == deadline:
+            return
+        self.cancel(room_id)
+        if deadline is None:
+            return
+        delay = max(0.0, deadline - time.time())
+        handle = asyncio.get_running_loop().call_later(delay, self._fire, room_id, deadline)
+        self.handles[room_id] = (deadline, handle)
+
+    def cancel(self, room_id: str) -> None:
+        current = self.handles.pop(room_id, None)
+        if current is not None:
+            current[1].cancel()
+
+    def cancel_all(self) -> None:
+        for room_id in list(self.handles):
+            self.cancel(room_id)
+
+    def _fire(self, room_id: str, deadline: float) -> None:
+        self.handles.pop(room_id, None)
+        if deadline > time.time():
+            self.schedule(room_id, deadline)
+            return
+        self.fired += 1
+        task = asyncio.create_task(self._expire(room_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _expire(self, room_id: str) -> None:
+        try:
+            await self.on_expire(room_id)
+        except Exception:
+            logger.exception("deadline handler failed for %s", room_id)
+
+
+class RoomActor:
+    def __init__(self, manager: "RoomManager", room_id: str) -> None:
+        self.manager = manager
+        self.room_id = room_id
+        self.queue: "asyncio.Queue[Tuple[CommandBuilder, Optional[ReplyHandler], asyncio.Future]]" = asyncio.Queue(
+            ACTOR_QUEUE_SIZE
+        )
+        self.batches = 0
+        self.commands = 0
+        self.largest_batch = 0
+        self.task = asyncio.create_task(self._run())
+
+    async def submit(self, build: CommandBuilder, reply_to: Optional[ReplyHandler] = None) -> Optional[str]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((build, reply_to, future))
+        return await future
+
+    async def _run(self) -> None:
+        batch: List[Tuple[CommandBuilder, Optional[ReplyHandler], asyncio.Future]] = []
+        try:
+            while True:
+                try:
+                    batch = [await asyncio.wait_for(self.queue.get(), ACTOR_IDLE_SECONDS)]
+                except asyncio.TimeoutError:
+                    if self.queue.empty():
+                        return
+                    continue
+                while len(batch) < ACTOR_MAX_BATCH and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                await self._process(batch)
+                batch = []
+        finally:
+            if self.manager.actors.get(self.room_id) is self:
+                del self.manager.actors[self.room_id]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            for _, _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _process(self, batch: List[Tuple[CommandBuilder, Optional[ReplyHandler], asyncio.Future]]) -> None:
+        manager = self.manager
+        async with manager.lock(self.room_id):
+            room = await manager.get_room(self.room_id)
+            revision = room.revision
+            for build, reply_to, future in batch:
+                try:
+                    command = build(room)
+                    reply = manager.apply(self.room_id, room, command) if command is not None else None
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                if reply is not None and reply_to is not None:
+                    reply_to(reply)
+                future.set_result(reply)
+            if room.revision != revision:
+                await manager.save_room(self.room_id, room)
+        self.batches += 1
+        self.commands += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        manager.batches += 1
+        manager.commands += len(batch)
+        if manager.on_commit is not None:
+            manager.on_commit(self.room_id, room)
+
+
+class RoomManager:
+    def __init__(
+        self,
+        store: RoomStore,
+        idle_ttl_seconds: int = DEFAULT_IDLE_TTL_SECONDS,
+        max_rooms: int = DEFAULT_MAX_ROOMS,
+        snapshot_dir: Optional[Path] = None,
+        is_active: Optional[Callable[[str], bool]] = None,
+        on_deadline: Optional[DeadlineHandler] = None,
+        journal: Optional[Journal] = None,
+        on_commit: Optional[CommitHandler] = None,
+    ) -> None:
+        self.store = store
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_rooms = max_rooms
+        self.snapshot_dir = snapshot_dir
+        self.is_active = is_active or (lambda room_id: False)
+        self.rooms: "OrderedDict[str, GameRoom]" = OrderedDict()
+        self.last_active: Dict[str, float] = {}
+        self.evicted = 0
+        self.sizes: Dict[str, Tuple[GameRoom, int, int]] = {}
+        self.timers = DeadlineTimers(on_deadline) if on_deadline else None
+        self.journal = journal
+        self.on_commit = on_commit
+        self.actors: Dict[str, RoomActor] = {}
+        self.batches = 0
+        self.commands = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def create_room_id(self) -> str:
+        while True:
+            room_id = uuid.uuid4().hex[:8]
+            if room_id not in self.rooms and not await self.store.room_exists(room_id):
+                return room_id
+
+    async def get_room(self, room_id: str) -> GameRoom:
+        room = await self.store.load_room(room_id, self.rooms.get(room_id))
+        if room is None:
+            room = await self._restore_snapshot(room_id)
+            if room is not None and self.journal is not None:
+                self.journal.append(room_id, room.revision, {"op": "state", "state": room.to_state()})
+        if room is None:
+            room = GameRoom()
+        self.rooms[room_id] = room
+        self.rooms.move_to_end(room_id)
+        self.touch(room_id)
+        self.schedule_deadline(room_id, room)
+        await self._enforce_cap(room_id)
+        return room
+
+    async def submit(
+        self, room_id: str, build: CommandBuilder, reply_to: Optional[ReplyHandler] = None
+    ) -> Optional[str]:
+        actor = self.actors.get(room_id)
+        if actor is None:
+            actor = self.actors[room_id] = RoomActor(self, room_id)
+        return await actor.submit(build, reply_to)
+
+    def apply(self, room_id: str, room: GameRoom, command: dict) -> Optional[str]:
+        command["ts"] = time.time()
+        revision = room.revision
+        reply = apply_command(room, command)
+        if room.revision != revision and self.journal is not None:
+            self.journal.append(room_id, revision, command)
+        return reply
+
+    async def execute(self, room_id: str, room: GameRoom, command: dict) -> Optional[str]:
+        revision = room.revision
+        reply = self.apply(room_id, room, command)
+        if room.revision != revision:
+            await self.save_room(room_id, room)
+        return reply
+
+    async def adopt(self, rooms: Dict[str, GameRoom]) -> None:
+        for room_id, room in rooms.items():
+            await self.store.save_room(room_id, room)
+            self.rooms[room_id] = room
+            self.touch(room_id)
+            self.schedule_deadline(room_id, room)
+
+    async def save_room(self, room_id: str, room: GameRoom) -> None:
+        await self.store.save_room(room_id, room)
+        self.schedule_deadline(room_id, room)
+
+    def schedule_deadline(self, room_id: str, room: GameRoom) -> None:
+        if self.timers is not None:
+            self.timers.schedule(room_id, room.next_deadline())
+
+    def lock(self, room_id: str):
+        return self.store.lock(room_id)
+
+    def touch(self, room_id: str) -> None:
+        self.last_active[room_id] = time.time()
+
+    async def evict(self, room_id: str) -> None:
+        room = self.rooms.pop(room_id, None)
+        self.last_active.pop(room_id, None)
+        self.sizes.pop(room_id, None)
+        if self.timers is not None:
+            self.timers.cancel(room_id)
+        if room is None:
+            return
+        if self.journal is not None:
+            self.journal.append(room_id, room.revision, {"op": "evict"})
+        if room.players and self._snapshot_path(room_id):
+            await asyncio.to_thread(self._write_snapshot, room_id, room)
+        await self.store.discard_room(room_id)
+        self.evicted += 1
+
+    async def sweep(self, now: Optional[float] = None) -> int:
+        cutoff = (now if now is not None else time.time()) - self.idle_ttl_seconds
+        idle = [
+            room_id
+            for room_id, last_active in self.last_active.items()
+            if last_active <= cutoff and not self.is_active(room_id) and room_id not in self.actors
+        ]
+        for room_id in idle:
+            await self.evict(room_id)
+        return len(idle)
+
+    async def start(self) -> None:
+        if self.journal is not None:
+            started = time.perf_counter()
+            rooms = await asyncio.to_thread(self.journal.replay)
+            await self.adopt(rooms)
+            await self.journal.compact(self.rooms)
+            self.journal.start(lambda: self.rooms)
+            logger.info("replayed %d rooms in %.3fs", len(rooms), time.perf_counter() - started)
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+        if self.timers is not None:
+            self.timers.cancel_all()
+        actors = [actor.task for actor in self.actors.values()]
+        for task in actors:
+            task.cancel()
+        await asyncio.gather(*actors, return_exceptions=True)
+        if self.journal is not None:
+            await self.journal.close()
+
+    def stats(self) -> dict:
+        now = time.time()
+        rooms = []
+        for room_id, room in self.rooms.items():
+            rooms.append(
+                {
+                    "room_id": room_id,
+                    "phase": room.phase.name,
+                    "players": len(room.players),
+                    "events": len(room.events),
+                    "approx_bytes": self._approx_bytes(room_id, room),
+                    "idle_seconds": int(now - self.last_active.get(room_id, now)),
+                    "connected": self.is_active(room_id),
+                }
+            )
+        return {
+            "room_count": len(rooms),
+            "max_rooms": self.max_rooms,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "events_held": sum(item["events"] for item in rooms),
+            "approx_bytes": sum(item["approx_bytes"] for item in rooms),
+            "evicted": self.evicted,
+            "timers_pending": len(self.timers.handles) if self.timers is not None else 0,
+            "timers_fired": self.timers.fired if self.timers is not None else 0,
+            "actors": len(self.actors),
+            "actor_batches": self.batches,
+            "actor_commands": self.commands,
+            "journal": self.journal.stats() if self.journal is not None else None,
+            "rooms": rooms,
+        }
+
+    def _approx_bytes(self, room_id: str, room: GameRoom) -> int:
+        cached = self.sizes.get(room_id)
+        if cached is None or cached[0] is not room or cached[1] != room.revision:
+            size = len(json.dumps(room.to_state(), ensure_ascii=False).encode("utf-8"))
+            cached = self.sizes[room_id] = (room, room.revision, size)
+        return cached[2]
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("room sweep failed")
+
+    async def _enforce_cap(self, keep: str) -> None:
+        if len(self.rooms) <= self.max_rooms:
+            return
+        for room_id in list(self.rooms):
+            if len(self.rooms) <= self.max_rooms:
+                break
+            if room_id != keep and not self.is_active(room_id) and room_id not in self.actors:
+                await self.evict(room_id)
+
+    def _snapshot_path(self, room_id: str) -> Optional[Path]:
+        if self.snapshot_dir is None or not room_id.isalnum():
+            return None
+        return self.snapshot_dir / f"{room_id}.json"
+
+    def _write_snapshot(self, room_id: str, room: GameRoom) -> None:
+        path = self._snapshot_path(room_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(room.to_state(), ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+    async def _restore_snapshot(self, room_id: str) -> Optional[GameRoom]:
+        path = self._snapshot_path(room_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            state = json.loads(await asyncio.to_thread(path.read_text, encoding="utf-8"))
+            room = GameRoom.from_state(state)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.exception("failed to restore room snapshot %s", room_id)
+            return None
+        path.unlink(missing_ok=True)
+        return room
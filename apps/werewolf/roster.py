@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, List, Optional
+
+from .enum import Kind, Role
+
+FLAGS = (
+    "is_police",
+    "witch_saved",
+    "witch_poisoned",
+    "explorer_bought",
+    "hunter_shot",
+    "nerd_revealed",
+    "cupid_linked",
+)
+
+
+class Roster:
+    def __init__(self) -> None:
+        self.slots: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.alive = 0
+        self.kinds: Dict[Kind, int] = {kind: 0 for kind in Kind}
+        self.roles: Dict[Role, int] = {role: 0 for role in Role}
+        self.flags: Dict[str, int] = {flag: 0 for flag in FLAGS}
+
+    def bit(self, player_id: Optional[str]) -> int:
+        slot = self.slots.get(player_id) if player_id else None
+        return 0 if slot is None else 1 << slot
+
+    def mask(self, player_ids: Iterable[str]) -> int:
+        mask = 0
+        for player_id in player_ids:
+            mask |= self.bit(player_id)
+        return mask
+
+    def members(self, mask: int) -> List[str]:
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def kind(self, kind: Kind) -> int:
+        return self.kinds[kind]
+
+    def role(self, *roles: Role) -> int:
+        mask = 0
+        for role in roles:
+            mask |= self.roles[role]
+        return mask
+
+    def flag(self, name: str) -> int:
+        return self.flags[name]
+
+    def is_alive(self, player_id: Optional[str]) -> bool:
+        return bool(self.alive & self.bit(player_id))
+
+    def add(self, player) -> None:
+        if player.id not in self.slots:
+            try:
+                slot = self.ids.index(None)
+                self.ids[slot] = player.id
+            except ValueError:
+                slot = len(self.ids)
+                self.ids.append(player.id)
+            self.slots[player.id] = slot
+        self.update(player)
+
+    def remove(self, player_id: str) -> None:
+        slot = self.slots.pop(player_id, None)
+        if slot is None:
+            return
+        self._clear(~(1 << slot))
+        self.ids[slot] = None
+
+    def set_alive(self, player_id: str, alive: bool) -> None:
+        bit = self.bit(player_id)
+        self.alive = self.alive | bit if alive else self.alive & ~bit
+
+    def update(self, player) -> None:
+        bit = self.bit(player.id)
+        if not bit:
+            return
+        self._clear(~bit)
+        if player.alive:
+            self.alive |= bit
+        if player.kind is not None:
+            self.kinds[player.kind] |= bit
+        if player.role is not None:
+            self.roles[player.role] |= bit
+        for flag in FLAGS:
+            if getattr(player, flag):
+                self.flags[flag] |= bit
+
+    def rebuild(self, players: Iterable) -> None:
+        self.slots = {}
+        self.ids = []
+        self._clear(0)
+        for player in players:
+            self.add(player)
+
+    def _clear(self, keep: int) -> None:
+        self.alive &= keep
+        for kind in self.kinds:
+            self.kinds[kind] &= keep
+        for role in self.roles:
+            self.roles[role] &= keep
+        for flag in self.flags:
+            self.flags[flag] &= keep
@@ -0,0 +1,107 @@
+import asyncio
+import contextlib
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.rooms import RoomManager
+from werewolf.store import MemoryRoomStore
+
+ROOM_COUNT = 20
+CLIENTS_PER_ROOM = 9
+MESSAGES_PER_CLIENT = 40
+STORE_LATENCY_SECONDS = 0.001
+
+
+class RemoteLikeStore(MemoryRoomStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.saves = 0
+
+    async def save_room(self, room_id: str, room) -> None:
+        await asyncio.sleep(STORE_LATENCY_SECONDS)
+        self.saves += 1
+        await super().save_room(room_id, room)
+
+    @contextlib.asynccontextmanager
+    async def lock(self, room_id: str) -> AsyncIterator[None]:
+        async with self.locks.setdefault(room_id, asyncio.Lock()):
+            yield
+
+
+async def legacy_client(manager: RoomManager, room_id: str, client: int, broadcasts: list) -> None:
+    for index in range(MESSAGES_PER_CLIENT):
+        async with manager.lock(room_id):
+            room = await manager.get_room(room_id)
+            room.add_log(f"{client}:{index}")
+            await manager.save_room(room_id, room)
+        await asyncio.sleep(0)
+        broadcasts.append(room_id)
+
+
+async def actor_client(manager: RoomManager, room_id: str, client: int) -> None:
+    def build(room):
+        room.add_log(f"{client}:{index}")
+        return None
+
+    for index in range(MESSAGES_PER_CLIENT):
+        await manager.submit(room_id, build)
+
+
+async def run_legacy() -> tuple:
+    store = RemoteLikeStore()
+    manager = RoomManager(store)
+    broadcasts: list = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            legacy_client(manager, f"room{room}", client, broadcasts)
+            for room in range(ROOM_COUNT)
+            for client in range(CLIENTS_PER_ROOM)
+        )
+    )
+    return time.perf_counter() - start, len(broadcasts), store.saves
+
+
+async def run_actor() -> tuple:
+    store = RemoteLikeStore()
+    broadcasts: list = []
+    manager = RoomManager(store, on_commit=lambda room_id, room: broadcasts.append(room_id))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            actor_client(manager, f"room{room}", client)
+            for room in range(ROOM_COUNT)
+            for client in range(CLIENTS_PER_ROOM)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    largest = max(actor.largest_batch for actor in manager.actors.values())
+    await manager.stop()
+    return elapsed, len(broadcasts), store.saves, largest
+
+
+def run() -> None:
+    total = ROOM_COUNT * CLIENTS_PER_ROOM * MESSAGES_PER_CLIENT
+    print(
+        f"{ROOM_COUNT} rooms x {CLIENTS_PER_ROOM} clients x {MESSAGES_PER_CLIENT} commands, "
+        f"{STORE_LATENCY_SECONDS * 1000:.0f} ms store round trip"
+    )
+    elapsed, broadcasts, saves = asyncio.run(run_legacy())
+    print(f"inline lock per message: {total / elapsed:8.0f} commands/s  {broadcasts:6d} broadcasts  {saves:6d} saves")
+    elapsed, broadcasts, saves, largest = asyncio.run(run_actor())
+    print(
+        f"room actor:              {total / elapsed:8.0f} commands/s  {broadcasts:6d} broadcasts  {saves:6d} saves"
+        f"  (largest batch {largest})"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+os.chdir(tempfile.mkdtemp())
+
+from werewolf import auth
+from werewolf import main as werewolf_main
+
+USER_COUNT = 1000
+LOOKUPS = 20000
+CONCURRENCY = 50
+
+
+def legacy_get_user_by_id(user_id: str):
+    auth.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(auth.DB_PATH) as conn:
+        row = conn.execute(
+            "select id, qq_uin, username, avatar_filename from users where id = ?",
+            (user_id,),
+        ).fetchone()
+    return {"id": row[0], "qq_uin": row[1], "username": row[2], "avatar_filename": row[3]}
+
+
+async def legacy_lookup(token: str):
+    user_id = await werewolf_main.STORE.get_session(token)
+    return legacy_get_user_by_id(user_id)
+
+
+async def pooled_blocking_lookup(token: str):
+    user_id = await werewolf_main.STORE.get_session(token)
+    return auth.get_user_by_id(user_id)
+
+
+async def pooled_async_lookup(token: str):
+    user_id = await werewolf_main.STORE.get_session(token)
+    return await auth.run_db(auth.get_user_by_id, user_id)
+
+
+async def seed_users() -> list:
+    auth.init_db()
+    iterations = auth.PBKDF2_ITERS
+    auth.PBKDF2_ITERS = 1
+    tokens = []
+    for index in range(USER_COUNT):
+        user = auth.provision_user(str(100000 + index))
+        token = f"token-{index}"
+        await werewolf_main.STORE.set_session(token, user["id"], 3600)
+        tokens.append(token)
+    auth.PBKDF2_ITERS = iterations
+    return tokens
+
+
+async def measure(lookup, tokens: list) -> tuple[float, float]:
+    stall = 0.0
+    running = True
+
+    async def monitor() -> None:
+        nonlocal stall
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - start - 0.001)
+
+    async def worker(offset: int) -> None:
+        for index in range(offset, LOOKUPS, CONCURRENCY):
+            user = await lookup(tokens[index % len(tokens)])
+            assert user is not None
+
+    watcher = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await watcher
+    return LOOKUPS / elapsed, stall
+
+
+async def run_async() -> None:
+    tokens = await seed_users()
+    cases = [
+        ("connect per call (before)", legacy_lookup),
+        ("pooled, on event loop", pooled_blocking_lookup),
+        ("pooled, async facade", pooled_async_lookup),
+        ("user cache", werewolf_main.get_current_user_from_cookie),
+    ]
+    print(f"{USER_COUNT} users, {LOOKUPS} lookups from {CONCURRENCY} concurrent tasks")
+    for label, lookup in cases:
+        rate, stall = await measure(lookup, tokens)
+        print(f"{label:28s} {rate:9.0f} lookups/s   max event-loop stall {stall * 1000:7.2f} ms")
+    cache = auth.user_cache_stats()
+    print(f"user cache: {cache['hits']} hits, {cache['misses']} misses, {cache['size']} entries")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async())
@@ -0,0 +1,58 @@
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf import avatars
+
+PLAYER_COUNT = 9
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+
+
+def synthetic_photo(rng: random.Random) -> bytes:
+    size = rng.choice((640, 1080, 1440, 2000))
+    noise = avatars.Image.effect_noise((size, size), rng.uniform(20, 80)).convert("L")
+    gradient = avatars.Image.linear_gradient("L").resize((size, size)).rotate(rng.uniform(0, 360))
+    image = avatars.Image.merge("RGB", (noise, gradient, avatars.ImageOps.invert(noise)))
+    fmt = rng.choice(("JPEG", "JPEG", "PNG"))
+    for quality in (95, 85, 70, 50):
+        output = io.BytesIO()
+        image.save(output, format=fmt, quality=quality)
+        if output.tell() <= MAX_UPLOAD_BYTES:
+            return output.getvalue()
+        fmt = "JPEG"
+    return output.getvalue()
+
+
+def run() -> None:
+    if avatars.Image is None:
+        print("Pillow is not installed; avatars are stored as uploaded and only gain cache headers")
+        return
+    rng = random.Random(7)
+    uploads = [synthetic_photo(rng) for _ in range(PLAYER_COUNT)]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        start = time.perf_counter()
+        stored = []
+        for index, data in enumerate(uploads):
+            path = directory / f"upload-{index}"
+            path.write_bytes(data)
+            stored.append(avatars._process(directory, path))
+        elapsed = time.perf_counter() - start
+        thumbnails = sum((directory / name).stat().st_size for name in stored)
+    original = sum(len(data) for data in uploads)
+    print(f"{PLAYER_COUNT}-player room, avatars {avatars.AVATAR_SIZE}px webp")
+    print(f"first view:  {original / 1024:8.1f} KiB before, {thumbnails / 1024:6.1f} KiB after")
+    print(f"repeat view: {PLAYER_COUNT} revalidation requests before, none after (immutable)")
+    print(f"thumbnailing cost {elapsed / PLAYER_COUNT * 1000:.0f} ms per upload, paid once")
+
+
+if __name__ == "__main__":
+    run()
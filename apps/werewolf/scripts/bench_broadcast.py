@@ -0,0 +1,146 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf import main as werewolf_main
+from werewolf.connections import Connection, RoomChannel
+from werewolf.sync import ViewerSync
+from werewolf.web_engine import GameRoom
+
+ROOM_ID = "bench"
+PLAYER_COUNT = 9
+SPECTATOR_COUNT = 20
+PRELOAD_EVENTS = 150
+ROUNDS = 300
+SLOW_CLIENT_DELAY = 0.05
+
+
+class CountingSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.frames = 0
+        self.bytes_sent = 0
+        self.last_sent_at = 0.0
+
+    async def send_text(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames += 1
+        self.bytes_sent += len(text.encode("utf-8"))
+        self.last_sent_at = time.perf_counter()
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+def build_room():
+    room = GameRoom()
+    viewers = []
+    for index in range(PLAYER_COUNT):
+        owner_id = f"user-{index}"
+        room.add_player(f"玩家{index + 1}", avatar_url=None, owner_id=owner_id)
+        viewers.append(owner_id)
+    viewers.extend([None] * SPECTATOR_COUNT)
+    room.start_game()
+    for index in range(PRELOAD_EVENTS):
+        room.add_log(f"预热日志 {index}")
+    return room, viewers
+
+
+def bench_legacy(room, viewers) -> tuple[float, int]:
+    total_bytes = 0
+    start = time.perf_counter()
+    for index in range(ROUNDS):
+        room.add_log(f"legacy {index}")
+        for viewer_id in viewers:
+            public = room._build_public_payload(room._morning_remaining())
+            text = json.dumps({**public, **room.viewer_payload(viewer_id)}, ensure_ascii=False)
+            total_bytes += len(text.encode("utf-8"))
+    elapsed = time.perf_counter() - start
+    return elapsed / ROUNDS, total_bytes // ROUNDS
+
+
+def bench_snapshots(room, viewers) -> tuple[float, int]:
+    total_bytes = 0
+    start = time.perf_counter()
+    for index in range(ROUNDS):
+        room.add_log(f"snapshot {index}")
+        for viewer_id in viewers:
+            total_bytes += len(ViewerSync(viewer_id).snapshot(room).encode("utf-8"))
+    elapsed = time.perf_counter() - start
+    return elapsed / ROUNDS, total_bytes // ROUNDS
+
+
+def open_connections(room, viewers, slow_count: int = 0) -> list:
+    channel = RoomChannel(ROOM_ID, room)
+    werewolf_main.CONNECTIONS[ROOM_ID] = channel
+    connections = []
+    for index, viewer_id in enumerate(viewers):
+        socket = CountingSocket(SLOW_CLIENT_DELAY if index < slow_count else 0.0)
+        connection = Connection(socket, channel, viewer_id)
+        connection.sync.snapshot(room)
+        channel.add(connection)
+        connection.start()
+        connections.append(connection)
+    return connections
+
+
+def close_connections(connections) -> None:
+    for connection in connections:
+        connection.close()
+    werewolf_main.CONNECTIONS.pop(ROOM_ID, None)
+
+
+async def bench_broadcast(room, viewers) -> tuple[float, int]:
+    connections = open_connections(room, viewers)
+    start = time.perf_counter()
+    for index in range(ROUNDS):
+        room.add_log(f"delta {index}")
+        werewolf_main.CONNECTIONS[ROOM_ID].broadcast()
+        await asyncio.gather(*(connection.wait_idle() for connection in connections))
+    elapsed = time.perf_counter() - start
+    close_connections(connections)
+    return elapsed / ROUNDS, sum(connection.websocket.bytes_sent for connection in connections) // ROUNDS
+
+
+async def bench_slow_client(room, viewers) -> tuple[float, int]:
+    connections = open_connections(room, viewers, slow_count=1)
+    fast = connections[1:]
+    latencies = []
+    for index in range(20):
+        room.add_log(f"slow {index}")
+        start = time.perf_counter()
+        werewolf_main.CONNECTIONS[ROOM_ID].broadcast()
+        await asyncio.gather(*(connection.wait_idle() for connection in fast))
+        latencies.append(max(connection.websocket.last_sent_at for connection in fast) - start)
+    await connections[0].wait_idle()
+    close_connections(connections)
+    return max(latencies), connections[0].websocket.frames
+
+
+def run() -> None:
+    room, viewers = build_room()
+    legacy_time, legacy_bytes = bench_legacy(room, viewers)
+    snapshot_time, snapshot_bytes = bench_snapshots(room, viewers)
+    current_time, current_bytes = asyncio.run(bench_broadcast(room, viewers))
+    slow_latency, slow_frames = asyncio.run(bench_slow_client(room, viewers))
+    print(f"connections: {PLAYER_COUNT} players + {SPECTATOR_COUNT} spectators, {len(room.events)} events held")
+    print(f"per-viewer snapshots: {legacy_time * 1000:8.3f} ms/broadcast {legacy_bytes:9d} bytes/broadcast")
+    print(f"shared snapshots:     {snapshot_time * 1000:8.3f} ms/broadcast {snapshot_bytes:9d} bytes/broadcast")
+    print(f"shared deltas:        {current_time * 1000:8.3f} ms/broadcast {current_bytes:9d} bytes/broadcast")
+    print(
+        f"one client delayed {SLOW_CLIENT_DELAY * 1000:.0f} ms/frame: others updated within "
+        f"{slow_latency * 1000:.2f} ms, slow client got {slow_frames} coalesced frames for 20 updates"
+    )
+    print(f"speedup: {legacy_time / current_time:.1f}x, bytes: {legacy_bytes / max(current_bytes, 1):.1f}x smaller")
+
+
+if __name__ == "__main__":
+    run()
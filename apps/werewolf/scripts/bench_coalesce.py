@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import io
+import random
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.connections import Connection, RoomChannel, broadcast_stats
+from werewolf.enum import Phase
+from werewolf.rooms import RoomManager
+from werewolf.store import MemoryRoomStore
+
+ROOM_ID = "bench"
+PLAYER_COUNT = 9
+SPECTATOR_COUNT = 3
+GAMES = 4
+MAX_ROUNDS = 60
+BURST_SPREAD_SECONDS = 0.015
+ROUND_GAP_SECONDS = 0.05
+WINDOWS_MS = (0, 20, 30, 50)
+
+
+class CountingSocket:
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes_sent = 0
+
+    async def send_text(self, text: str) -> None:
+        self.frames += 1
+        self.bytes_sent += len(text.encode("utf-8"))
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+async def play_game(seed: int, window: float) -> tuple:
+    rng = random.Random(seed)
+    random.seed(seed)
+    channels = {}
+
+    def on_commit(room_id, room) -> None:
+        channel = channels[room_id]
+        channel.room = room
+        channel.broadcast()
+
+    manager = RoomManager(MemoryRoomStore(), on_commit=on_commit)
+    room = await manager.get_room(ROOM_ID)
+    channel = channels[ROOM_ID] = RoomChannel(ROOM_ID, room, window=window)
+    owners = [f"user-{index}" for index in range(PLAYER_COUNT)]
+    connections = []
+    for viewer_id in owners + [None] * SPECTATOR_COUNT:
+        connection = Connection(CountingSocket(), channel, viewer_id)
+        connection.sync.snapshot(room)
+        channel.add(connection)
+        connection.start()
+        connections.append(connection)
+
+    for index, owner_id in enumerate(owners):
+        await manager.submit(
+            ROOM_ID,
+            lambda room, index=index, owner_id=owner_id: {
+                "op": "join", "name": f"玩家{index + 1}", "avatar_url": None, "owner_id": owner_id,
+            },
+        )
+    with contextlib.redirect_stdout(io.StringIO()):
+        await manager.submit(ROOM_ID, lambda room: {"op": "start", "mode": "CLASSIC"})
+
+    def act(owner_id: str):
+        def build(room):
+            player = room.player_for_owner(owner_id)
+            actions = room.viewer_payload(owner_id)["available_actions"]
+            if player is None or not actions:
+                return None
+            action = rng.choice(actions)
+            targets = action.get("targets") or [None]
+            return {
+                "op": "action",
+                "owner_id": owner_id,
+                "player_id": player.id,
+                "action": action["id"],
+                "target_id": rng.choice(targets),
+                "target_id_2": rng.choice(targets),
+                "text": "过。" if action["id"] == "morning_speak" else None,
+            }
+        return build
+
+    async def delayed(owner_id: str) -> None:
+        await asyncio.sleep(rng.uniform(0, BURST_SPREAD_SECONDS))
+        await manager.submit(ROOM_ID, act(owner_id))
+
+    for _ in range(MAX_ROUNDS):
+        if channel.room.phase == Phase.END:
+            break
+        actors = [owner_id for owner_id in owners if channel.room.viewer_payload(owner_id)["available_actions"]]
+        if actors:
+            await asyncio.gather(*(delayed(owner_id) for owner_id in actors))
+        else:
+            await manager.submit(ROOM_ID, lambda room: {"op": "tick"})
+        await asyncio.sleep(ROUND_GAP_SECONDS)
+    await asyncio.sleep(window + 0.01)
+    await asyncio.gather(*(connection.wait_idle() for connection in connections))
+    for connection in connections:
+        connection.close()
+    await manager.stop()
+    frames = sum(connection.websocket.frames for connection in connections)
+    sent = sum(connection.websocket.bytes_sent for connection in connections)
+    return channel.mutations, channel.broadcasts, frames, sent
+
+
+def run() -> None:
+    print(
+        f"{GAMES} games, {PLAYER_COUNT} players + {SPECTATOR_COUNT} spectators, "
+        f"actions spread over {BURST_SPREAD_SECONDS * 1000:.0f} ms per round"
+    )
+    print(f"{'window':>7s} {'mutations':>10s} {'broadcasts':>11s} {'frames':>8s} {'KiB sent':>9s}")
+    for window_ms in WINDOWS_MS:
+        before = broadcast_stats()
+        totals = [0, 0, 0, 0]
+        for seed in range(GAMES):
+            result = asyncio.run(play_game(seed, window_ms / 1000))
+            totals = [total + value for total, value in zip(totals, result)]
+        after = broadcast_stats()
+        mutations, broadcasts, frames, sent = totals
+        print(
+            f"{window_ms:5d}ms {mutations:10d} {broadcasts:11d} {frames:8d} {sent / 1024:9.1f}"
+            f"  (phase flushes {after['phase_flushes'] - before['phase_flushes']})"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.journal import Journal, replay_directory
+from werewolf.rooms import RoomManager
+from werewolf.store import MemoryRoomStore
+
+ROOM_COUNT = 1000
+PLAYER_COUNT = 9
+ROUNDS = 12
+
+
+def directory_bytes(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.iterdir())
+
+
+async def play_room(manager: RoomManager, room_id: str, rng: random.Random) -> None:
+    room = await manager.get_room(room_id)
+    owners = [f"{room_id}-user-{index}" for index in range(PLAYER_COUNT)]
+    for index, owner_id in enumerate(owners):
+        command = {"op": "join", "name": f"玩家{index + 1}", "avatar_url": None, "owner_id": owner_id}
+        command["player_id"] = f"{room_id}{index:02d}"
+        await manager.execute(room_id, room, command)
+    await manager.execute(room_id, room, {"op": "start", "mode": "CLASSIC"})
+    for _ in range(ROUNDS):
+        for owner_id in owners:
+            player = room.player_for_owner(owner_id)
+            if player is None:
+                continue
+            actions = room.viewer_payload(owner_id)["available_actions"]
+            if not actions:
+                continue
+            action = rng.choice(actions)
+            targets = action.get("targets") or [None]
+            command = {
+                "op": "action",
+                "owner_id": owner_id,
+                "player_id": player.id,
+                "action": action["id"],
+                "target_id": rng.choice(targets),
+                "text": "过" if action["id"] == "morning_speak" else None,
+            }
+            await manager.execute(room_id, room, command)
+        await manager.execute(room_id, room, {"op": "advance"})
+
+
+async def write_rooms(directory: Path) -> tuple[RoomManager, float]:
+    journal = Journal(directory)
+    manager = RoomManager(MemoryRoomStore(), journal=journal)
+    journal.replay()
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for index in range(ROOM_COUNT):
+        await play_room(manager, f"room{index:04d}", rng)
+        if index % 50 == 0:
+            await journal.flush()
+    await journal.close()
+    return manager, time.perf_counter() - start
+
+
+def replay(directory: Path) -> tuple[dict, float]:
+    start = time.perf_counter()
+    rooms, _ = replay_directory(directory)
+    return rooms, time.perf_counter() - start
+
+
+def matches(expected: dict, actual: dict) -> bool:
+    return all(
+        room_id in actual and actual[room_id].to_state() == room.to_state() for room_id, room in expected.items()
+    )
+
+
+async def compact(directory: Path, rooms: dict) -> None:
+    journal = Journal(directory)
+    journal.replay()
+    await journal.compact(rooms)
+    await journal.close()
+
+
+def run() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        manager, write_time = asyncio.run(write_rooms(directory))
+        journal = manager.journal
+        print(
+            f"wrote {journal.entries_written} commands for {ROOM_COUNT} rooms in {write_time:.2f}s "
+            f"({journal.flushes} fsyncs, {directory_bytes(directory) / 1024 / 1024:.1f} MiB)"
+        )
+        rooms, journal_time = replay(directory)
+        print(f"restart from journal only:   {journal_time:.2f}s, identical={matches(manager.rooms, rooms)}")
+        asyncio.run(compact(directory, rooms))
+        rooms, snapshot_time = replay(directory)
+        print(
+            f"restart from compact snapshot: {snapshot_time:.2f}s, identical={matches(manager.rooms, rooms)} "
+            f"({directory_bytes(directory) / 1024 / 1024:.1f} MiB)"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+os.chdir(tempfile.mkdtemp())
+
+from werewolf import auth
+
+BURST = 50
+
+
+async def blocking_login(qq_uin: str, secret: str):
+    return auth.authenticate_by_qq(qq_uin, secret)
+
+
+async def measure(login, accounts: list) -> tuple[float, float]:
+    stall = 0.0
+    running = True
+
+    async def monitor() -> None:
+        nonlocal stall
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - start - 0.001)
+
+    watcher = asyncio.create_task(monitor())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    users = await asyncio.gather(*(login(qq_uin, secret) for qq_uin, secret in accounts))
+    elapsed = time.perf_counter() - start
+    running = False
+    await watcher
+    assert all(users)
+    return elapsed, stall
+
+
+async def run_async() -> None:
+    auth.init_db()
+    accounts = []
+    for index in range(BURST):
+        qq_uin = str(200000 + index)
+        user = await auth.provision(qq_uin)
+        auth.confirm_user(qq_uin)
+        accounts.append((qq_uin, user["secret"]))
+    print(f"burst of {BURST} concurrent logins, PBKDF2 {auth.PBKDF2_ITERS} iterations, {auth.KDF_THREADS} kdf threads")
+    cases = [
+        ("KDF on event loop (before)", blocking_login),
+        ("KDF pool, cold cache", auth.authenticate),
+        ("KDF pool, warm cache", auth.authenticate),
+    ]
+    for label, login in cases:
+        elapsed, stall = await measure(login, accounts)
+        print(f"{label:28s} burst done in {elapsed * 1000:8.1f} ms   max event-loop stall {stall * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async())
@@ -0,0 +1,90 @@
+import asyncio
+import secrets
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.store import MemoryRoomStore
+
+DURATION_SECONDS = 6
+NONCE_TTL_SECONDS = 2
+SESSION_COUNT = 2000
+
+
+class LegacyNonces:
+    def __init__(self) -> None:
+        self.nonces = {}
+
+    async def claim_nonce(self, nonce: str, ttl_seconds: int) -> bool:
+        now_ts = int(time.time())
+        expired = [key for key, expires_at in self.nonces.items() if expires_at <= now_ts]
+        for key in expired:
+            self.nonces.pop(key, None)
+        if nonce in self.nonces:
+            return False
+        self.nonces[nonce] = now_ts + ttl_seconds
+        return True
+
+
+async def sustained_nonces(label: str, store) -> None:
+    tracemalloc.start()
+    claims = 0
+    samples = []
+    start = time.perf_counter()
+    next_sample = start + 1
+    while time.perf_counter() - start < DURATION_SECONDS:
+        for _ in range(100):
+            assert await store.claim_nonce(secrets.token_hex(8), NONCE_TTL_SECONDS)
+        claims += 100
+        if time.perf_counter() >= next_sample:
+            samples.append(tracemalloc.get_traced_memory()[0] / 1024 / 1024)
+            next_sample += 1
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    trace = " ".join(f"{sample:5.1f}" for sample in samples)
+    print(f"{label:22s} {claims / elapsed:9.0f} claims/s   live {len(store.nonces):6d}   MiB per second: {trace}")
+
+
+async def restart_sessions(directory: Path) -> None:
+    path = directory / "sessions.db"
+    store = MemoryRoomStore(path)
+    await store.start(None)
+    tokens = [secrets.token_urlsafe(32) for _ in range(SESSION_COUNT)]
+    start = time.perf_counter()
+    for index, token in enumerate(tokens):
+        await store.set_session(token, f"user-{index}", 3600)
+    write_time = time.perf_counter() - start
+    await store.delete_session(tokens[0])
+    await store.close()
+    restarted = MemoryRoomStore(path)
+    start = time.perf_counter()
+    await restarted.start(None)
+    load_time = time.perf_counter() - start
+    survived = 0
+    for token in tokens[1:]:
+        survived += await restarted.get_session(token) is not None
+    revoked = await restarted.get_session(tokens[0]) is None
+    await restarted.close()
+    print(
+        f"{SESSION_COUNT} sessions written in {write_time * 1000:.0f} ms, restored in {load_time * 1000:.1f} ms, "
+        f"{survived} survived restart, logout kept={revoked}"
+    )
+
+
+async def run_async() -> None:
+    print(f"signed bot calls for {DURATION_SECONDS}s with a {NONCE_TTL_SECONDS}s nonce ttl")
+    await sustained_nonces("full scan (before)", LegacyNonces())
+    await sustained_nonces("expiry heap", MemoryRoomStore())
+    with tempfile.TemporaryDirectory() as tmp:
+        await restart_sessions(Path(tmp))
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async())
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.enum import Kind, Mode, Phase, Role
+from werewolf.strategy import Strategy
+from werewolf.web_engine import GameRoom
+
+PLAYER_COUNT = 9
+ROUNDS = 50_000
+
+
+def legacy_check_victory(room):
+    if all(not p.alive for p in room.players.values()):
+        return True, "None"
+    players_alive = [player for player in room.players.values() if player.alive]
+    villagers_alive = [player for player in players_alive if player.kind == Kind.VILLAGER]
+    werewolves_alive = [player for player in players_alive if player.kind == Kind.WEREWOLF]
+    cupids_alive = [player for player in players_alive if player.kind == Kind.CUPID]
+    if cupids_alive:
+        if not werewolves_alive and not villagers_alive:
+            return True, Kind.CUPID
+        return False, None
+    if werewolves_alive and villagers_alive:
+        if (not [p for p in villagers_alive if p.role == Role.VILLAGER] or
+                all(p.role == Role.VILLAGER for p in villagers_alive)):
+            return True, Kind.WEREWOLF
+        return False, None
+    if werewolves_alive:
+        return True, Kind.WEREWOLF
+    if villagers_alive:
+        return True, Kind.VILLAGER
+    return False, None
+
+
+def legacy_required_night(room) -> set:
+    required = set()
+    for player in room.players.values():
+        if player.role == Role.HUNTER and not player.alive and not player.hunter_shot:
+            required.add(player.id)
+        if player.role in (Role.WEREWOLF, Role.WHITE_WOLF, Role.SEER, Role.GUARD) and player.alive:
+            required.add(player.id)
+        if player.role == Role.CUPID and player.alive and not player.cupid_linked:
+            required.add(player.id)
+        if player.role == Role.WITCH and player.alive and not (player.witch_saved and player.witch_poisoned):
+            required.add(player.id)
+    return required
+
+
+def build_room() -> GameRoom:
+    random.seed(3)
+    room = GameRoom()
+    room.mode = Mode.CLASSIC
+    for index in range(PLAYER_COUNT):
+        room.add_player(f"玩家{index + 1}", avatar_url=None, owner_id=f"user-{index}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        room.start_game()
+    room.phase = Phase.NIGHT
+    villagers = [player for player in room.players.values() if player.role == Role.VILLAGER]
+    room._set_alive(villagers[0], False)
+    return room
+
+
+def timed(function, room) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        function(room)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def run() -> None:
+    room = build_room()
+    assert legacy_check_victory(room) == Strategy.check_victory_1(room)
+    assert legacy_required_night(room) == set(room.roster.members(room._required_action_mask()))
+    legacy_victory = timed(legacy_check_victory, room)
+    mask_victory = timed(Strategy.check_victory_1, room)
+    legacy_required = timed(legacy_required_night, room)
+    mask_required = timed(GameRoom._required_action_mask, room)
+    legacy_advance = timed(lambda room: legacy_required_night(room).issubset(room.actions.keys()), room)
+    mask_advance = timed(lambda room: not room._required_action_mask() & ~room.roster.mask(room.actions), room)
+    print(f"{PLAYER_COUNT}-player classic room at night, {ROUNDS} calls each")
+    print(f"check_victory:      list walk {legacy_victory:6.2f} us   masks {mask_victory:6.2f} us")
+    print(f"required to act:    list walk {legacy_required:6.2f} us   masks {mask_required:6.2f} us")
+    print(f"auto-advance test:  list walk {legacy_advance:6.2f} us   masks {mask_advance:6.2f} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,124 @@
+import json
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.commands import apply_command
+from werewolf.enum import Phase
+from werewolf.sync import ViewerSync
+from werewolf.web_engine import GameRoom
+from werewolf.wire import HELLO, encode_text, unpack
+
+PLAYER_COUNT = 9
+SPECTATORS = 1
+GAMES = 20
+MAX_COMMANDS = 400
+
+
+def record_game(seed: int) -> list:
+    rng = random.Random(seed)
+    random.seed(seed)
+    room = GameRoom()
+    owners = [f"user-{index}" for index in range(PLAYER_COUNT)]
+    viewers = owners + [None] * SPECTATORS
+    syncs = [ViewerSync(viewer) for viewer in viewers]
+    frames = [[sync.snapshot(room)] for sync in syncs]
+    clock = 1_700_000_000.0
+
+    def run(command: dict) -> None:
+        nonlocal clock
+        clock += rng.uniform(0.5, 20)
+        command["ts"] = clock
+        reply = apply_command(room, command)
+        if reply is not None and command.get("owner_id") in owners:
+            frames[owners.index(command["owner_id"])].append(reply)
+        for index, sync in enumerate(syncs):
+            message = sync.delta(room)
+            if message is not None:
+                frames[index].append(message)
+
+    for index, owner_id in enumerate(owners):
+        run({"op": "join", "name": f"玩家{index + 1}", "avatar_url": None, "owner_id": owner_id})
+    run({"op": "start", "mode": "CLASSIC"})
+    for _ in range(MAX_COMMANDS):
+        if room.phase == Phase.END:
+            break
+        owner_id = rng.choice(owners)
+        player = room.player_for_owner(owner_id)
+        actions = room.viewer_payload(owner_id)["available_actions"]
+        if not actions:
+            run({"op": "tick"})
+            continue
+        action = rng.choice(actions)
+        targets = action.get("targets") or [None]
+        run({
+            "op": "action",
+            "owner_id": owner_id,
+            "player_id": player.id,
+            "action": action["id"],
+            "target_id": rng.choice(targets),
+            "target_id_2": rng.choice(targets),
+            "text": "我是好人，过。" if action["id"] == "morning_speak" else None,
+        })
+    return frames
+
+
+def deflated_size(messages: list) -> int:
+    compressor = zlib.compressobj(wbits=-15)
+    total = 0
+    for message in messages:
+        total += len(compressor.compress(message) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total
+
+
+def run() -> None:
+    connections = []
+    for seed in range(GAMES):
+        connections.extend(record_game(seed))
+    texts = [[text.encode("utf-8") for text in frames] for frames in connections]
+    start = time.perf_counter()
+    binaries = [[encode_text(text) for text in frames] for frames in connections]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for frames in connections:
+        for text in frames:
+            json.loads(text)
+    json_decode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for frames in binaries:
+        for data in frames:
+            unpack(data)
+    binary_decode_time = time.perf_counter() - start
+    assert all(
+        unpack(data) == json.loads(text)
+        for frames, encoded in zip(connections, binaries)
+        for text, data in zip(frames, encoded)
+    )
+
+    frame_count = sum(len(frames) for frames in connections)
+    hello = len(HELLO.encode("utf-8")) * len(connections)
+    json_raw = sum(len(data) for frames in texts for data in frames)
+    binary_raw = sum(len(data) for frames in binaries for data in frames) + hello
+    json_deflated = sum(deflated_size(frames) for frames in texts)
+    binary_deflated = sum(deflated_size([HELLO.encode("utf-8")] + frames) for frames in binaries)
+    per_connection = len(connections)
+    print(f"{GAMES} recorded games, {per_connection} connections, {frame_count} frames")
+    print(f"{'':10s} {'raw KiB/conn':>13s} {'deflate KiB/conn':>17s}")
+    print(f"{'json':10s} {json_raw / per_connection / 1024:13.1f} {json_deflated / per_connection / 1024:17.1f}")
+    print(f"{'binary':10s} {binary_raw / per_connection / 1024:13.1f} {binary_deflated / per_connection / 1024:17.1f}")
+    print(f"binary is {binary_raw / json_raw:.0%} of json raw, {binary_deflated / json_deflated:.0%} deflated (hello frame included)")
+    print(
+        f"server encode {encode_time / frame_count * 1e6:.1f} us/frame on top of json; "
+        f"decode json {json_decode_time / frame_count * 1e6:.1f} us, binary {binary_decode_time / frame_count * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,396 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import websockets
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+
+HOST = "127.0.0.1"
+STALL_SECONDS = 3.0
+LOGIN_CONCURRENCY = 8
+
+
+def start_server(port: int, bot_id: str, bot_secret: str, workdir: Path) -> subprocess.Popen:
+    code = (
+        "import sys; "
+        f"sys.path.insert(0, r'{APPS_DIR}'); "
+        "import uvicorn; "
+        "from fastapi import FastAPI; "
+        "from werewolf import main; "
+        "app = FastAPI(); "
+        "main.register(app); "
+        f"uvicorn.run(app, host='{HOST}', port={port}, log_level='warning')"
+    )
+    env = os.environ.copy()
+    env["WEREWOLF_BOT_ID"] = bot_id
+    env["WEREWOLF_BOT_SECRET"] = bot_secret
+    return subprocess.Popen([sys.executable, "-c", code], cwd=str(workdir), env=env, stdout=subprocess.DEVNULL)
+
+
+def http_request(
+    port: int, method: str, path: str, body: str = "", headers: Optional[dict] = None
+) -> Tuple[int, http.client.HTTPMessage, bytes]:
+    conn = http.client.HTTPConnection(HOST, port, timeout=30)
+    try:
+        conn.request(method, path, body=body.encode("utf-8"), headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        conn.close()
+
+
+def wait_for_server(port: int, proc: subprocess.Popen, timeout: float = 30) -> None:
+    start = time.time()
+    while time.time() - start < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited before server became ready")
+        try:
+            http_request(port, "GET", "/werewolf/login")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def signed_post(port: int, bot_id: str, bot_secret: str, path: str, payload: dict) -> dict:
+    body = json.dumps(payload)
+    timestamp = str(int(time.time()))
+    nonce = secrets.token_hex(8)
+    message = f"POST\n{path}\n{body}\n{timestamp}\n{nonce}"
+    signature = hmac.new(bot_secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+    headers = {
+        "Content-Type": "application/json",
+        "X-Bot-Id": bot_id,
+        "X-Timestamp": timestamp,
+        "X-Nonce": nonce,
+        "X-Signature": signature,
+    }
+    status, _, data = http_request(port, "POST", path, body, headers)
+    if status != 200:
+        raise RuntimeError(f"{path} failed: {status} {data[:200]!r}")
+    return json.loads(data)
+
+
+def provision_and_login(port: int, bot_id: str, bot_secret: str, qq_uin: str) -> str:
+    account = signed_post(port, bot_id, bot_secret, "/werewolf/internal/provision", {"qq_uin": qq_uin})
+    signed_post(port, bot_id, bot_secret, "/werewolf/internal/confirm", {"qq_uin": qq_uin})
+    form = f"qq_uin={qq_uin}&secret={account['secret']}&next=/werewolf/"
+    status, headers, _ = http_request(
+        port, "POST", "/werewolf/login", form, {"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    if status != 303:
+        raise RuntimeError(f"login failed for {qq_uin}: {status}")
+    for header in headers.get_all("set-cookie") or []:
+        name, _, rest = header.partition("=")
+        if name.strip() == "werewolf_session":
+            return rest.split(";", 1)[0]
+    raise RuntimeError(f"no session cookie for {qq_uin}")
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def apply_players_delta(state: dict, delta: dict) -> None:
+    by_id = {player["id"]: player for player in state.get("players", [])}
+    for player_id in delta.get("remove", []):
+        by_id.pop(player_id, None)
+    for player_id, fields in delta.get("changed", {}).items():
+        by_id[player_id] = {**by_id.get(player_id, {}), **fields}
+    order = delta.get("order") or [player["id"] for player in state.get("players", [])]
+    state["players"] = [by_id[player_id] for player_id in order if player_id in by_id]
+
+
+def apply_events_delta(state: dict, delta: dict) -> None:
+    events = [] if delta.get("reset") else list(state.get("events", []))
+    positions = {event["seq"]: index for index, event in enumerate(events)}
+    for item in delta.get("upsert", []):
+        index = positions.get(item["seq"])
+        if index is None:
+            positions[item["seq"]] = len(events)
+            events.append(item)
+        else:
+            events[index] = item
+    limit = state.get("limits", {}).get("max_events") or len(events)
+    state["events"] = events[-limit:]
+
+
+class RoomTracker:
+    def __init__(self, room_id: str) -> None:
+        self.room_id = room_id
+        self.clients: List["BotClient"] = []
+        self.pending: List[Tuple[float, int, set]] = []
+        self.last_rev = -1
+        self.last_change = time.perf_counter()
+        self.games_done = 0
+
+    def sent(self, base_rev: int) -> None:
+        self.pending.append((time.perf_counter(), base_rev, {id(client) for client in self.clients}))
+
+    def received(self, client: "BotClient", rev: int, samples: List[float]) -> None:
+        now = time.perf_counter()
+        if rev > self.last_rev:
+            self.last_rev = rev
+            self.last_change = now
+        key = id(client)
+        for sent_at, base_rev, waiting in self.pending:
+            if base_rev < rev and key in waiting:
+                waiting.discard(key)
+                samples.append(now - sent_at)
+        self.pending = [item for item in self.pending if item[2]]
+
+
+class BotClient:
+    def __init__(
+        self,
+        port: int,
+        tracker: RoomTracker,
+        cookie: Optional[str],
+        name: str,
+        rng: random.Random,
+        stats: "LoadStats",
+        is_host: bool = False,
+    ) -> None:
+        self.port = port
+        self.tracker = tracker
+        self.cookie = cookie
+        self.name = name
+        self.rng = rng
+        self.stats = stats
+        self.is_host = is_host
+        self.state: Optional[dict] = None
+        self.rev: Optional[int] = None
+        self.acted_key: Optional[tuple] = None
+        self.joined = False
+        self.ws = None
+
+    async def connect(self) -> None:
+        headers = {"Cookie": f"werewolf_session={self.cookie}"} if self.cookie else {}
+        url = f"ws://{HOST}:{self.port}/werewolf/room/{self.tracker.room_id}/ws"
+        self.ws = await websockets.connect(url, additional_headers=headers, max_size=None)
+
+    async def send(self, **message) -> None:
+        self.tracker.sent(self.rev or 0)
+        self.stats.sent += 1
+        await self.ws.send(json.dumps(message, ensure_ascii=False))
+
+    async def run(self) -> None:
+        async for raw in self.ws:
+            self.stats.received += 1
+            self.stats.received_bytes += len(raw)
+            data = json.loads(raw)
+            kind = data.get("type")
+            if kind == "delta":
+                if self.state is None or data["base"] != self.rev:
+                    await self.ws.send(json.dumps({"type": "resync"}))
+                    continue
+                self.state.update(data.get("set", {}))
+                if "players" in data:
+                    apply_players_delta(self.state, data["players"])
+                if "events" in data:
+                    apply_events_delta(self.state, data["events"])
+                self.rev = data["rev"]
+            elif kind == "snapshot":
+                self.state = data
+                self.rev = data["rev"]
+            elif kind == "action_result":
+                if not data["ok"]:
+                    self.stats.rejected += 1
+                continue
+            else:
+                continue
+            self.tracker.received(self, self.rev, self.stats.latencies)
+            if self.cookie:
+                await self.play()
+
+    async def play(self) -> None:
+        state = self.state
+        phase = state.get("phase_code")
+        viewer = state.get("viewer") or {}
+        if not self.joined and phase == "LOBBY" and not viewer.get("player_id"):
+            self.joined = True
+            await self.send(type="join", display_name=self.name)
+            return
+        if self.is_host and phase == "LOBBY":
+            if len(state.get("players", [])) == self.stats.players_per_room and self.acted_key != ("LOBBY",):
+                self.acted_key = ("LOBBY",)
+                await self.send(type="start", mode="CLASSIC")
+            return
+        if self.is_host and phase == "END" and self.acted_key != ("END",):
+            self.acted_key = ("END",)
+            self.tracker.games_done += 1
+            self.stats.games_done += 1
+            if self.tracker.games_done < self.stats.games_per_room:
+                await self.send(type="back_to_lobby")
+            return
+        actions = [action for action in state.get("available_actions", []) if action["target_count"] <= 1]
+        key = (phase, state.get("day"), (state.get("morning") or {}).get("speaker_id"))
+        if not actions or key == self.acted_key:
+            return
+        self.acted_key = key
+        action = self.rng.choice(actions)
+        player_id = viewer.get("player_id")
+        target_id = self.rng.choice(action["targets"]) if action["target_count"] and action["targets"] else None
+        text = f"{self.name} 过" if action["id"] == "morning_speak" else None
+        await self.send(type="action", player_id=player_id, action=action["id"], target_id=target_id, text=text)
+        if phase == "MORNING" and action["id"] != "morning_skip":
+            await self.send(type="action", player_id=player_id, action="morning_skip")
+
+
+class LoadStats:
+    def __init__(self, players_per_room: int, games_per_room: int) -> None:
+        self.players_per_room = players_per_room
+        self.games_per_room = games_per_room
+        self.sent = 0
+        self.received = 0
+        self.received_bytes = 0
+        self.rejected = 0
+        self.games_done = 0
+        self.latencies: List[float] = []
+
+
+async def watchdog(trackers: List[RoomTracker], stats: LoadStats, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(0.5)
+        if all(tracker.games_done >= stats.games_per_room for tracker in trackers):
+            return
+        now = time.perf_counter()
+        for tracker in trackers:
+            host = tracker.clients[0]
+            phase = (host.state or {}).get("phase_code")
+            if phase in (None, "LOBBY", "END") or now - tracker.last_change < STALL_SECONDS:
+                continue
+            tracker.last_change = now
+            await host.send(type="advance")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load(args: argparse.Namespace, port: int, bot_id: str, bot_secret: str, server_pid: int) -> dict:
+    rng = random.Random(args.seed)
+    stats = LoadStats(args.players, args.games)
+    base_uin = 500000000 + rng.randrange(100000000)
+    semaphore = asyncio.Semaphore(LOGIN_CONCURRENCY)
+
+    async def login(index: int) -> str:
+        async with semaphore:
+            return await asyncio.to_thread(provision_and_login, port, bot_id, bot_secret, str(base_uin + index))
+
+    login_started = time.perf_counter()
+    cookies = await asyncio.gather(*(login(index) for index in range(args.rooms * args.players)))
+    login_time = time.perf_counter() - login_started
+
+    trackers = []
+    for room_index in range(args.rooms):
+        tracker = RoomTracker(f"load{uuid.uuid4().hex[:6]}")
+        for seat in range(args.players):
+            cookie = cookies[room_index * args.players + seat]
+            tracker.clients.append(
+                BotClient(port, tracker, cookie, f"bot{seat + 1}", rng, stats, is_host=seat == 0)
+            )
+        for _ in range(args.spectators):
+            tracker.clients.append(BotClient(port, tracker, None, "", rng, stats))
+        trackers.append(tracker)
+
+    clients = [client for tracker in trackers for client in tracker.clients]
+    for tracker in trackers:
+        for client in tracker.clients:
+            await client.connect()
+
+    peak_rss = read_rss_kb(server_pid) or 0
+    started = time.perf_counter()
+    deadline = started + args.duration
+    tasks = [asyncio.create_task(client.run()) for client in clients]
+    guard = asyncio.create_task(watchdog(trackers, stats, deadline))
+    while not guard.done():
+        await asyncio.sleep(1)
+        peak_rss = max(peak_rss, read_rss_kb(server_pid) or 0)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.ws.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "rooms": args.rooms,
+        "connections": len(clients),
+        "games_completed": stats.games_done,
+        "login_seconds": round(login_time, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "messages_sent": stats.sent,
+        "messages_received": stats.received,
+        "messages_per_second": round(stats.received / elapsed, 1) if elapsed else 0.0,
+        "received_mib": round(stats.received_bytes / 1024 / 1024, 2),
+        "rejected_actions": stats.rejected,
+        "latency_samples": len(stats.latencies),
+        "latency_p50_ms": round(percentile(stats.latencies, 0.50) * 1000, 2),
+        "latency_p99_ms": round(percentile(stats.latencies, 0.99) * 1000, 2),
+        "latency_mean_ms": round(statistics.fmean(stats.latencies) * 1000, 2) if stats.latencies else 0.0,
+        "server_rss_mib": round((read_rss_kb(server_pid) or 0) / 1024, 1),
+        "server_peak_rss_mib": round(peak_rss / 1024, 1),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Headless werewolf load test with scripted bot clients.")
+    parser.add_argument("--rooms", type=int, default=30)
+    parser.add_argument("--players", type=int, default=9)
+    parser.add_argument("--spectators", type=int, default=3)
+    parser.add_argument("--games", type=int, default=2, help="games to finish in every room")
+    parser.add_argument("--duration", type=float, default=300, help="stop after this many seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    return parser.parse_args()
+
+
+def run() -> None:
+    args = parse_args()
+    bot_id = "load-test"
+    bot_secret = secrets.token_hex(16)
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(args.port, bot_id, bot_secret, Path(workdir))
+        try:
+            wait_for_server(args.port, server)
+            report = asyncio.run(run_load(args, args.port, bot_id, bot_secret, server.pid))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    run()
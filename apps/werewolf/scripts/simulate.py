@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+APPS_DIR = SCRIPT_DIR.parents[1]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.enum import Kind, Mode, Phase
+from werewolf.game_mode import GameMode
+from werewolf.web_engine import ActionType, GameRoom, PlayerState
+
+MAX_STEPS = 2000
+CHUNK_GAMES = 250
+STEP_SECONDS = 5.0
+Choice = Tuple[str, Optional[str], Optional[str]]
+Policy = Callable[[GameRoom, PlayerState, List[dict], random.Random], Choice]
+
+
+def random_policy(room: GameRoom, player: PlayerState, actions: List[dict], rng: random.Random) -> Choice:
+    action = rng.choice(actions)
+    targets = action["targets"]
+    if action["target_count"] == 0 or not targets:
+        return action["id"], None, None
+    if action["target_count"] == 2 and len(targets) >= 2:
+        first, second = rng.sample(targets, 2)
+        return action["id"], first, second
+    return action["id"], rng.choice(targets), None
+
+
+def scripted_policy(room: GameRoom, player: PlayerState, actions: List[dict], rng: random.Random) -> Choice:
+    by_id = {action["id"]: action for action in actions}
+    wolf = player.kind == Kind.WEREWOLF
+
+    def pick(action_id: str) -> Optional[str]:
+        targets = [target for target in by_id[action_id]["targets"] if target != player.id]
+        if wolf:
+            targets = [target for target in targets if room.players[target].kind != Kind.WEREWOLF] or targets
+        return rng.choice(targets) if targets else None
+
+    if ActionType.NERD_REVEAL in by_id:
+        return ActionType.NERD_REVEAL, None, None
+    if ActionType.WITCH_SAVE in by_id and rng.random() < 0.7:
+        return ActionType.WITCH_SAVE, by_id[ActionType.WITCH_SAVE]["targets"][0], None
+    if ActionType.WITCH_POISON in by_id and rng.random() < 0.2:
+        return ActionType.WITCH_POISON, pick(ActionType.WITCH_POISON), None
+    if ActionType.WHITE_WOLF_BOOM in by_id and rng.random() < 0.1:
+        return ActionType.WHITE_WOLF_BOOM, pick(ActionType.WHITE_WOLF_BOOM), None
+    if ActionType.RIDER_DUEL in by_id and rng.random() < 0.2:
+        return ActionType.RIDER_DUEL, pick(ActionType.RIDER_DUEL), None
+    if ActionType.RAISE_HAND in by_id:
+        return (ActionType.RAISE_HAND if rng.random() < 0.4 else ActionType.POLICE_SKIP), None, None
+    if ActionType.CUPID_LINK in by_id:
+        targets = by_id[ActionType.CUPID_LINK]["targets"]
+        if len(targets) >= 2:
+            first, second = rng.sample(targets, 2)
+            return ActionType.CUPID_LINK, first, second
+    for action_id in (
+        ActionType.WOLF_KILL,
+        ActionType.SEER_CHECK,
+        ActionType.GUARD_PROTECT,
+        ActionType.HUNTER_SHOOT,
+        ActionType.EXPLORER_BUY,
+        ActionType.ELECTION_VOTE,
+        ActionType.DAY_VOTE,
+    ):
+        if action_id in by_id:
+            if by_id[action_id]["target_count"] == 0:
+                return action_id, None, None
+            return action_id, pick(action_id), None
+    if ActionType.MORNING_SKIP in by_id:
+        return ActionType.MORNING_SKIP, None, None
+    return random_policy(room, player, actions, rng)
+
+
+POLICIES: Dict[str, Policy] = {"random": random_policy, "scripted": scripted_policy}
+
+
+class Timings:
+    def __init__(self) -> None:
+        self.seconds: Counter = Counter()
+        self.calls: Counter = Counter()
+
+    def add(self, name: str, start: float) -> None:
+        self.seconds[name] += time.perf_counter() - start
+        self.calls[name] += 1
+
+
+def player_counts(mode: Mode) -> List[int]:
+    counts = set()
+    for low, high in GameMode.STRATEGIES[mode.name].ROLE_CONFIG:
+        counts.update(range(max(low, 3), min(high, 9) + 1))
+    return sorted(counts)
+
+
+def winner_of(room: GameRoom) -> str:
+    for event in reversed(room.events):
+        if event.type == "GAME_END":
+            return event.payload["winner"]
+    return "unfinished"
+
+
+def play_game(mode: Mode, players: int, policy: Policy, rng: random.Random, payloads: bool, timings: Timings) -> Tuple[str, int]:
+    room = GameRoom()
+    room.clock = 0.0
+    room.mode = mode
+    owners = []
+    for index in range(players):
+        owner_id = f"sim-{index}"
+        room.add_player(f"玩家{index + 1}", avatar_url=None, owner_id=owner_id)
+        owners.append(owner_id)
+    room.start_game(GameMode(game_mode=mode, num_players=players).strategy.generate_role_list(players))
+    seats = [room.player_for_owner(owner_id) for owner_id in owners]
+    steps = 0
+    while room.phase != Phase.END and steps < MAX_STEPS:
+        steps += 1
+        room.clock += STEP_SECONDS
+        acted = False
+        for owner_id, player in zip(owners, seats):
+            if player.id in room.actions and room.phase != Phase.MORNING:
+                continue
+            start = time.perf_counter()
+            actions = room.available_actions_for(player)
+            timings.add("available_actions_for", start)
+            if not actions:
+                continue
+            action, target_id, target_id_2 = policy(room, player, actions, rng)
+            ok, _ = room.record_action(owner_id, player.id, action, target_id, target_id_2, "过。")
+            if not ok:
+                ok, _ = room.record_action(owner_id, player.id, ActionType.PASS, None, None)
+            acted = acted or ok
+            if room.phase == Phase.END:
+                break
+        if payloads:
+            for owner_id in owners:
+                start = time.perf_counter()
+                room.payload(owner_id)
+                timings.add("payload", start)
+        if not acted and room.phase != Phase.END:
+            room.advance()
+    return winner_of(room), steps
+
+
+def play_chunk(job: tuple) -> dict:
+    mode_name, players, policy_name, seed, games, payloads = job
+    random.seed(seed)
+    rng = random.Random(seed)
+    timings = Timings()
+    resolve_night = GameRoom._resolve_night
+
+    def timed_resolve_night(room: GameRoom) -> None:
+        start = time.perf_counter()
+        resolve_night(room)
+        timings.add("_resolve_night", start)
+
+    GameRoom._resolve_night = timed_resolve_night
+    wins: Counter = Counter()
+    steps = 0
+    try:
+        for _ in range(games):
+            winner, game_steps = play_game(Mode[mode_name], players, POLICIES[policy_name], rng, payloads, timings)
+            wins[winner] += 1
+            steps += game_steps
+    finally:
+        GameRoom._resolve_night = resolve_night
+    return {
+        "mode": mode_name,
+        "players": players,
+        "wins": dict(wins),
+        "steps": steps,
+        "seconds": dict(timings.seconds),
+        "calls": dict(timings.calls),
+    }
+
+
+def build_jobs(args: argparse.Namespace) -> List[tuple]:
+    jobs = []
+    seed = args.seed
+    for mode in Mode:
+        if args.modes and mode.name not in args.modes:
+            continue
+        for players in player_counts(mode):
+            remaining = args.games
+            while remaining > 0:
+                games = min(CHUNK_GAMES, remaining)
+                jobs.append((mode.name, players, args.policy, seed, games, args.payloads))
+                remaining -= games
+                seed += 1
+    return jobs
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Headless Monte-Carlo werewolf simulator.")
+    parser.add_argument("--games", type=int, default=1000, help="games per mode and player count")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="scripted")
+    parser.add_argument("--modes", nargs="*", choices=[mode.name for mode in Mode])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--payloads", action="store_true", help="build every viewer payload after each step")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    return parser.parse_args()
+
+
+def run() -> None:
+    args = parse_args()
+    jobs = build_jobs(args)
+    start = time.perf_counter()
+    cells: Dict[tuple, dict] = {}
+    seconds: Counter = Counter()
+    calls: Counter = Counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for result in pool.map(play_chunk, jobs):
+            cell = cells.setdefault((result["mode"], result["players"]), {"wins": Counter(), "steps": 0})
+            cell["wins"].update(result["wins"])
+            cell["steps"] += result["steps"]
+            seconds.update(result["seconds"])
+            calls.update(result["calls"])
+    elapsed = time.perf_counter() - start
+
+    camps = [Kind.VILLAGER.value, Kind.WEREWOLF.value, Kind.CUPID.value, "无人胜利", "unfinished"]
+    print(f"policy {args.policy}, {args.workers} workers")
+    print(f"{'mode':>13s} {'n':>2s} {'games':>7s} {'village':>8s} {'wolves':>8s} {'cupid':>8s} {'nobody':>8s} {'stuck':>6s} {'steps':>6s}")
+    report = []
+    total_games = 0
+    for (mode_name, players), cell in cells.items():
+        games = sum(cell["wins"].values())
+        total_games += games
+        rates = [cell["wins"].get(camp, 0) / games for camp in camps]
+        print(
+            f"{mode_name:>13s} {players:2d} {games:7d} "
+            + " ".join(f"{rate:8.1%}" for rate in rates[:4])
+            + f" {cell['wins'].get('unfinished', 0):6d} {cell['steps'] / games:6.1f}"
+        )
+        report.append({"mode": mode_name, "players": players, "games": games, "wins": dict(cell["wins"])})
+    print(f"{total_games} games in {elapsed:.1f} s: {total_games / elapsed:.0f} games/s")
+    hot_paths = {name: seconds[name] / calls[name] * 1e6 for name in sorted(calls)}
+    for name, micros in hot_paths.items():
+        print(f"{name:>22s}: {micros:7.2f} us/call over {calls[name]} calls")
+    if args.output:
+        args.output.write_text(
+            json.dumps({"games_per_second": total_games / elapsed, "cells": report, "hot_paths_us": hot_paths}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,140 @@
+import asyncio
+import functools
+import hashlib
+import heapq
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+HEAP_SLACK = 1024
+DB_PURGE_INTERVAL_SECONDS = 60
+DB_BUSY_TIMEOUT_MS = 5000
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class ExpiringMap(Generic[K, V]):
+    __slots__ = ("_values", "_expiry", "_heap", "expired")
+
+    def __init__(self) -> None:
+        self._values: Dict[K, V] = {}
+        self._expiry: Dict[K, int] = {}
+        self._heap: List[Tuple[int, K]] = []
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._values
+
+    def get(self, key: K, now: int) -> Optional[V]:
+        self.purge(now)
+        return self._values.get(key)
+
+    def set(self, key: K, value: V, expires_at: int) -> None:
+        self._values[key] = value
+        self._expiry[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        if len(self._heap) > 2 * len(self._expiry) + HEAP_SLACK:
+            self._heap = [(expires_at, key) for key, expires_at in self._expiry.items()]
+            heapq.heapify(self._heap)
+
+    def pop(self, key: K) -> Optional[V]:
+        self._expiry.pop(key, None)
+        return self._values.pop(key, None)
+
+    def purge(self, now: int) -> int:
+        heap = self._heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+                del self._values[key]
+                removed += 1
+        self.expired += removed
+        return removed
+
+    def stats(self) -> dict:
+        return {"size": len(self._values), "heap": len(self._heap), "expired": self.expired}
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionDatabase:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="werewolf-sessions")
+        self._last_purge = 0
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path))
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.execute(f"pragma busy_timeout={DB_BUSY_TIMEOUT_MS}")
+            conn.execute(
+                """
+                create table if not exists sessions (
+                    token_hash text primary key,
+                    user_id text not null,
+                    expires_at integer not null
+                )
+                """
+            )
+            conn.execute("create index if not exists sessions_expires_at on sessions(expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def _load(self, now: int) -> List[Tuple[str, str, int]]:
+        conn = self._connect()
+        with conn:
+            conn.execute("delete from sessions where expires_at <= ?", (now,))
+        self._last_purge = now
+        return conn.execute("select token_hash, user_id, expires_at from sessions").fetchall()
+
+    def _save(self, key: str, user_id: str, expires_at: int, now: int) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "insert or replace into sessions (token_hash, user_id, expires_at) values (?, ?, ?)",
+                (key, user_id, expires_at),
+            )
+            if now - self._last_purge >= DB_PURGE_INTERVAL_SECONDS:
+                conn.execute("delete from sessions where expires_at <= ?", (now,))
+                self._last_purge = now
+
+    def _delete(self, key: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("delete from sessions where token_hash = ?", (key,))
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def load(self, now: int) -> List[Tuple[str, str, int]]:
+        return await self._run(self._load, now)
+
+    async def save(self, key: str, user_id: str, expires_at: int, now: int) -> None:
+        await self._run(self._save, key, user_id, expires_at, now)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def close(self) -> None:
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,309 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import secrets
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from .sessions import ExpiringMap, SessionDatabase, token_key
+from .web_engine import GameRoom
+
+RoomChangedHandler = Callable[[str, int], Awaitable[None]]
+
+logger = logging.getLogger("werewolf")
+
+KEY_PREFIX = "werewolf"
+ROOM_CHANNEL = f"{KEY_PREFIX}:rooms"
+LOCK_TTL_MS = 5000
+LOCK_RETRY_SECONDS = 0.01
+RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+class RoomStore(ABC):
+    async def start(self, on_room_changed: RoomChangedHandler) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    @abstractmethod
+    async def room_exists(self, room_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load_room(self, room_id: str, cached: Optional[GameRoom] = None) -> Optional[GameRoom]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_room(self, room_id: str, room: GameRoom) -> None:
+        raise NotImplementedError
+
+    async def discard_room(self, room_id: str) -> None:
+        return None
+
+    @abstractmethod
+    def lock(self, room_id: str) -> contextlib.AbstractAsyncContextManager:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_session(self, token: str, user_id: str, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_session(self, token: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_session(self, token: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim_nonce(self, nonce: str, ttl_seconds: int) -> bool:
+        raise NotImplementedError
+
+
+class MemoryRoomStore(RoomStore):
+    def __init__(self, session_db: Optional[Path] = None) -> None:
+        self.rooms: Dict[str, GameRoom] = {}
+        self.sessions: ExpiringMap[str, str] = ExpiringMap()
+        self.nonces: ExpiringMap[str, bool] = ExpiringMap()
+        self.session_db = SessionDatabase(session_db) if session_db is not None else None
+
+    async def start(self, on_room_changed: RoomChangedHandler) -> None:
+        if self.session_db is None:
+            return
+        for key, user_id, expires_at in await self.session_db.load(int(time.time())):
+            self.sessions.set(key, user_id, expires_at)
+        logger.info("restored %d werewolf sessions", len(self.sessions))
+
+    async def close(self) -> None:
+        if self.session_db is not None:
+            await self.session_db.close()
+
+    async def room_exists(self, room_id: str) -> bool:
+        return room_id in self.rooms
+
+    async def load_room(self, room_id: str, cached: Optional[GameRoom] = None) -> Optional[GameRoom]:
+        return self.rooms.get(room_id, cached)
+
+    async def save_room(self, room_id: str, room: GameRoom) -> None:
+        self.rooms[room_id] = room
+
+    async def discard_room(self, room_id: str) -> None:
+        self.rooms.pop(room_id, None)
+
+    def lock(self, room_id: str) -> contextlib.AbstractAsyncContextManager:
+        return contextlib.nullcontext()
+
+    async def set_session(self, token: str, user_id: str, ttl_seconds: int) -> None:
+        now_ts = int(time.time())
+        key = token_key(token)
+        self.sessions.purge(now_ts)
+        self.sessions.set(key, user_id, now_ts + ttl_seconds)
+        if self.session_db is not None:
+            await self.session_db.save(key, user_id, now_ts + ttl_seconds, now_ts)
+
+    async def get_session(self, token: str) -> Optional[str]:
+        return self.sessions.get(token_key(token), int(time.time()))
+
+    async def delete_session(self, token: str) -> None:
+        key = token_key(token)
+        self.sessions.pop(key)
+        if self.session_db is not None:
+            await self.session_db.delete(key)
+
+    async def claim_nonce(self, nonce: str, ttl_seconds: int) -> bool:
+        now_ts = int(time.time())
+        self.nonces.purge(now_ts)
+        if nonce in self.nonces:
+            return False
+        self.nonces.set(nonce, True, now_ts + ttl_seconds)
+        return True
+
+
+class RedisError(RuntimeError):
+    pass
+
+
+class RespConnection:
+    def __init__(self, host: str, port: int, password: Optional[str] = None, db: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.password = password
+        self.db = db
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(OSError):
+                await self._writer.wait_closed()
+        self._reader = None
+        self._writer = None
+
+    async def execute(self, *args: str) -> object:
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+            try:
+                return await self._roundtrip(*args)
+            except (OSError, asyncio.IncompleteReadError):
+                await self.close()
+                await self.connect()
+                return await self._roundtrip(*args)
+
+    async def send_command(self, *args: str) -> None:
+        if self._writer is None:
+            await self.connect()
+        self._writer.write(_encode_command(args))
+        await self._writer.drain()
+
+    async def read_reply(self) -> object:
+        line = await self._reader.readuntil(b"\r\n")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RedisError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode("utf-8")
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise RedisError(f"unexpected reply: {line!r}")
+
+    async def _roundtrip(self, *args: str) -> object:
+        await self.send_command(*args)
+        return await self.read_reply()
+
+
+def _encode_command(args: Tuple[str, ...]) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode("utf-8")]
+    for arg in args:
+        data = str(arg).encode("utf-8")
+        parts.append(f"${len(data)}\r\n".encode("utf-8"))
+        parts.append(data)
+        parts.append(b"\r\n")
+    return b"".join(parts)
+
+
+def parse_redis_url(url: str) -> Tuple[str, int, Optional[str], int]:
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"unsupported redis url: {url}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "127.0.0.1", parsed.port or 6379, parsed.password, db
+
+
+class RedisRoomStore(RoomStore):
+    def __init__(self, url: str) -> None:
+        self.host, self.port, self.password, self.db = parse_redis_url(url)
+        self.conn = RespConnection(self.host, self.port, self.password, self.db)
+        self._subscriber: Optional[asyncio.Task] = None
+
+    def _room_key(self, room_id: str) -> str:
+        return f"{KEY_PREFIX}:room:{room_id}"
+
+    async def start(self, on_room_changed: RoomChangedHandler) -> None:
+        self._subscriber = asyncio.create_task(self._listen(on_room_changed))
+
+    async def close(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._subscriber
+        await self.conn.close()
+
+    async def _listen(self, on_room_changed: RoomChangedHandler) -> None:
+        while True:
+            conn = RespConnection(self.host, self.port, self.password, self.db)
+            try:
+                await conn.send_command("SUBSCRIBE", ROOM_CHANNEL)
+                while True:
+                    reply = await conn.read_reply()
+                    if not isinstance(reply, list) or len(reply) != 3 or reply[0] != "message":
+                        continue
+                    room_id, _, revision = reply[2].rpartition(":")
+                    try:
+                        await on_room_changed(room_id, int(revision))
+                    except Exception:
+                        logger.exception("room change handler failed for %s", room_id)
+            except (OSError, asyncio.IncompleteReadError, RedisError):
+                await asyncio.sleep(1)
+            finally:
+                await conn.close()
+
+    async def room_exists(self, room_id: str) -> bool:
+        return bool(await self.conn.execute("EXISTS", f"{self._room_key(room_id)}:state"))
+
+    async def load_room(self, room_id: str, cached: Optional[GameRoom] = None) -> Optional[GameRoom]:
+        key = self._room_key(room_id)
+        if cached is not None:
+            revision = await self.conn.execute("GET", f"{key}:rev")
+            if revision is None or int(revision) == cached.revision:
+                return cached
+        state = await self.conn.execute("GET", f"{key}:state")
+        if state is None:
+            return None
+        return GameRoom.from_state(json.loads(state))
+
+    async def save_room(self, room_id: str, room: GameRoom) -> None:
+        key = self._room_key(room_id)
+        state = json.dumps(room.to_state(), ensure_ascii=False)
+        await self.conn.execute("MSET", f"{key}:state", state, f"{key}:rev", str(room.revision))
+        await self.conn.execute("PUBLISH", ROOM_CHANNEL, f"{room_id}:{room.revision}")
+
+    @contextlib.asynccontextmanager
+    async def lock(self, room_id: str) -> AsyncIterator[None]:
+        key = f"{self._room_key(room_id)}:lock"
+        token = secrets.token_hex(8)
+        while not await self.conn.execute("SET", key, token, "NX", "PX", str(LOCK_TTL_MS)):
+            await asyncio.sleep(LOCK_RETRY_SECONDS)
+        try:
+            yield
+        finally:
+            await self.conn.execute("EVAL", RELEASE_LOCK_SCRIPT, "1", key, token)
+
+    async def set_session(self, token: str, user_id: str, ttl_seconds: int) -> None:
+        await self.conn.execute("SET", f"{KEY_PREFIX}:session:{token_key(token)}", user_id, "EX", str(ttl_seconds))
+
+    async def get_session(self, token: str) -> Optional[str]:
+        return await self.conn.execute("GET", f"{KEY_PREFIX}:session:{token_key(token)}")
+
+    async def delete_session(self, token: str) -> None:
+        await self.conn.execute("DEL", f"{KEY_PREFIX}:session:{token_key(token)}")
+
+    async def claim_nonce(self, nonce: str, ttl_seconds: int) -> bool:
+        reply = await self.conn.execute("SET", f"{KEY_PREFIX}:nonce:{nonce}", "1", "NX", "EX", str(ttl_seconds))
+        return reply is not None
+
+
+def create_store(url: Optional[str] = None, session_db: Optional[Path] = None) -> RoomStore:
+    url = url if url is not None else os.getenv("WEREWOLF_REDIS_URL", "")
+    if url:
+        return RedisRoomStore(url)
+    return MemoryRoomStore(session_db)
@@ -34,21 +34,29 @@ class Strategy(ABC):
         random.shuffle(roles)
         return roles
 
+    @staticmethod
+    def _alive_camps(player_manager: Any) -> tuple[int, int, int, int]:
+        roster = player_manager.roster
+        alive = roster.alive
+        return (
+            alive,
+            alive & roster.kind(Kind.VILLAGER),
+            alive & roster.kind(Kind.WEREWOLF),
+            alive & roster.kind(Kind.CUPID),
+        )
+
     @staticmethod
     def check_victory_1(player_manager: Any):
-        if all(not p.alive for p in player_manager.players.values()):
+        alive, villagers_alive, werewolves_alive, cupids_alive = Strategy._alive_camps(player_manager)
+        if not alive:
             return True, "None"
-        players_alive = [player for player in player_manager.players.values() if player.alive]
-        villagers_alive = [player for player in players_alive if player.kind == Kind.VILLAGER]
-        werewolves_alive = [player for player in players_alive if player.kind == Kind.WEREWOLF]
-        cupids_alive = [player for player in players_alive if player.kind == Kind.CUPID]
         if cupids_alive:
             if not werewolves_alive and not villagers_alive:
                 return True, Kind.CUPID
             return False, None
         if werewolves_alive and villagers_alive:
-            if (not [p for p in villagers_alive if p.role == Role.VILLAGER] or
-                    all(p.role == Role.VILLAGER for p in villagers_alive)):
+            plain_villagers = villagers_alive & player_manager.roster.role(Role.VILLAGER)
+            if not plain_villagers or plain_villagers == villagers_alive:
                 return True, Kind.WEREWOLF
             return False, None
         if werewolves_alive:
@@ -59,12 +67,9 @@ class Strategy(ABC):
 
     @staticmethod
     def check_victory_2(player_manager: Any):
-        if all(not p.alive for p in player_manager.players.values()):
+        alive, villagers_alive, werewolves_alive, cupids_alive = Strategy._alive_camps(player_manager)
+        if not alive:
             return True, "None"
-        players_alive = [player for player in player_manager.players.values() if player.alive]
-        villagers_alive = [player for player in players_alive if player.kind == Kind.VILLAGER]
-        werewolves_alive = [player for player in players_alive if player.kind == Kind.WEREWOLF]
-        cupids_alive = [player for player in players_alive if player.kind == Kind.CUPID]
         if cupids_alive:
             if not werewolves_alive and not villagers_alive:
                 return True, Kind.CUPID
@@ -0,0 +1,140 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+from .web_engine import GameRoom
+
+LIST_KEYS = ("players", "events")
+
+
+def diff_players(previous: List[dict], current: List[dict]) -> Optional[dict]:
+    before = {player["id"]: player for player in previous}
+    changed: Dict[str, dict] = {}
+    for player in current:
+        old = before.pop(player["id"], None)
+        if old is None:
+            changed[player["id"]] = player
+            continue
+        fields = {key: value for key, value in player.items() if old.get(key) != value}
+        if fields:
+            changed[player["id"]] = fields
+    removed = list(before)
+    order = [player["id"] for player in current]
+    order_changed = order != [player["id"] for player in previous]
+    if not changed and not removed and not order_changed:
+        return None
+    result: dict = {}
+    if changed:
+        result["changed"] = changed
+    if removed:
+        result["remove"] = removed
+    if order_changed:
+        result["order"] = order
+    return result
+
+
+def diff_events(previous: List[dict], current: List[dict]) -> Optional[dict]:
+    last_seq = previous[-1]["seq"] if previous else 0
+    upsert: List[dict] = []
+    for event in reversed(current):
+        if event["seq"] > last_seq:
+            upsert.append(event)
+            continue
+        if event["seq"] == last_seq and event != previous[-1]:
+            upsert.append(event)
+        break
+    if not upsert:
+        return None
+    upsert.reverse()
+    return {"reset": False, "upsert": upsert}
+
+
+def _fragment(value: dict) -> str:
+    if not value:
+        return ""
+    return json.dumps(value, ensure_ascii=False)[1:-1]
+
+
+def public_delta(previous: dict, current: dict, epoch_changed: bool) -> Tuple[str, str]:
+    changes = {
+        key: value
+        for key, value in current.items()
+        if key not in LIST_KEYS and previous.get(key) != value
+    }
+    tail: dict = {}
+    players = diff_players(previous["players"], current["players"])
+    if players is not None:
+        tail["players"] = players
+    if epoch_changed:
+        tail["events"] = {"reset": True, "upsert": current["events"]}
+    else:
+        events = diff_events(previous["events"], current["events"])
+        if events is not None:
+            tail["events"] = events
+    return _fragment(changes), _fragment(tail)
+
+
+class ViewerSync:
+    def __init__(self, viewer_id: Optional[str]) -> None:
+        self.viewer_id = viewer_id
+        self.revision: Optional[int] = None
+        self.event_epoch: Optional[int] = None
+        self.public: Optional[dict] = None
+        self.overlay: Optional[dict] = None
+
+    def _remember(self, room: GameRoom, public: dict, overlay: dict) -> None:
+        self.revision = room.revision
+        self.event_epoch = room.event_epoch
+        self.public = public
+        self.overlay = overlay
+
+    def snapshot(self, room: GameRoom) -> str:
+        public_json = room.public_json()
+        overlay = room.viewer_payload(self.viewer_id)
+        self._remember(room, room.public_payload(), overlay)
+        return f'{{"type":"snapshot","rev":{room.revision},{public_json[1:-1]},{_fragment(overlay)}}}'
+
+    def resume(self, room: GameRoom, epoch: Optional[int], since: Optional[int]) -> str:
+        if epoch != room.event_epoch or since is None or since < 1:
+            return self.snapshot(room)
+        tail = room.events.since(since - 1)
+        if tail is None:
+            return self.snapshot(room)
+        public = room.public_payload()
+        overlay = room.viewer_payload(self.viewer_id)
+        self._remember(room, public, overlay)
+        partial = {key: value for key, value in public.items() if key != "events"}
+        return (
+            f'{{"type":"snapshot","rev":{room.revision},{_fragment(partial)},'
+            f'"events":{json.dumps([event.to_dict() for event in tail], ensure_ascii=False)},'
+            f'"events_since":{since},{_fragment(overlay)}}}'
+        )
+
+    def delta(self, room: GameRoom, shared: Optional[Dict[tuple, Tuple[str, str]]] = None) -> Optional[str]:
+        if self.public is None or self.overlay is None:
+            return self.snapshot(room)
+        public = room.public_payload()
+        overlay = room.viewer_payload(self.viewer_id)
+        public_set, tail = "", ""
+        epoch_changed = self.event_epoch != room.event_epoch
+        if self.public is not public or epoch_changed:
+            key = (id(self.public), self.event_epoch, id(public))
+            cached = shared.get(key) if shared is not None else None
+            if cached is None:
+                cached = public_delta(self.public, public, epoch_changed)
+                if shared is not None:
+                    shared[key] = cached
+            public_set, tail = cached
+        overlay_set = _fragment(
+            {key: value for key, value in overlay.items() if self.overlay.get(key) != value}
+        )
+        base = self.revision
+        self._remember(room, public, overlay)
+        if not public_set and not overlay_set and not tail:
+            return None
+        parts = [f'"type":"delta","base":{base},"rev":{room.revision}']
+        if public_set or overlay_set:
+            joined = ",".join(part for part in (public_set, overlay_set) if part)
+            parts.append(f'"set":{{{joined}}}')
+        if tail:
+            parts.append(tail)
+        return "{" + ",".join(parts) + "}"
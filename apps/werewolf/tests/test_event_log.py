@@ -0,0 +1,66 @@
+import sys
+import unittest
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.web_engine import EventLog, GameEvent  # noqa: E402
+
+
+def event(seq: int) -> GameEvent:
+    return GameEvent(seq=seq, type="LOG", priority=0, day=0, phase="LOBBY", ts=0.0)
+
+
+def seqs(events) -> list:
+    return [item.seq for item in events]
+
+
+class EventLogTest(unittest.TestCase):
+    def test_since_before_wraparound(self) -> None:
+        log = EventLog(capacity=5)
+        self.assertEqual(log.since(0), [])
+        self.assertIsNone(log.since(1))
+        log.extend([event(seq) for seq in range(1, 4)])
+        self.assertEqual(seqs(log.since(0)), [1, 2, 3])
+        self.assertEqual(seqs(log.since(2)), [3])
+        self.assertEqual(log.since(3), [])
+        self.assertIsNone(log.since(4))
+
+    def test_since_after_wraparound(self) -> None:
+        log = EventLog(capacity=5)
+        log.extend([event(seq) for seq in range(1, 13)])
+        self.assertEqual(len(log), 5)
+        self.assertEqual(seqs(log), [8, 9, 10, 11, 12])
+        self.assertEqual(log[0].seq, 8)
+        self.assertEqual(log[-1].seq, 12)
+        self.assertEqual(seqs(log.since(7)), [8, 9, 10, 11, 12])
+        self.assertEqual(seqs(log.since(10)), [11, 12])
+        self.assertEqual(log.since(12), [])
+        self.assertIsNone(log.since(6))
+        self.assertIsNone(log.since(0))
+        self.assertIsNone(log.since(13))
+
+    def test_get_tracks_the_window(self) -> None:
+        log = EventLog(capacity=3)
+        log.extend([event(seq) for seq in range(1, 8)])
+        self.assertIsNone(log.get(4))
+        self.assertEqual(log.get(5).seq, 5)
+        self.assertEqual(log.get(7).seq, 7)
+        self.assertIsNone(log.get(8))
+        with self.assertRaises(IndexError):
+            log[3]
+
+    def test_clear_empties_the_ring(self) -> None:
+        log = EventLog(capacity=3)
+        log.extend([event(seq) for seq in range(1, 5)])
+        log.clear()
+        self.assertEqual(len(log), 0)
+        self.assertEqual(log.since(0), [])
+        log.append(event(1))
+        self.assertEqual(seqs(log), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
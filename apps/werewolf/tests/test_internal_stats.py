@@ -0,0 +1,89 @@
+import hashlib
+import hmac
+import os
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+BOT_ID = "stats-bot"
+BOT_SECRET = "stats-secret"
+STATS_PATH = "/werewolf/internal/stats"
+
+
+class InternalStatsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._cwd = os.getcwd()
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp.name)
+        os.environ["WEREWOLF_SESSION_DB"] = ""
+        os.environ["WEREWOLF_ROOM_SNAPSHOT_DIR"] = ""
+        os.environ["WEREWOLF_JOURNAL_DIR"] = ""
+        from werewolf import main
+
+        cls.main = main
+        main.BOT_ID = BOT_ID
+        main.BOT_SECRET = BOT_SECRET
+        app = FastAPI()
+        app.include_router(main.router)
+        cls.client = TestClient(app)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.client.close()
+        os.chdir(cls._cwd)
+        cls._tmp.cleanup()
+
+    def _signed_headers(self) -> dict:
+        timestamp = str(int(time.time()))
+        nonce = uuid.uuid4().hex
+        message = f"GET\n{STATS_PATH}\n\n{timestamp}\n{nonce}"
+        signature = hmac.new(BOT_SECRET.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+        return {"X-Bot-Id": BOT_ID, "X-Timestamp": timestamp, "X-Nonce": nonce, "X-Signature": signature}
+
+    def test_unsigned_request_is_rejected(self) -> None:
+        response = self.client.get(STATS_PATH)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["error"], "bot_auth_missing")
+
+    def test_bad_signature_is_rejected(self) -> None:
+        headers = self._signed_headers()
+        headers["X-Signature"] = "0" * 64
+        response = self.client.get(STATS_PATH, headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_signed_request_returns_room_stats(self) -> None:
+        response = self.client.get(STATS_PATH, headers=self._signed_headers())
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()
+        keys = ("room_count", "max_rooms", "events_held", "approx_bytes", "evicted", "timers_pending", "timers_fired")
+        for key in keys + ("rooms",):
+            self.assertIn(key, stats)
+
+    def test_stats_report_user_cache(self) -> None:
+        stats = self.client.get(STATS_PATH, headers=self._signed_headers()).json()
+        self.assertEqual(stats["user_cache"], self.main.auth.user_cache_stats())
+        for key in ("size", "capacity", "hits", "misses", "invalidations"):
+            self.assertIn(key, stats["user_cache"])
+
+    def test_stats_report_broadcast_coalescing(self) -> None:
+        stats = self.client.get(STATS_PATH, headers=self._signed_headers()).json()
+        broadcasts = stats["broadcasts"]
+        for key in ("mutations", "broadcasts", "phase_flushes", "coalesced", "window_ms"):
+            self.assertIn(key, broadcasts)
+        self.assertEqual(broadcasts["coalesced"], broadcasts["mutations"] - broadcasts["broadcasts"])
+        self.assertEqual(broadcasts["window_ms"], round(self.main.BROADCAST_WINDOW_SECONDS * 1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.commands import apply_command  # noqa: E402
+from werewolf.journal import Journal, _generations, replay_directory  # noqa: E402
+from werewolf.web_engine import GameRoom  # noqa: E402
+
+
+def run(journal: Journal, rooms: dict, room_id: str, command: dict) -> None:
+    room = rooms.setdefault(room_id, GameRoom())
+    revision = room.revision
+    command["ts"] = 1000.0 + revision
+    with contextlib.redirect_stdout(io.StringIO()):
+        apply_command(room, command)
+    if room.revision != revision:
+        journal.append(room_id, revision, command)
+
+
+def join(journal: Journal, rooms: dict, room_id: str, count: int) -> None:
+    for index in range(count):
+        command = {"op": "join", "name": f"玩家{index + 1}", "owner_id": f"u{index}", "player_id": f"p{index}"}
+        run(journal, rooms, room_id, command)
+
+
+class JournalTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.journal = Journal(self.directory)
+
+    async def asyncTearDown(self) -> None:
+        await self.journal.close()
+
+    def assertSameRooms(self, replayed: dict, rooms: dict) -> None:
+        self.assertEqual(sorted(replayed), sorted(rooms))
+        for room_id, room in rooms.items():
+            self.assertEqual(replayed[room_id].revision, room.revision)
+            self.assertEqual(replayed[room_id].to_state(), room.to_state())
+
+    async def test_replay_round_trip(self) -> None:
+        rooms: dict = {}
+        join(self.journal, rooms, "a", 5)
+        run(self.journal, rooms, "a", {"op": "start"})
+        join(self.journal, rooms, "b", 2)
+        await self.journal.flush()
+
+        replayed, generation = replay_directory(self.directory)
+        self.assertEqual(generation, 0)
+        self.assertSameRooms(replayed, rooms)
+
+    async def test_torn_final_line_is_ignored(self) -> None:
+        rooms: dict = {}
+        join(self.journal, rooms, "a", 3)
+        await self.journal.flush()
+        await self.journal.close()
+        segment = self.directory / "journal-00000000.log"
+        with open(segment, "ab") as handle:
+            handle.write(b'{"room": "a", "rev": 3, "cmd": {"op": "jo')
+
+        with self.assertLogs("werewolf", "WARNING"):
+            replayed, _ = replay_directory(self.directory)
+        self.assertSameRooms(replayed, rooms)
+
+    async def test_compaction_snapshots_and_drops_old_segments(self) -> None:
+        rooms: dict = {}
+        join(self.journal, rooms, "a", 4)
+        await self.journal.flush()
+        await self.journal.compact(rooms)
+        self.assertEqual(self.journal.generation, 1)
+        self.assertEqual(_generations(self.directory, "journal"), [])
+        self.assertEqual(_generations(self.directory, "snapshot"), [1])
+
+        run(self.journal, rooms, "a", {"op": "start"})
+        await self.journal.flush()
+        self.assertEqual(_generations(self.directory, "journal"), [1])
+
+        replayed, generation = replay_directory(self.directory)
+        self.assertEqual(generation, 1)
+        self.assertSameRooms(replayed, rooms)
+
+    async def test_state_and_evict_records(self) -> None:
+        rooms: dict = {}
+        join(self.journal, rooms, "a", 2)
+        join(self.journal, rooms, "b", 2)
+        restored = GameRoom.from_state(rooms["b"].to_state())
+        self.journal.append("a", rooms["a"].revision, {"op": "evict"})
+        rooms.pop("a")
+        self.journal.append("b", restored.revision, {"op": "state", "state": restored.to_state()})
+        run(self.journal, rooms, "b", {"op": "join", "name": "玩家9", "owner_id": "u9", "player_id": "p9"})
+        await self.journal.flush()
+
+        replayed, _ = replay_directory(self.directory)
+        self.assertNotIn("a", replayed)
+        self.assertSameRooms(replayed, rooms)
+
+    async def test_stale_revisions_are_skipped(self) -> None:
+        rooms: dict = {}
+        join(self.journal, rooms, "a", 2)
+        self.journal.append("a", 0, {"op": "join", "name": "重复", "owner_id": "x", "player_id": "x"})
+        await self.journal.flush()
+
+        replayed, _ = replay_directory(self.directory)
+        self.assertSameRooms(replayed, rooms)
+
+
+if __name__ == "__main__":
+    unittest.main()
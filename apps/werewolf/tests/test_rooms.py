@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.enum import Phase, Role  # noqa: E402
+from werewolf.rooms import RoomManager  # noqa: E402
+from werewolf.store import MemoryRoomStore  # noqa: E402
+from werewolf.web_engine import MORNING_SPEECH_SECONDS, GameRoom  # noqa: E402
+
+
+def started_room(players: int = 4) -> GameRoom:
+    room = GameRoom()
+    for index in range(players):
+        room.add_player(f"玩家{index + 1}", avatar_url=None, owner_id=f"user-{index}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        room.start_game([Role.WEREWOLF] + [Role.VILLAGER] * (players - 1))
+    return room
+
+
+class DeadlineTimerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_expired_speech_deadline_advances_the_speaker(self) -> None:
+        manager = RoomManager(
+            MemoryRoomStore(),
+            on_deadline=lambda room_id: manager.submit(room_id, lambda room: {"op": "tick"}),
+        )
+        room = started_room()
+        room.phase = Phase.MORNING
+        room._start_morning()
+        first_speaker = room.morning_speaker_id
+        room.morning_started_at -= MORNING_SPEECH_SECONDS + 1
+        await manager.adopt({"r1": room})
+        self.assertIn("r1", manager.timers.handles)
+
+        for _ in range(100):
+            if room.morning_speaker_id != first_speaker:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(room.morning_speaker_id, room.morning_order[1])
+        self.assertEqual(manager.timers.fired, 1)
+        stats = manager.stats()
+        self.assertEqual(stats["timers_fired"], 1)
+        self.assertEqual(stats["timers_pending"], 1)
+        self.assertEqual(manager.timers.handles["r1"][0], room.morning_started_at + MORNING_SPEECH_SECONDS)
+        await manager.stop()
+
+
+class RoomActorTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.manager = RoomManager(MemoryRoomStore())
+
+    async def asyncTearDown(self) -> None:
+        await self.manager.stop()
+
+    async def test_commands_apply_in_submission_order(self) -> None:
+        seen = []
+
+        def join(index: int):
+            def build(room: GameRoom) -> dict:
+                seen.append((index, room.revision))
+                return {"op": "join", "name": f"玩家{index + 1}", "owner_id": f"u{index}", "player_id": f"p{index}"}
+
+            return build
+
+        replies = await asyncio.gather(*(self.manager.submit("r1", join(index)) for index in range(9)))
+
+        room = await self.manager.get_room("r1")
+        self.assertEqual([index for index, _ in seen], list(range(9)))
+        self.assertEqual([revision for _, revision in seen], sorted(revision for _, revision in seen))
+        self.assertEqual(list(room.players), [f"p{index}" for index in range(9)])
+        self.assertEqual([json.loads(reply)["player_id"] for reply in replies], [f"p{index}" for index in range(9)])
+        self.assertEqual(self.manager.commands, 9)
+        self.assertLess(self.manager.batches, 9)
+
+    async def test_failing_command_does_not_break_the_batch(self) -> None:
+        def fail(room: GameRoom) -> dict:
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            self.manager.submit("r1", lambda room: {"op": "join", "name": "甲", "owner_id": "u0", "player_id": "p0"}),
+            self.manager.submit("r1", fail),
+            self.manager.submit("r1", lambda room: {"op": "join", "name": "乙", "owner_id": "u1", "player_id": "p1"}),
+            return_exceptions=True,
+        )
+
+        self.assertIsInstance(results[1], RuntimeError)
+        room = await self.manager.get_room("r1")
+        self.assertEqual(list(room.players), ["p0", "p1"])
+
+
+class RoomStatsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_room_sizes_are_cached_per_revision(self) -> None:
+        manager = RoomManager(MemoryRoomStore())
+        room = started_room()
+        await manager.adopt({"r1": room})
+        with mock.patch.object(GameRoom, "to_state", autospec=True, side_effect=GameRoom.to_state) as to_state:
+            first = manager.stats()["approx_bytes"]
+            self.assertEqual(manager.stats()["approx_bytes"], first)
+            self.assertEqual(to_state.call_count, 1)
+            room.add_log("再来一条很长的日志，让房间状态变大。" * 4)
+            room.touch()
+            self.assertGreater(manager.stats()["approx_bytes"], first)
+            self.assertEqual(to_state.call_count, 2)
+        await manager.evict("r1")
+        self.assertNotIn("r1", manager.sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()
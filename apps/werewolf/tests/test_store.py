@@ -0,0 +1,56 @@
+import sys
+import unittest
+from pathlib import Path
+from typing import Dict, Optional
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.sessions import token_key  # noqa: E402
+from werewolf.store import KEY_PREFIX, MemoryRoomStore, RedisRoomStore  # noqa: E402
+
+TOKEN = "live-session-token"
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: Dict[str, str] = {}
+
+    async def execute(self, command: str, key: str, *args: str) -> Optional[str]:
+        if command == "SET":
+            self.data[key] = args[0]
+            return "OK"
+        if command == "GET":
+            return self.data.get(key)
+        if command == "DEL":
+            return self.data.pop(key, None)
+        raise AssertionError(command)
+
+
+class SessionStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def assertSessionLifecycle(self, store) -> None:
+        await store.set_session(TOKEN, "user-1", 60)
+        self.assertEqual(await store.get_session(TOKEN), "user-1")
+        self.assertIsNone(await store.get_session(token_key(TOKEN)))
+        await store.delete_session(TOKEN)
+        self.assertIsNone(await store.get_session(TOKEN))
+
+    async def test_redis_keys_sessions_by_token_hash(self) -> None:
+        store = RedisRoomStore("redis://localhost:6379/0")
+        store.conn = FakeRedis()
+        await store.set_session(TOKEN, "user-1", 60)
+        self.assertEqual(list(store.conn.data), [f"{KEY_PREFIX}:session:{token_key(TOKEN)}"])
+        self.assertNotIn(TOKEN, "".join(store.conn.data))
+        await store.delete_session(TOKEN)
+        await self.assertSessionLifecycle(store)
+
+    async def test_memory_and_redis_behave_alike(self) -> None:
+        await self.assertSessionLifecycle(MemoryRoomStore())
+        store = RedisRoomStore("redis://localhost:6379/0")
+        store.conn = FakeRedis()
+        await self.assertSessionLifecycle(store)
+
+
+if __name__ == "__main__":
+    unittest.main()
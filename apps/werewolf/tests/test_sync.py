@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.commands import apply_command  # noqa: E402
+from werewolf.sync import ViewerSync  # noqa: E402
+from werewolf.web_engine import GameRoom  # noqa: E402
+
+
+def run(room: GameRoom, command: dict) -> None:
+    command.setdefault("ts", 1000.0 + room.revision)
+    with contextlib.redirect_stdout(io.StringIO()):
+        apply_command(room, command)
+
+
+def join(room: GameRoom, index: int) -> None:
+    run(room, {"op": "join", "name": f"玩家{index + 1}", "owner_id": f"u{index}", "player_id": f"p{index}"})
+
+
+def apply_delta(state: dict, delta: dict) -> None:
+    state.update(delta.get("set", {}))
+    players = delta.get("players")
+    if players:
+        by_id = {player["id"]: player for player in state["players"]}
+        for player_id, fields in players.get("changed", {}).items():
+            by_id.setdefault(player_id, {}).update(fields)
+        for player_id in players.get("remove", ()):
+            by_id.pop(player_id, None)
+        order = players.get("order") or [player["id"] for player in state["players"] if player["id"] in by_id]
+        order += [player_id for player_id in by_id if player_id not in order]
+        state["players"] = [by_id[player_id] for player_id in order]
+    events = delta.get("events")
+    if events:
+        if events["reset"]:
+            state["events"] = []
+        by_seq = {event["seq"]: event for event in state["events"]}
+        for event in events["upsert"]:
+            by_seq[event["seq"]] = event
+        state["events"] = [by_seq[seq] for seq in sorted(by_seq)]
+    state["rev"] = delta["rev"]
+
+
+class DeltaSyncTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.room = GameRoom()
+        for index in range(3):
+            join(self.room, index)
+
+    def fresh(self, viewer_id: str) -> dict:
+        return json.loads(ViewerSync(viewer_id).snapshot(self.room))
+
+    def test_deltas_rebuild_the_snapshot(self) -> None:
+        sync = ViewerSync("u0")
+        client = json.loads(sync.snapshot(self.room))
+        steps = [
+            lambda: join(self.room, 3),
+            lambda: join(self.room, 4),
+            lambda: run(self.room, {"op": "leave", "player_id": "p1"}),
+            lambda: join(self.room, 5),
+            lambda: run(self.room, {"op": "start"}),
+            lambda: run(self.room, {"op": "advance"}),
+            lambda: run(self.room, {"op": "reset"}),
+            lambda: join(self.room, 6),
+        ]
+        applied = 0
+        for step in steps:
+            base = self.room.revision
+            step()
+            message = sync.delta(self.room)
+            if message is None:
+                continue
+            delta = json.loads(message)
+            self.assertEqual(delta["type"], "delta")
+            self.assertEqual(delta["base"], client["rev"])
+            self.assertGreaterEqual(delta["rev"], base)
+            apply_delta(client, delta)
+            applied += 1
+            self.assertEqual(client, self.fresh("u0"))
+        self.assertEqual(applied, len(steps))
+
+    def test_unchanged_room_sends_nothing(self) -> None:
+        sync = ViewerSync("u0")
+        sync.snapshot(self.room)
+        self.assertIsNone(sync.delta(self.room))
+
+    def test_resume_sends_only_newer_events(self) -> None:
+        sync = ViewerSync("u0")
+        snapshot = json.loads(sync.snapshot(self.room))
+        last_seq = snapshot["events"][-1]["seq"]
+        join(self.room, 3)
+        run(self.room, {"op": "start"})
+        newer = [event.seq for event in self.room.events if event.seq > last_seq]
+        self.assertTrue(newer)
+
+        resumed = json.loads(ViewerSync("u0").resume(self.room, self.room.event_epoch, last_seq + 1))
+        self.assertEqual(resumed["events_since"], last_seq + 1)
+        self.assertEqual([event["seq"] for event in resumed["events"]], newer)
+        self.assertEqual(resumed["rev"], self.room.revision)
+        self.assertEqual(len(resumed["players"]), 4)
+
+    def test_resume_after_reset_falls_back_to_snapshot(self) -> None:
+        epoch = self.room.event_epoch
+        run(self.room, {"op": "reset"})
+        resumed = json.loads(ViewerSync("u0").resume(self.room, epoch, 2))
+        self.assertNotIn("events_since", resumed)
+        self.assertEqual(resumed, self.fresh("u0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf import auth  # noqa: E402
+
+
+class UserCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        auth._user_cache.clear()
+        self.rows = {"u1": {"id": "u1", "username": "old"}}
+        self.reads = 0
+
+        async def fake_run_db(function, user_id):
+            self.reads += 1
+            row = self.rows.get(user_id)
+            return dict(row) if row else None
+
+        patcher = mock.patch.object(auth, "run_db", fake_run_db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(auth._user_cache.clear)
+
+    def test_hits_are_served_from_cache(self) -> None:
+        asyncio.run(auth.get_user("u1"))
+        self.rows["u1"]["username"] = "new"
+        self.assertEqual(asyncio.run(auth.get_user("u1"))["username"], "old")
+        self.assertEqual(self.reads, 1)
+
+    def test_entries_expire_so_other_workers_writes_show_up(self) -> None:
+        with mock.patch.object(auth.time, "time", return_value=1000.0):
+            asyncio.run(auth.get_user("u1"))
+        self.rows["u1"]["username"] = "new"
+        with mock.patch.object(auth.time, "time", return_value=1000.0 + auth.USER_CACHE_TTL_SECONDS + 1):
+            user = asyncio.run(auth.get_user("u1"))
+        self.assertEqual(user["username"], "new")
+        self.assertEqual(self.reads, 2)
+        self.assertGreaterEqual(auth.user_cache_stats()["expired"], 1)
+
+    def test_local_invalidation_drops_the_entry(self) -> None:
+        asyncio.run(auth.get_user("u1"))
+        self.rows["u1"]["username"] = "new"
+        auth._invalidate_user("u1")
+        self.assertEqual(asyncio.run(auth.get_user("u1"))["username"], "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
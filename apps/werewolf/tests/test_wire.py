@@ -0,0 +1,85 @@
+import contextlib
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+if str(APPS_DIR) not in sys.path:
+    sys.path.insert(0, str(APPS_DIR))
+
+from werewolf.enum import Phase, Role  # noqa: E402
+from werewolf.sync import ViewerSync  # noqa: E402
+from werewolf.web_engine import GameRoom  # noqa: E402
+from werewolf.wire import (  # noqa: E402
+    BINARY_SUBPROTOCOL,
+    JSON_SUBPROTOCOL,
+    KEYS,
+    VALUES,
+    choose_subprotocol,
+    encode_text,
+    pack,
+    unpack,
+)
+
+INTS = (
+    0, 1, 0x7F, 0x80, 0xFF, 0x100, 0xFFFF, 0x10000, 0xFFFFFFFF, 0x100000000, 2**64 - 1,
+    -1, -0x20, -0x21, -0x80, -0x81, -0x8000, -0x8001, -0x80000000, -0x80000001, -(2**63),
+)
+STRINGS = ("", "a" * 31, "a" * 32, "狼" * 85, "b" * 256, "c" * 70000, "not interned")
+
+
+class WireRoundTripTest(unittest.TestCase):
+    def assertRoundTrip(self, value: object) -> None:
+        self.assertEqual(unpack(pack(value)), value)
+
+    def test_scalars(self) -> None:
+        for value in (None, True, False, 0.5, -1e300, 1719000000.125) + INTS + STRINGS:
+            with self.subTest(value=value if not isinstance(value, str) else len(value)):
+                self.assertRoundTrip(value)
+
+    def test_integral_floats_decode_as_equal_ints(self) -> None:
+        self.assertEqual(unpack(pack(3.0)), 3)
+        self.assertEqual(unpack(pack(1719000000.0)), 1719000000)
+
+    def test_interned_values_are_three_bytes(self) -> None:
+        for value in VALUES:
+            encoded = pack(value)
+            self.assertEqual(len(encoded), 3)
+            self.assertEqual(unpack(encoded), value)
+        self.assertEqual(unpack(pack(Phase.NIGHT.value)), Phase.NIGHT.value)
+        self.assertEqual(unpack(pack(Role.WITCH.name)), Role.WITCH.name)
+
+    def test_containers(self) -> None:
+        for size in (0, 15, 16, 0x10000):
+            with self.subTest(size=size):
+                self.assertRoundTrip(list(range(size)))
+                self.assertRoundTrip({f"k{index}": index for index in range(size)})
+        self.assertRoundTrip({key: key for key in KEYS})
+        self.assertRoundTrip({"unknown_key": [{"nested": {"deep": [None, True, "x"]}}], "rev": 7})
+        self.assertEqual(unpack(pack((1, "a"))), [1, "a"])
+
+    def test_unsupported_type_is_rejected(self) -> None:
+        with self.assertRaises(TypeError):
+            pack({1, 2})
+
+    def test_room_snapshot_matches_json(self) -> None:
+        room = GameRoom()
+        for index in range(6):
+            room.add_player(f"玩家{index + 1}", avatar_url=None, owner_id=f"u{index}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            room.start_game()
+        text = ViewerSync("u0").snapshot(room)
+        encoded = encode_text(text)
+        self.assertEqual(unpack(encoded), json.loads(text))
+        self.assertLess(len(encoded), len(text.encode("utf-8")))
+
+    def test_choose_subprotocol(self) -> None:
+        self.assertEqual(choose_subprotocol(["x", BINARY_SUBPROTOCOL]), BINARY_SUBPROTOCOL)
+        self.assertEqual(choose_subprotocol([JSON_SUBPROTOCOL, BINARY_SUBPROTOCOL]), JSON_SUBPROTOCOL)
+        self.assertIsNone(choose_subprotocol(["x"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
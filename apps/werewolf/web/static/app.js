@@ -6,7 +6,19 @@
   const assetPath = page.dataset.assetPath || '';
   const loggedIn = page.dataset.loggedIn === 'true';
   const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
-  const socket = new WebSocket(`${protocol}://${window.location.host}${roomPath}/ws`);
+  const socketUrl = `${protocol}://${window.location.host}${roomPath}/ws`;
+  const BINARY_PROTOCOL = 'werewolf.msgpack.v1';
+  const network = navigator.connection || {};
+  const preferBinary = new URLSearchParams(window.location.search).get('wire') === 'bin'
+    || network.saveData === true
+    || /2g|3g/.test(network.effectiveType || '');
+  const socket = preferBinary
+    ? new WebSocket(socketUrl, [BINARY_PROTOCOL, 'werewolf.json'])
+    : new WebSocket(socketUrl);
+  socket.binaryType = 'arraybuffer';
+  const utf8 = new TextDecoder();
+  let wireKeys = [];
+  let wireValues = [];
 
   const phaseLabel = document.getElementById('phaseLabel');
   const statusLine = document.getElementById('statusLine');
@@ -39,12 +51,12 @@
   }
 
   let latestState = null;
+  let stateRev = null;
+  let awaitingSnapshot = false;
   let lastPhaseCode = null;
   let pendingAction = null;
   let hasActed = false;
   let selectableTargets = new Set();
-  let morningTimer = null;
-  let lastMorningSpeakerId = null;
   let logFilter = 'key';
   let logKeyword = '';
   let pendingActionId = null;
@@ -61,11 +73,6 @@
       selectableTargets = new Set();
       hasActed = false;
       lastPhaseCode = phaseCode;
-      lastMorningSpeakerId = null;
-      if (morningTimer) {
-        clearTimeout(morningTimer);
-        morningTimer = null;
-      }
     }
 
     if (page) {
@@ -186,13 +193,6 @@
     }
 
     if (phaseCode === 'MORNING') {
-      if (speakerId !== lastMorningSpeakerId) {
-        if (morningTimer) {
-          clearTimeout(morningTimer);
-          morningTimer = null;
-        }
-        lastMorningSpeakerId = speakerId;
-      }
       const speaker = (state.players || []).find((p) => p.id === speakerId);
       const isSpeaker = speakerId && state.viewer && state.viewer.player_id === speakerId;
       const timeHint = typeof remaining === 'number' ? `（剩余 ${remaining}s）` : '';
@@ -248,12 +248,6 @@
         };
         actionButtons.appendChild(button);
       });
-
-      if (typeof remaining === 'number' && remaining > 0) {
-        morningTimer = setTimeout(() => {
-          submitAction('morning_skip', null, null);
-        }, remaining * 1000);
-      }
       updateSelectableTargets();
       return;
     }
@@ -499,8 +493,141 @@
     return eventText(event).includes(logKeyword);
   }
 
+  function applyPlayersDelta(state, delta) {
+    const byId = new Map((state.players || []).map((player) => [player.id, player]));
+    (delta.remove || []).forEach((id) => byId.delete(id));
+    Object.entries(delta.changed || {}).forEach(([id, fields]) => {
+      byId.set(id, Object.assign({}, byId.get(id) || {}, fields));
+    });
+    const order = delta.order || (state.players || []).map((player) => player.id);
+    state.players = order.map((id) => byId.get(id)).filter(Boolean);
+  }
+
+  function applyEventsDelta(state, delta) {
+    const events = delta.reset ? [] : (state.events || []).slice();
+    (delta.upsert || []).forEach((item) => {
+      const index = events.findIndex((existing) => existing.seq === item.seq);
+      if (index >= 0) {
+        events[index] = item;
+      } else {
+        events.push(item);
+      }
+    });
+    const limit = (state.limits && state.limits.max_events) || events.length;
+    state.events = events.slice(-limit);
+  }
+
+  function resyncRequest() {
+    const events = (latestState && latestState.events) || [];
+    if (!events.length) return { type: 'resync' };
+    return { type: 'resync', epoch: latestState.event_epoch, since: events[events.length - 1].seq };
+  }
+
+  function applyDelta(delta) {
+    if (!latestState || stateRev !== delta.base) {
+      if (!awaitingSnapshot) {
+        awaitingSnapshot = true;
+        sendMessage(resyncRequest());
+      }
+      return;
+    }
+    Object.assign(latestState, delta.set || {});
+    if (delta.players) applyPlayersDelta(latestState, delta.players);
+    if (delta.events) applyEventsDelta(latestState, delta.events);
+    stateRev = delta.rev;
+    render(latestState);
+  }
+
+  function decodeBinary(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(buffer);
+    let pos = 0;
+
+    function readStr(length) {
+      const text = utf8.decode(bytes.subarray(pos, pos + length));
+      pos += length;
+      return text;
+    }
+
+    function readArray(length) {
+      const result = new Array(length);
+      for (let index = 0; index < length; index += 1) {
+        result[index] = read(false);
+      }
+      return result;
+    }
+
+    function readMap(length) {
+      const result = {};
+      for (let index = 0; index < length; index += 1) {
+        const key = read(true);
+        result[key] = read(false);
+      }
+      return result;
+    }
+
+    function readNumber(getter, size) {
+      const value = getter.call(view, pos);
+      pos += size;
+      return typeof value === 'bigint' ? Number(value) : value;
+    }
+
+    function read(isKey) {
+      const code = bytes[pos];
+      pos += 1;
+      if (code < 0x80) return isKey ? wireKeys[code] : code;
+      if (code >= 0xe0) return code - 0x100;
+      if (code <= 0x8f) return readMap(code & 0x0f);
+      if (code <= 0x9f) return readArray(code & 0x0f);
+      if (code <= 0xbf) return readStr(code & 0x1f);
+      switch (code) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xca: return readNumber(view.getFloat32, 4);
+        case 0xcb: return readNumber(view.getFloat64, 8);
+        case 0xcc: return readNumber(view.getUint8, 1);
+        case 0xcd: return readNumber(view.getUint16, 2);
+        case 0xce: return readNumber(view.getUint32, 4);
+        case 0xcf: return readNumber(view.getBigUint64, 8);
+        case 0xd0: return readNumber(view.getInt8, 1);
+        case 0xd1: return readNumber(view.getInt16, 2);
+        case 0xd2: return readNumber(view.getInt32, 4);
+        case 0xd3: return readNumber(view.getBigInt64, 8);
+        case 0xd4: {
+          const value = wireValues[bytes[pos + 1]];
+          pos += 2;
+          return value;
+        }
+        case 0xd9: return readStr(readNumber(view.getUint8, 1));
+        case 0xda: return readStr(readNumber(view.getUint16, 2));
+        case 0xdb: return readStr(readNumber(view.getUint32, 4));
+        case 0xdc: return readArray(readNumber(view.getUint16, 2));
+        case 0xdd: return readArray(readNumber(view.getUint32, 4));
+        case 0xde: return readMap(readNumber(view.getUint16, 2));
+        case 0xdf: return readMap(readNumber(view.getUint32, 4));
+        default: throw new Error(`unsupported wire byte ${code}`);
+      }
+    }
+
+    return read(false);
+  }
+
   socket.onmessage = (event) => {
+    if (typeof event.data !== 'string') {
+      handleMessage(decodeBinary(event.data));
+      return;
+    }
     const data = JSON.parse(event.data);
+    if (data.type === 'wire') {
+      wireKeys = data.keys;
+      wireValues = data.values;
+      return;
+    }
+    handleMessage(data);
+  };
+
+  function handleMessage(data) {
     if (data.type === 'error') {
       setStatus(`操作失败：${data.message}`);
       return;
@@ -526,10 +653,22 @@
       setStatus('已加入房间。');
       return;
     }
+    if (data.type === 'delta') {
+      applyDelta(data);
+      return;
+    }
     if (data.phase) {
+      if (typeof data.events_since === 'number' && latestState) {
+        const tail = data.events;
+        data.events = latestState.events;
+        applyEventsDelta(data, { reset: false, upsert: tail });
+        delete data.events_since;
+      }
+      stateRev = data.rev ?? null;
+      awaitingSnapshot = false;
       render(data);
     }
-  };
+  }
 
   window.addEventListener('resize', () => {
     if (latestState) {
@@ -1,11 +1,15 @@
 import json
 import time
 import uuid
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
 
 from .enum import Kind, Mode, Phase, Role, role_emojis
 from .game_mode import GameMode
+from .roster import Roster
+
+MAX_EVENTS = 200
+MORNING_SPEECH_SECONDS = 120
 
 
 class ActionType:
@@ -66,7 +70,7 @@ class PendingAction:
     target_id_2: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class GameEvent:
     seq: int
     type: str
@@ -92,6 +96,64 @@ class GameEvent:
         }
 
 
+class EventLog:
+    __slots__ = ("capacity", "_items", "_head", "_size")
+
+    def __init__(self, capacity: int = MAX_EVENTS) -> None:
+        self.capacity = capacity
+        self._items: List[Optional[GameEvent]] = [None] * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[GameEvent]:
+        for offset in range(self._size):
+            yield self._items[(self._head + offset) % self.capacity]
+
+    def __getitem__(self, index: int) -> GameEvent:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("event index out of range")
+        return self._items[(self._head + index) % self.capacity]
+
+    def append(self, event: GameEvent) -> None:
+        if self._size < self.capacity:
+            self._items[(self._head + self._size) % self.capacity] = event
+            self._size += 1
+            return
+        self._items[self._head] = event
+        self._head = (self._head + 1) % self.capacity
+
+    def extend(self, events: List[GameEvent]) -> None:
+        for event in events:
+            self.append(event)
+
+    def clear(self) -> None:
+        self._items = [None] * self.capacity
+        self._head = 0
+        self._size = 0
+
+    def get(self, seq: int) -> Optional[GameEvent]:
+        if not self._size:
+            return None
+        offset = seq - self[0].seq
+        if not 0 <= offset < self._size:
+            return None
+        return self[offset]
+
+    def since(self, seq: int) -> Optional[List[GameEvent]]:
+        if not self._size:
+            return [] if seq == 0 else None
+        first_seq = self[0].seq
+        last_seq = self[-1].seq
+        if seq < first_seq - 1 or seq > last_seq:
+            return None
+        return [self[offset] for offset in range(seq - first_seq + 1, self._size)]
+
+
 class GameRoom:
     def __init__(self) -> None:
         self.phase = Phase.LOBBY
@@ -99,9 +161,19 @@ class GameRoom:
         self.mode = Mode.CLASSIC
         self.players: Dict[str, PlayerState] = {}
         self.owners: Dict[str, str] = {}
+        self._owner_players: Dict[str, str] = {}
+        self._name_players: Dict[str, str] = {}
+        self.roster = Roster()
+        self._alive_order: Optional[List[str]] = None
         self.host_user_id: Optional[str] = None
-        self.events: List[GameEvent] = []
+        self.events = EventLog()
         self.event_seq = 0
+        self.event_epoch = 0
+        self.revision = 0
+        self.clock: Optional[float] = None
+        self._public_key: Optional[tuple] = None
+        self._public: Optional[dict] = None
+        self._public_json: Optional[str] = None
         self.actions: Dict[str, PendingAction] = {}
         self.last_guard_target: Optional[str] = None
         self.wolf_target: Optional[str] = None
@@ -114,6 +186,12 @@ class GameRoom:
         self.morning_started_at = None
         self.morning_speaker_id = None
 
+    def touch(self) -> None:
+        self.revision += 1
+
+    def now(self) -> float:
+        return self.clock if self.clock is not None else time.time()
+
     def log_event(
         self,
         event_type: str,
@@ -123,6 +201,7 @@ class GameRoom:
     ) -> None:
         if payload is None:
             payload = {}
+        self.touch()
         if (
             event_type == "PLAYER_JOIN"
             and self.events
@@ -133,7 +212,7 @@ class GameRoom:
             names = list(self.events[-1].payload.get("names", []))
             if actor and actor.name not in names:
                 names.append(actor.name)
-                self.events[-1].payload["names"] = names
+                self.events[-1].payload = {**self.events[-1].payload, "names": names}
             return
         self.event_seq += 1
         event = GameEvent(
@@ -145,15 +224,45 @@ class GameRoom:
             actor_id=actor.id if actor else None,
             actor_name=actor.name if actor else None,
             payload=payload,
+            ts=self.now(),
         )
         self.events.append(event)
-        self.events = self.events[-200:]
 
     def add_log(self, message: str) -> None:
         self.log_event("SYSTEM", 0, payload={"message": message})
 
     def _is_name_taken(self, name: str) -> bool:
-        return any(player.name == name for player in self.players.values())
+        return name in self._name_players
+
+    def _index_player(self, player: PlayerState) -> None:
+        self._name_players[player.name] = player.id
+        owner_id = self.owners.get(player.id)
+        if owner_id:
+            self._owner_players.setdefault(owner_id, player.id)
+        self.roster.add(player)
+        self._alive_order = None
+
+    def _rebuild_indexes(self) -> None:
+        self._owner_players.clear()
+        self._name_players.clear()
+        self.roster.rebuild(())
+        for player in self.players.values():
+            self._index_player(player)
+        self._sync_roster()
+
+    def _sync_roster(self) -> None:
+        for player in self.players.values():
+            self.roster.update(player)
+
+    def _set_alive(self, player: PlayerState, alive: bool) -> None:
+        player.alive = alive
+        self.roster.set_alive(player.id, alive)
+        self._alive_order = None
+
+    def _alive_ids(self) -> List[str]:
+        if self._alive_order is None:
+            self._alive_order = [player_id for player_id in self.players if self.roster.is_alive(player_id)]
+        return self._alive_order
 
     def _next_default_name(self) -> str:
         index = 1
@@ -163,7 +272,13 @@ class GameRoom:
                 return candidate
             index += 1
 
-    def add_player(self, name: str, avatar_url: Optional[str], owner_id: Optional[str]) -> PlayerState:
+    def add_player(
+        self,
+        name: str,
+        avatar_url: Optional[str],
+        owner_id: Optional[str],
+        player_id: Optional[str] = None,
+    ) -> PlayerState:
         cleaned = name.strip()
         player_name = cleaned or self._next_default_name()
         if len(player_name) > 12 or "\n" in player_name or "\r" in player_name:
@@ -173,29 +288,38 @@ class GameRoom:
             raise ValueError("name_taken")
         if len(self.players) >= 9:
             raise ValueError("room_full")
-        player_id = uuid.uuid4().hex
+        player_id = player_id or uuid.uuid4().hex
         player = PlayerState(id=player_id, name=player_name, avatar_url=avatar_url)
         self.players[player_id] = player
         if owner_id:
             self.owners[player_id] = owner_id
             if not self.host_user_id:
                 self.host_user_id = owner_id
+        self._index_player(player)
         self.log_event("PLAYER_JOIN", 0, actor=player, payload={"names": [player.name]})
         return player
 
     def remove_player(self, player_id: str) -> None:
         if player_id in self.players:
             player = self.players.pop(player_id)
+            self.touch()
             removed_owner = self.owners.pop(player_id, None)
+            self._name_players.pop(player.name, None)
+            self.roster.remove(player_id)
+            self._alive_order = None
+            if removed_owner and self._owner_players.get(removed_owner) == player_id:
+                del self._owner_players[removed_owner]
+                for other_id, user_id in self.owners.items():
+                    if user_id == removed_owner:
+                        self._owner_players[removed_owner] = other_id
+                        break
             if removed_owner and removed_owner == self.host_user_id:
                 self.host_user_id = next(iter(self.owners.values()), None)
             self.add_log(f"{player.name} 离开了房间。")
 
     def player_for_owner(self, owner_id: str) -> Optional[PlayerState]:
-        for player_id, user_id in self.owners.items():
-            if user_id == owner_id:
-                return self.players.get(player_id)
-        return None
+        player_id = self._owner_players.get(owner_id)
+        return self.players.get(player_id) if player_id else None
 
     def is_host(self, owner_id: Optional[str]) -> bool:
         return bool(owner_id and self.host_user_id == owner_id)
@@ -206,6 +330,7 @@ class GameRoom:
         self.actions.clear()
         self.events.clear()
         self.event_seq = 0
+        self.event_epoch += 1
         self.last_guard_target = None
         self.wolf_target = None
         self.witch_save_target = None
@@ -219,7 +344,7 @@ class GameRoom:
         for player in self.players.values():
             player.role = None
             player.kind = None
-            player.alive = True
+            self._set_alive(player, True)
             player.notes.clear()
             player.lover_ids = []
             player.is_police = False
@@ -232,6 +357,7 @@ class GameRoom:
             player.nerd_revealed = False
             player.rider_duel_used = False
             player.cupid_linked = False
+        self._sync_roster()
         self.add_log("已重置游戏，等待玩家准备。")
 
     def set_mode(self, mode_name: str) -> None:
@@ -241,7 +367,7 @@ class GameRoom:
         except KeyError:
             self.add_log("未识别的模式，仍使用默认配置。")
 
-    def start_game(self) -> None:
+    def start_game(self, roles: Optional[List[Role]] = None) -> None:
         if self.phase != Phase.LOBBY:
             return
         if len(self.players) < 3:
@@ -250,13 +376,13 @@ class GameRoom:
         if len(self.players) > 9:
             self.add_log("玩家超过 9 人，请移除部分玩家。")
             return
-        game_mode = GameMode(game_mode=self.mode, num_players=len(self.players))
         self.log_event("GAME_START", 2, payload={"mode": self.mode.value})
-        roles = game_mode.generate_role_list()
+        if roles is None:
+            roles = GameMode(game_mode=self.mode, num_players=len(self.players)).generate_role_list()
         for player, role in zip(self.players.values(), roles):
             player.role = role
             player.kind = Kind.WEREWOLF if role in (Role.WEREWOLF, Role.WHITE_WOLF) else Kind.VILLAGER
-            player.alive = True
+            self._set_alive(player, True)
             player.notes.clear()
             player.lover_ids = []
             player.is_police = False
@@ -269,6 +395,7 @@ class GameRoom:
             player.nerd_revealed = False
             player.rider_duel_used = False
             player.cupid_linked = False
+        self._sync_roster()
         self.phase = Phase.BEFORE_ELECTION if len(self.players) >= 6 else Phase.NIGHT
         self.day_count = 0
         self.actions.clear()
@@ -306,6 +433,8 @@ class GameRoom:
         if not player.alive and action not in (ActionType.NERD_REVEAL, ActionType.HUNTER_SHOOT):
             return False, "玩家已死亡"
         ok, result = self._record_action_internal(player, action, target_id, target_id_2, text)
+        if ok:
+            self.touch()
         if ok and self.actions.get(player.id) and self.actions[player.id].action == action:
             self.maybe_auto_advance()
         return ok, result
@@ -339,6 +468,7 @@ class GameRoom:
     def _record_before_election_action(self, player: PlayerState, action: str) -> tuple[bool, str]:
         if action == ActionType.RAISE_HAND:
             player.is_police = True
+            self.roster.update(player)
             self.actions[player.id] = PendingAction(action)
             return True, "已报名竞选"
         if action == ActionType.POLICE_SKIP:
@@ -468,6 +598,7 @@ class GameRoom:
                 return False, "只能治疗昨夜遇害者"
             self.actions[player.id] = PendingAction(action, target_id)
             player.witch_saved = True
+            self.roster.update(player)
             return True, "已记录解药"
         if action == ActionType.WITCH_POISON and player.role == Role.WITCH:
             if player.witch_poisoned:
@@ -476,6 +607,7 @@ class GameRoom:
                 return False, "请指定有效目标"
             self.actions[player.id] = PendingAction(action, target_id)
             player.witch_poisoned = True
+            self.roster.update(player)
             return True, "已记录毒药"
         if action == ActionType.CUPID_LINK and player.role == Role.CUPID:
             if player.cupid_linked:
@@ -486,6 +618,7 @@ class GameRoom:
                 return False, "无法连接同一人"
             self.actions[player.id] = PendingAction(action, target_id, target_id_2)
             player.cupid_linked = True
+            self.roster.update(player)
             return True, "已记录连接"
         if action == ActionType.EXPLORER_BUY and player.role == Role.EXPLORER:
             if player.explorer_bought:
@@ -619,6 +752,7 @@ class GameRoom:
         for player in self.players.values():
             if player.id not in self.actions:
                 player.is_police = False
+                self.roster.update(player)
         self.actions.clear()
 
     def _resolve_election(self) -> None:
@@ -671,7 +805,7 @@ class GameRoom:
         top = [pid for pid, count in votes.items() if count == max_votes]
         if len(top) == 1:
             target = self.players[top[0]]
-            target.alive = False
+            self._set_alive(target, False)
             self.add_log(f"{target.name} 被放逐。")
             self.log_event(
                 "VOTE_RESULT",
@@ -727,6 +861,7 @@ class GameRoom:
             if target and target.alive:
                 deaths.append(target)
                 player.hunter_shot = True
+                self.roster.update(player)
 
         self._resolve_explorer(deaths)
         self._resolve_lovers(deaths)
@@ -736,7 +871,7 @@ class GameRoom:
         for player in deaths:
             unique_deaths[player.id] = player
         for player in unique_deaths.values():
-            player.alive = False
+            self._set_alive(player, False)
             self.last_night_deaths.append(player.name)
 
         self.actions.clear()
@@ -751,8 +886,8 @@ class GameRoom:
             if action.action == ActionType.WHITE_WOLF_BOOM and player.role == Role.WHITE_WOLF:
                 target = self.players.get(action.target_id)
                 if target and target.alive:
-                    target.alive = False
-                    player.alive = False
+                    self._set_alive(target, False)
+                    self._set_alive(player, False)
                     player.white_wolf_exploded = True
                     self.special_state = True
                     self.add_log(f"{player.name} 自爆带走了 {target.name}。")
@@ -760,11 +895,11 @@ class GameRoom:
                 target = self.players.get(action.target_id)
                 if target and target.alive:
                     if target.kind == Kind.WEREWOLF:
-                        target.alive = False
+                        self._set_alive(target, False)
                         self.special_state = True
                         self.add_log(f"{player.name} 决斗成功，击杀 {target.name}。")
                     else:
-                        player.alive = False
+                        self._set_alive(player, False)
                         self.add_log(f"{player.name} 决斗失败，自身倒下。")
                     player.rider_duel_used = True
         self.actions.clear()
@@ -781,13 +916,15 @@ class GameRoom:
             if action.action == ActionType.HUNTER_SHOOT and player.role == Role.HUNTER:
                 target = self.players.get(action.target_id)
                 if target and target.alive:
-                    target.alive = False
+                    self._set_alive(target, False)
                     player.hunter_shot = True
+                    self.roster.update(player)
                     self.add_log(f"{player.name} 肘击带走了 {target.name}。")
             if action.action == ActionType.NERD_REVEAL and player.role == Role.NERD:
                 if not player.nerd_revealed:
                     player.nerd_revealed = True
-                    player.alive = True
+                    self._set_alive(player, True)
+                    self.roster.update(player)
                     self.add_log(f"{player.name} 揭示身份，回到游戏。")
         self.actions.clear()
 
@@ -797,6 +934,7 @@ class GameRoom:
                 explorer_action = self.actions.get(player.id)
                 if explorer_action and explorer_action.action == ActionType.EXPLORER_BUY:
                     player.explorer_bought = True
+                    self.roster.update(player)
                     deaths.remove(player)
                     self.add_log(f"寻宝士使用了收买机会，{player.name} 幸存。")
 
@@ -805,7 +943,7 @@ class GameRoom:
             for lover_id in player.lover_ids:
                 lover = self.players.get(lover_id)
                 if lover and lover.alive:
-                    lover.alive = False
+                    self._set_alive(lover, False)
                     deaths.append(lover)
                     self.add_log(f"情人殉情，{lover.name} 随 {player.name} 倒下。")
 
@@ -837,6 +975,8 @@ class GameRoom:
                 player.kind = Kind.CUPID
                 player_a.kind = Kind.CUPID
                 player_b.kind = Kind.CUPID
+            for linked in (player, player_a, player_b):
+                self.roster.update(linked)
             self.add_log(f"丘比特连接了 {player_a.name} 与 {player_b.name}。")
 
     def _end_game(self, winner: str) -> None:
@@ -845,7 +985,7 @@ class GameRoom:
         self.log_event("GAME_END", 2, payload={"winner": winner})
 
     def _valid_target(self, target_id: Optional[str]) -> bool:
-        return bool(target_id and target_id in self.players and self.players[target_id].alive)
+        return self.roster.is_alive(target_id)
 
     def _phase_day_label(self) -> str:
         return f"第{self.day_count}天·{self.phase.value}"
@@ -863,7 +1003,7 @@ class GameRoom:
             self.add_log(f"{self._phase_day_label()}：平安夜。")
 
     def _start_morning(self) -> None:
-        players_in_order = [player for player in self.players.values() if player.alive]
+        players_in_order = [self.players[player_id] for player_id in self._alive_ids()]
         if not players_in_order:
             self.morning_order = []
             self.morning_index = 0
@@ -874,7 +1014,7 @@ class GameRoom:
         self.morning_order = [player.id for player in ordered]
         self.morning_index = 0
         self.morning_speaker_id = self.morning_order[0]
-        self.morning_started_at = time.time()
+        self.morning_started_at = self.now()
         self.log_event(
             "TURN",
             1,
@@ -893,7 +1033,7 @@ class GameRoom:
             self.morning_started_at = None
             return
         self.morning_speaker_id = self.morning_order[self.morning_index]
-        self.morning_started_at = time.time()
+        self.morning_started_at = self.now()
         self.log_event(
             "TURN",
             1,
@@ -901,53 +1041,45 @@ class GameRoom:
             payload={"kind": "speech"},
         )
 
+    def next_deadline(self) -> Optional[float]:
+        if self.phase == Phase.MORNING and self.morning_started_at and self.morning_speaker_id:
+            return self.morning_started_at + MORNING_SPEECH_SECONDS
+        return None
+
     def _check_morning_timeout(self) -> None:
         if not self.morning_started_at or not self.morning_speaker_id:
             return
-        if time.time() - self.morning_started_at >= 120:
+        if self.now() - self.morning_started_at >= MORNING_SPEECH_SECONDS:
             speaker = self.players.get(self.morning_speaker_id)
             if speaker:
                 self.add_log(f"{speaker.name} 发言超时，轮到下一位。")
             self._advance_morning_speaker()
 
-    def _required_action_players(self) -> set:
-        required = set()
+    def _required_action_mask(self) -> int:
+        roster = self.roster
+        alive = roster.alive
         if self.phase == Phase.BEFORE_ELECTION:
-            for player in self.players.values():
-                if player.alive:
-                    required.add(player.id)
-        elif self.phase == Phase.ELECTION:
-            for player in self.players.values():
-                if player.alive and not player.is_police:
-                    required.add(player.id)
-        elif self.phase == Phase.NIGHT:
-            for player in self.players.values():
-                if not player.alive:
-                    if player.role == Role.HUNTER and not player.hunter_shot:
-                        required.add(player.id)
-                    continue
-                if player.role in (Role.WEREWOLF, Role.WHITE_WOLF, Role.SEER, Role.GUARD):
-                    required.add(player.id)
-                if player.role == Role.CUPID and not player.cupid_linked:
-                    required.add(player.id)
-                if player.role == Role.WITCH and not (player.witch_saved and player.witch_poisoned):
-                    required.add(player.id)
-                if player.role == Role.EXPLORER and self._is_explorer_target(player):
-                    required.add(player.id)
-        elif self.phase == Phase.MORNING:
-            if self.morning_speaker_id:
-                required.add(self.morning_speaker_id)
-        elif self.phase == Phase.DAY:
-            for player in self.players.values():
-                if player.alive and not player.nerd_revealed:
-                    required.add(player.id)
-        elif self.phase == Phase.DUSK:
-            for player in self.players.values():
-                if player.role == Role.HUNTER and not player.alive and not player.hunter_shot:
-                    required.add(player.id)
-                if player.role == Role.NERD and not player.alive and not player.nerd_revealed:
-                    required.add(player.id)
-        return required
+            return alive
+        if self.phase == Phase.ELECTION:
+            return alive & ~roster.flag("is_police")
+        if self.phase == Phase.NIGHT:
+            required = roster.role(Role.HUNTER) & ~alive & ~roster.flag("hunter_shot")
+            required |= roster.role(Role.WEREWOLF, Role.WHITE_WOLF, Role.SEER, Role.GUARD) & alive
+            required |= roster.role(Role.CUPID) & alive & ~roster.flag("cupid_linked")
+            required |= roster.role(Role.WITCH) & alive & ~(roster.flag("witch_saved") & roster.flag("witch_poisoned"))
+            explorers = roster.role(Role.EXPLORER) & alive & ~roster.flag("explorer_bought")
+            if explorers:
+                required |= explorers & roster.bit(self._pending_wolf_target())
+            return required
+        if self.phase == Phase.MORNING:
+            return roster.bit(self.morning_speaker_id)
+        if self.phase == Phase.DAY:
+            return alive & ~roster.flag("nerd_revealed")
+        if self.phase == Phase.DUSK:
+            required = roster.role(Role.HUNTER) & ~alive & ~roster.flag("hunter_shot")
+            required |= roster.role(Role.NERD) & ~alive & ~roster.flag("nerd_revealed")
+            return required
+        return 0
 
     def _is_explorer_target(self, explorer: PlayerState) -> bool:
         pending_target = self._pending_wolf_target()
@@ -977,11 +1109,8 @@ class GameRoom:
             if not self.morning_speaker_id:
                 self.advance()
             return
-        required = self._required_action_players()
-        if not required:
-            self.advance()
-            return
-        if required.issubset(self.actions.keys()):
+        required = self._required_action_mask()
+        if not required & ~self.roster.mask(self.actions):
             self.advance()
     def available_actions_for(self, player: Optional[PlayerState]) -> List[dict]:
         if not player:
@@ -1069,13 +1198,29 @@ class GameRoom:
         }
 
     def _default_targets(self) -> List[str]:
-        return [player.id for player in self.players.values() if player.alive]
+        return list(self._alive_ids())
 
-    def payload(self, viewer_id: Optional[str]) -> dict:
-        viewer_player = self.player_for_owner(viewer_id) if viewer_id else None
-        remaining = None
+    def _morning_remaining(self) -> Optional[int]:
         if self.phase == Phase.MORNING and self.morning_started_at:
-            remaining = max(0, int(120 - (time.time() - self.morning_started_at)))
+            return max(0, int(MORNING_SPEECH_SECONDS - (self.now() - self.morning_started_at)))
+        return None
+
+    def public_payload(self) -> dict:
+        remaining = self._morning_remaining()
+        key = (self.revision, remaining)
+        if self._public is None or self._public_key != key:
+            self._public = self._build_public_payload(remaining)
+            self._public_json = None
+            self._public_key = key
+        return self._public
+
+    def public_json(self) -> str:
+        public = self.public_payload()
+        if self._public_json is None:
+            self._public_json = json.dumps(public, ensure_ascii=False)
+        return self._public_json
+
+    def _build_public_payload(self, remaining: Optional[int]) -> dict:
         current_turn = None
         if self.phase == Phase.MORNING and self.morning_speaker_id:
             current_turn = {
@@ -1096,14 +1241,6 @@ class GameRoom:
                 "phase_code": self.phase.name,
                 "current_turn": current_turn,
             },
-            "viewer": {
-                "user_id": viewer_id,
-                "player_id": viewer_player.id if viewer_player else None,
-                "is_host": self.is_host(viewer_id),
-            },
-            "viewer_role": viewer_player.display_role() if viewer_player else "",
-            "viewer_kind": viewer_player.kind.value if viewer_player and viewer_player.kind else "",
-            "viewer_notes": viewer_player.notes if viewer_player else [],
             "morning": {
                 "speaker_id": self.morning_speaker_id,
                 "remaining": remaining,
@@ -1119,10 +1256,92 @@ class GameRoom:
                 }
                 for player in self.players.values()
             ],
+            "events": [event.to_dict() for event in self.events],
+            "event_epoch": self.event_epoch,
+            "limits": {"min_players": 3, "max_players": 9, "max_events": MAX_EVENTS},
+        }
+
+    def viewer_payload(self, viewer_id: Optional[str]) -> dict:
+        viewer_player = self.player_for_owner(viewer_id) if viewer_id else None
+        return {
+            "viewer": {
+                "user_id": viewer_id,
+                "player_id": viewer_player.id if viewer_player else None,
+                "is_host": self.is_host(viewer_id),
+            },
+            "viewer_role": viewer_player.display_role() if viewer_player else "",
+            "viewer_kind": viewer_player.kind.value if viewer_player and viewer_player.kind else "",
+            "viewer_notes": list(viewer_player.notes) if viewer_player else [],
             "available_actions": self.available_actions_for(viewer_player),
+        }
+
+    def payload(self, viewer_id: Optional[str]) -> dict:
+        return {**self.public_payload(), **self.viewer_payload(viewer_id)}
+
+    def to_state(self) -> dict:
+        players = []
+        for player in self.players.values():
+            data = asdict(player)
+            data["role"] = player.role.name if player.role else None
+            data["kind"] = player.kind.name if player.kind else None
+            players.append(data)
+        return {
+            "phase": self.phase.name,
+            "day_count": self.day_count,
+            "mode": self.mode.name,
+            "players": players,
+            "owners": dict(self.owners),
+            "host_user_id": self.host_user_id,
             "events": [event.to_dict() for event in self.events],
-            "limits": {"min_players": 3, "max_players": 9},
+            "event_seq": self.event_seq,
+            "event_epoch": self.event_epoch,
+            "revision": self.revision,
+            "actions": {player_id: asdict(action) for player_id, action in self.actions.items()},
+            "last_guard_target": self.last_guard_target,
+            "wolf_target": self.wolf_target,
+            "witch_save_target": self.witch_save_target,
+            "witch_poison_target": self.witch_poison_target,
+            "last_night_deaths": list(self.last_night_deaths),
+            "special_state": self.special_state,
+            "morning_order": list(self.morning_order),
+            "morning_index": self.morning_index,
+            "morning_started_at": self.morning_started_at,
+            "morning_speaker_id": self.morning_speaker_id,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "GameRoom":
+        room = cls()
+        room.phase = Phase[state["phase"]]
+        room.day_count = state["day_count"]
+        room.mode = Mode[state["mode"]]
+        for data in state["players"]:
+            player = PlayerState(**data)
+            player.role = Role[data["role"]] if data["role"] else None
+            player.kind = Kind[data["kind"]] if data["kind"] else None
+            room.players[player.id] = player
+        room.owners = dict(state["owners"])
+        room._rebuild_indexes()
+        room.host_user_id = state["host_user_id"]
+        room.events.extend([GameEvent(**data) for data in state["events"]])
+        room.event_seq = state["event_seq"]
+        room.event_epoch = state["event_epoch"]
+        room.revision = state["revision"]
+        room.actions = {
+            player_id: PendingAction(**data) for player_id, data in state["actions"].items()
         }
+        room.last_guard_target = state["last_guard_target"]
+        room.wolf_target = state["wolf_target"]
+        room.witch_save_target = state["witch_save_target"]
+        room.witch_poison_target = state["witch_poison_target"]
+        room.last_night_deaths = list(state["last_night_deaths"])
+        room.special_state = state["special_state"]
+        room.morning_order = list(state["morning_order"])
+        room.morning_index = state["morning_index"]
+        room.morning_started_at = state["morning_started_at"]
+        room.morning_speaker_id = state["morning_speaker_id"]
+        return room
 
     def to_json(self, viewer_id: Optional[str]) -> str:
-        return json.dumps(self.payload(viewer_id), ensure_ascii=False)
+        overlay = json.dumps(self.viewer_payload(viewer_id), ensure_ascii=False)
+        return f"{self.public_json()[:-1]},{overlay[1:]}"
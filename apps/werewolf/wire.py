@@ -0,0 +1,243 @@
+import json
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .enum import Kind, Mode, Phase, Role
+from .web_engine import ActionType
+
+JSON_SUBPROTOCOL = "werewolf.json"
+BINARY_SUBPROTOCOL = "werewolf.msgpack.v1"
+INTERNED_EXT = 1
+
+FRAME_TYPES = ("snapshot", "delta", "action_result", "joined", "error", "wire")
+EVENT_TYPES = (
+    "SYSTEM",
+    "PLAYER_JOIN",
+    "GAME_START",
+    "GAME_END",
+    "PHASE_CHANGE",
+    "SPEECH",
+    "TURN",
+    "VOTE_RESULT",
+    "DEATH_ANNOUNCED",
+)
+KEYS = (
+    "type", "base", "rev", "set", "players", "events", "events_since", "event_epoch",
+    "phase", "phase_code", "day", "mode", "modes", "code", "label", "host_id", "state",
+    "current_turn", "player_id", "remaining", "morning", "speaker_id", "limits",
+    "min_players", "max_players", "max_events", "id", "name", "alive", "is_chief",
+    "is_police", "avatar_url", "seq", "priority", "actor_id", "actor_name", "payload",
+    "ts", "message", "names", "from", "to", "result", "text", "kind", "winner",
+    "viewer", "user_id", "is_host", "viewer_role", "viewer_kind", "viewer_notes",
+    "available_actions", "target_count", "targets", "changed", "remove", "order",
+    "reset", "upsert", "ok",
+)
+
+
+def _enum_strings() -> List[str]:
+    strings: List[str] = list(FRAME_TYPES) + list(EVENT_TYPES)
+    for enum_type in (Phase, Mode, Role, Kind):
+        for member in enum_type:
+            strings.extend((member.name, member.value))
+    strings.extend(value for name, value in vars(ActionType).items() if name.isupper())
+    strings.extend(("speech", "election", "chief", "tie", "exiled"))
+    return list(dict.fromkeys(strings))
+
+
+VALUES = tuple(_enum_strings())
+_KEY_INDEX: Dict[str, int] = {key: index for index, key in enumerate(KEYS)}
+_VALUE_INDEX: Dict[str, int] = {value: index for index, value in enumerate(VALUES)}
+HELLO = json.dumps({"type": "wire", "keys": KEYS, "values": VALUES}, ensure_ascii=False)
+
+assert len(KEYS) < 0x80 and len(VALUES) <= 0x100
+
+_pack_u16 = struct.Struct(">H").pack
+_pack_u32 = struct.Struct(">I").pack
+_pack_f64 = struct.Struct(">d").pack
+
+
+def _pack_raw_str(value: str, out: bytearray) -> None:
+    data = value.encode("utf-8")
+    size = len(data)
+    if size < 0x20:
+        out.append(0xA0 | size)
+    elif size < 0x100:
+        out += b"\xd9" + bytes((size,))
+    elif size < 0x10000:
+        out += b"\xda" + _pack_u16(size)
+    else:
+        out += b"\xdb" + _pack_u32(size)
+    out += data
+
+
+def _pack_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -0x20 <= value < 0:
+        out.append(value & 0xFF)
+    elif 0 <= value < 0x100:
+        out += b"\xcc" + bytes((value,))
+    elif 0 <= value < 0x10000:
+        out += b"\xcd" + _pack_u16(value)
+    elif 0 <= value < 0x100000000:
+        out += b"\xce" + _pack_u32(value)
+    elif 0 <= value < 0x10000000000000000:
+        out += b"\xcf" + struct.pack(">Q", value)
+    elif -0x80 <= value:
+        out += b"\xd0" + struct.pack(">b", value)
+    elif -0x8000 <= value:
+        out += b"\xd1" + struct.pack(">h", value)
+    elif -0x80000000 <= value:
+        out += b"\xd2" + struct.pack(">i", value)
+    else:
+        out += b"\xd3" + struct.pack(">q", value)
+
+
+def _pack(value: object, out: bytearray) -> None:
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, str):
+        index = _VALUE_INDEX.get(value)
+        if index is None:
+            _pack_raw_str(value, out)
+        else:
+            out += bytes((0xD4, INTERNED_EXT, index))
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, float):
+        if value.is_integer() and -0x80000000 <= value < 0x100000000:
+            _pack_int(int(value), out)
+        else:
+            out += b"\xcb" + _pack_f64(value)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x80 | size)
+        elif size < 0x10000:
+            out += b"\xde" + _pack_u16(size)
+        else:
+            out += b"\xdf" + _pack_u32(size)
+        for key, item in value.items():
+            index = _KEY_INDEX.get(key)
+            if index is None:
+                _pack_raw_str(key, out)
+            else:
+                out.append(index)
+            _pack(item, out)
+    elif isinstance(value, (list, tuple)):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x90 | size)
+        elif size < 0x10000:
+            out += b"\xdc" + _pack_u16(size)
+        else:
+            out += b"\xdd" + _pack_u32(size)
+        for item in value:
+            _pack(item, out)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def pack(value: object) -> bytes:
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+def encode_text(text: str) -> bytes:
+    return pack(json.loads(text))
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        start = self.pos
+        self.pos += size
+        return self.data[start:self.pos]
+
+    def value(self, key: bool = False) -> object:
+        code = self.data[self.pos]
+        self.pos += 1
+        if code < 0x80:
+            return KEYS[code] if key else code
+        if code >= 0xE0:
+            return code - 0x100
+        if code <= 0x8F:
+            return self.mapping(code & 0x0F)
+        if code <= 0x9F:
+            return [self.value() for _ in range(code & 0x0F)]
+        if code <= 0xBF:
+            return self.take(code & 0x1F).decode("utf-8")
+        if code == 0xC0:
+            return None
+        if code in (0xC2, 0xC3):
+            return code == 0xC3
+        if code == 0xD4:
+            ext, index = self.take(2)
+            if ext != INTERNED_EXT:
+                raise ValueError(f"unknown extension {ext}")
+            return VALUES[index]
+        fixed = _FIXED.get(code)
+        if fixed is not None:
+            fmt, size = fixed
+            return struct.unpack(fmt, self.take(size))[0]
+        sized = _SIZED.get(code)
+        if sized is None:
+            raise ValueError(f"unsupported type byte 0x{code:02x}")
+        fmt, size, kind = sized
+        length = struct.unpack(fmt, self.take(size))[0]
+        if kind == "str":
+            return self.take(length).decode("utf-8")
+        if kind == "array":
+            return [self.value() for _ in range(length)]
+        return self.mapping(length)
+
+    def mapping(self, size: int) -> dict:
+        result = {}
+        for _ in range(size):
+            key = self.value(key=True)
+            result[key] = self.value()
+        return result
+
+
+_FIXED: Dict[int, Tuple[str, int]] = {
+    0xCA: (">f", 4),
+    0xCB: (">d", 8),
+    0xCC: (">B", 1),
+    0xCD: (">H", 2),
+    0xCE: (">I", 4),
+    0xCF: (">Q", 8),
+    0xD0: (">b", 1),
+    0xD1: (">h", 2),
+    0xD2: (">i", 4),
+    0xD3: (">q", 8),
+}
+_SIZED: Dict[int, Tuple[str, int, str]] = {
+    0xD9: (">B", 1, "str"),
+    0xDA: (">H", 2, "str"),
+    0xDB: (">I", 4, "str"),
+    0xDC: (">H", 2, "array"),
+    0xDD: (">I", 4, "array"),
+    0xDE: (">H", 2, "map"),
+    0xDF: (">I", 4, "map"),
+}
+
+
+def unpack(data: bytes) -> object:
+    return _Reader(data).value()
+
+
+def choose_subprotocol(offered: Sequence[str]) -> Optional[str]:
+    for name in offered:
+        if name in (BINARY_SUBPROTOCOL, JSON_SUBPROTOCOL):
+            return name
+    return None